@@ -1,12 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 from datetime import datetime
 from pathlib import Path
 import threading
 import random
 import uuid
 from deployment_package.instagram_gui import InstagramBotGUI
+from deployment_package.session import BrowserSession
+from deployment_package.batch_store import BatchStore, FollowedIndex, batch_key
 
 VINTAGE_BLUE = "#0a246a"
 VINTAGE_GRAY = "#c0c0c0"
@@ -18,6 +19,90 @@ VINTAGE_FONT_BOLD = ("Courier New", 11, "bold")
 VINTAGE_HEADER = ("Courier New", 20, "bold")
 VINTAGE_BTN_FONT = ("Courier New", 10, "bold")
 
+def batch_stamp(summary):
+    """Version stamp for a batch summary; any change that should show in the list changes it"""
+    return (summary.get('version', 0), summary['user_count'], summary['unfollowed_count'], summary.get('completed', False))
+
+
+class BatchListView:
+    """Virtualized batch list on a canvas
+
+    Only batches inside the viewport have widgets, and a row is rebuilt only when its version stamp changed
+    """
+    ROW_HEIGHT = 120
+    ROW_GAP = 10
+    OVERSCAN = 2
+
+    def __init__(self, canvas, build_row):
+        self.canvas = canvas
+        self.build_row = build_row
+        self.width = 700
+        self.order = []
+        self.batches = {}
+        self.stamps = {}
+        self.sort_keys = {}
+        # key -> [frame, canvas item, stamp, index]
+        self.rows = {}
+
+    def set_batches(self, batches):
+        """Diff summaries against the last call: re-sort only when batches were added or removed"""
+        self.batches = {batch_key(b): b for b in batches}
+        self.stamps = {key: batch_stamp(b) for key, b in self.batches.items()}
+        if set(self.order) != set(self.batches):
+            for key, batch in self.batches.items():
+                if key not in self.sort_keys:
+                    # Epoch seconds, so naive local and 'Z'-suffixed extension timestamps sort together
+                    try:
+                        self.sort_keys[key] = datetime.fromisoformat(batch['timestamp'].replace('Z', '+00:00')).timestamp()
+                    except (KeyError, ValueError, AttributeError):
+                        self.sort_keys[key] = float('-inf')
+            for key in [k for k in self.sort_keys if k not in self.batches]:
+                del self.sort_keys[key]
+            self.order = sorted(self.batches, key=self.sort_keys.get, reverse=True)
+        self.canvas.configure(scrollregion=(0, 0, self.width, len(self.order) * self.ROW_HEIGHT))
+        self.render()
+
+    def resize(self, width):
+        self.width = width
+        for frame, item, stamp, index in self.rows.values():
+            self.canvas.itemconfig(item, width=self.width - 10)
+        self.canvas.configure(scrollregion=(0, 0, self.width, len(self.order) * self.ROW_HEIGHT))
+        self.render()
+
+    def render(self):
+        """Create, move, rebuild or drop row widgets for the batches currently in view"""
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.ROW_HEIGHT)
+        first = max(0, int(top // self.ROW_HEIGHT) - self.OVERSCAN)
+        last = min(len(self.order), int((top + height) // self.ROW_HEIGHT) + 1 + self.OVERSCAN)
+        visible = {self.order[i]: i for i in range(first, last)}
+
+        for key in [k for k in self.rows if k not in visible]:
+            self._drop(key)
+
+        for key, index in visible.items():
+            row = self.rows.get(key)
+            stamp = self.stamps[key]
+            if row and row[2] == stamp:
+                if row[3] != index:
+                    self.canvas.coords(row[1], 5, index * self.ROW_HEIGHT)
+                    row[3] = index
+                continue
+            if row:
+                self._drop(key)
+            frame = self.build_row(self.batches[key], self.canvas)
+            item = self.canvas.create_window(
+                5, index * self.ROW_HEIGHT, window=frame, anchor="nw",
+                width=self.width - 10, height=self.ROW_HEIGHT - self.ROW_GAP
+            )
+            self.rows[key] = [frame, item, stamp, index]
+
+    def _drop(self, key):
+        frame, item, stamp, index = self.rows.pop(key)
+        self.canvas.delete(item)
+        frame.destroy()
+
+
 class BatchFollowGUI:
     def __init__(self, root):
         self.root = root
@@ -37,12 +122,21 @@ class BatchFollowGUI:
         self.data_dir = Path('instagram_data')
         self.data_dir.mkdir(exist_ok=True)
         self.batches_file = self.data_dir / 'follow_batches.json'
-        self.batches = self.load_batches()
+        # Shared with the worker threads; hold store.lock while touching batches.
+        # Batches are read lazily, so only summaries are in memory until one is opened
+        self.store = BatchStore(self.batches_file)
         self.auto_refresh_running = False
         self.create_main_layout()
         self.update_batches_display()
         self.update_totals()
         self.start_auto_refresh()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Write any coalesced batch changes before the window goes away"""
+        self.auto_refresh_running = False
+        self.store.close()
+        self.root.destroy()
 
     def create_main_layout(self):
         # --- Title Bar ---
@@ -113,18 +207,8 @@ class BatchFollowGUI:
         batches_panel.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(8, 18), pady=18)
         tk.Label(batches_panel, text="FOLLOW BATCHES", font=VINTAGE_FONT_BOLD, bg=VINTAGE_GRAY, anchor="w", fg="black").pack(fill=tk.X, padx=12, pady=(10, 0))
         self.canvas = tk.Canvas(batches_panel, highlightthickness=0, bg=VINTAGE_LIGHT)
-        scrollbar = ttk.Scrollbar(batches_panel, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=VINTAGE_LIGHT)
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        self.canvas_window = self.canvas.create_window(
-            (0, 0),
-            window=self.scrollable_frame,
-            anchor="nw",
-            width=700
-        )
+        scrollbar = ttk.Scrollbar(batches_panel, orient="vertical", command=self._on_scrollbar)
+        self.batch_list = BatchListView(self.canvas, self.create_batch_frame)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(12,0), pady=(0,12))
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=(0,12))
         self.canvas.configure(yscrollcommand=scrollbar.set)
@@ -132,19 +216,24 @@ class BatchFollowGUI:
         self.root.bind_all("<MouseWheel>", self._on_mousewheel)
 
     def _on_canvas_configure(self, event):
-        # Update the width of the canvas window when the canvas is resized
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
+        # Rows follow the canvas width; a taller canvas may bring more batches into view
+        self.batch_list.resize(event.width)
+        
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.batch_list.render()
         
     def _on_mousewheel(self, event):
         self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        self.batch_list.render()
         
     def create_batch_frame(self, batch, frame):
+        """Widgets for one batch row, built from its summary; placed on the canvas by BatchListView"""
         # Create a frame with border
         batch_frame = tk.Frame(frame, relief="solid", borderwidth=1, bg=VINTAGE_LIGHT)
-        batch_frame.pack(fill=tk.X, pady=(0, 10), padx=5)
         
         # Add light gray background if batch is unfollowed
-        is_unfollowed = all(user.get('unfollowed', False) for user in batch['users'])
+        is_unfollowed = batch['unfollowed_count'] >= batch['user_count']
         if is_unfollowed:
             batch_frame.configure(bg=VINTAGE_LIGHT)
         
@@ -173,8 +262,8 @@ class BatchFollowGUI:
         status_frame = tk.Frame(header_frame, bg=VINTAGE_LIGHT)
         status_frame.pack(side=tk.RIGHT)
         
-        total_users = len(batch['users'])
-        unfollowed = sum(1 for user in batch['users'] if user.get('unfollowed'))
+        total_users = batch['user_count']
+        unfollowed = batch['unfollowed_count']
         
         tk.Label(
             status_frame,
@@ -203,7 +292,7 @@ class BatchFollowGUI:
             tk.Button(
                 actions_frame,
                 text="Unfollow All",
-                command=lambda b=batch: self.unfollow_batch(b),
+                command=lambda key=batch_key(batch): self.unfollow_batch(key),
                 font=VINTAGE_BTN_FONT,
                 bg=VINTAGE_BTN,
                 fg="black",
@@ -224,6 +313,8 @@ class BatchFollowGUI:
             bd=2,
             activebackground=VINTAGE_LIGHT
         ).pack(side=tk.LEFT, padx=(8, 0))
+        
+        return batch_frame
             
     def toggle_password_visibility(self):
         if self.show_password_var.get():
@@ -231,47 +322,35 @@ class BatchFollowGUI:
         else:
             self.password_entry.config(show="*")
             
-    def load_batches(self):
-        if self.batches_file.exists():
-            try:
-                with open(self.batches_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return []
-        
     def save_batches(self):
-        with open(self.batches_file, 'w') as f:
-            json.dump(self.batches, f, indent=2)
+        """Coalesced save; call store.flush() where the write must be durable now"""
+        self.store.save()
             
-    def update_batches_display(self):
-        # Clear existing frames
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+    def reload_batches(self):
+        """Pick up batches other tools wrote (extension import, the main GUI); one stat when nothing changed"""
+        try:
+            self.store.reload()
+        except Exception as e:
+            self.update_status(f"Error reloading batches: {e}")
             
-        # Sort batches by timestamp (newest first)
-        sorted_batches = sorted(
-            self.batches,
-            key=lambda x: datetime.fromisoformat(x['timestamp']),
-            reverse=True
-        )
-        
-        # Create frames for each batch
-        for batch in sorted_batches:
-            self.create_batch_frame(batch, self.scrollable_frame)
+    def update_batches_display(self):
+        # Only rows whose version stamp changed (or that scrolled into view) are rebuilt
+        self.reload_batches()
+        self.batch_list.set_batches(self.store.summaries())
         
     def update_status(self, message):
         """Update the status message"""
         self.status_message.set(message)
         
     def update_totals(self):
-        """Update the total counters"""
+        """Update the total counters from the per-batch summaries"""
         total_followed = 0
         total_unfollowed = 0
         
-        for batch in self.batches:
-            total_followed += len(batch['users'])
-            total_unfollowed += sum(1 for user in batch['users'] if user.get('unfollowed', False))
+        self.reload_batches()
+        for summary in self.store.summaries():
+            total_followed += summary['user_count']
+            total_unfollowed += summary['unfollowed_count']
         
         self.total_followed.set(str(total_followed))
         self.total_unfollowed.set(str(total_unfollowed))
@@ -283,7 +362,7 @@ class BatchFollowGUI:
             self._auto_refresh()
     
     def _auto_refresh(self):
-        """Internal method for auto-refreshing display"""
+        """Internal method for auto-refreshing display; a no-op diff when nothing changed"""
         if self.auto_refresh_running:
             self.update_batches_display()
             self.update_totals()
@@ -296,7 +375,8 @@ class BatchFollowGUI:
             self.update_status("Error: Batch has no id")
             return
         # Find the batch
-        target = next((b for b in self.batches if b.get('id') == batch_id), None)
+        self.reload_batches()
+        target = self.store.summary(batch_id)
         if not target:
             self.update_status("Batch not found")
             return
@@ -306,10 +386,10 @@ class BatchFollowGUI:
             dt = datetime.fromisoformat(ts).strftime('%Y-%m-%d %H:%M') if ts else 'Unknown time'
         except Exception:
             dt = 'Unknown time'
-        count = len(target.get('users', []))
+        count = target['user_count']
         if messagebox.askyesno("Delete Batch", f"Delete this batch from {dt} with {count} users? This cannot be undone."):
-            self.batches = [b for b in self.batches if b.get('id') != batch_id]
-            self.save_batches()
+            self.store.delete(batch_id)
+            self.store.flush()
             self.update_status("Batch deleted")
             self.update_batches_display()
             self.update_totals()
@@ -330,8 +410,8 @@ class BatchFollowGUI:
         }
         
         # Add to batches and save
-        self.batches.append(batch)
-        self.save_batches()
+        self.reload_batches()
+        self.store.add(batch)
         
         # Start following process in background
         threading.Thread(
@@ -340,74 +420,87 @@ class BatchFollowGUI:
             daemon=True
         ).start()
         
+    def create_bot(self, target_accounts, users_per_account):
+        """Bot bound to the saved browser session for the current username"""
+        username = self.username_var.get().strip()
+        return InstagramBotGUI(
+            username,
+            self.password_var.get().strip(),
+            target_accounts,
+            users_per_account,
+            session=BrowserSession(self.data_dir, username)
+        )
+        
     def execute_batch(self, batch):
+        bot = None
         try:
             self.update_status(f"Initializing bot for new batch...")
             
             # Get follows per account
             follows_per_account = int(self.follows_per_account_var.get())
             
+            # One browser and one login for the whole batch
+            bot = self.create_bot(batch['source_accounts'], follows_per_account)
+            if not bot.init_driver(show_browser=self.show_browser_var.get()):
+                raise Exception("Failed to initialize browser")
+            if not bot.login():
+                raise Exception("Failed to login to Instagram")
+            
+            # Anyone in a batch or the ledger is skipped before a click is attempted
+            bot.follows_data = FollowedIndex(self.store.followed_usernames(), bot.ledger)
+            with self.store.lock:
+                batch_usernames = {u['username'] for u in batch['users']}
+            
             # For each account, follow the specified number
             for i, account in enumerate(batch['source_accounts']):
                 self.update_status(f"Following {follows_per_account} users from @{account}...")
                 
-                # Create a fresh bot instance for each account (to avoid session issues)
-                bot = InstagramBotGUI(
-                    self.username_var.get().strip(),
-                    self.password_var.get().strip(),
-                    [account],
-                    follows_per_account
-                )
-                
-                # Clear any existing follows data to ensure fresh start for this account
-                bot.follows_data = {}
                 self.update_status(f"Starting bot for @{account} (target: {follows_per_account} users)")
                 
-                if not bot.init_driver(show_browser=self.show_browser_var.get()):
-                    raise Exception("Failed to initialize browser")
-                if not bot.login():
+                # Session may have dropped between accounts; this is a cheap check when it hasn't
+                if not bot.is_logged_in() and not bot.login():
                     raise Exception("Failed to login to Instagram")
                 
                 # Store initial count for this account
-                initial_count = len(batch['users'])
+                with self.store.lock:
+                    initial_count = len(batch['users'])
                 
                 followed_usernames = bot.follow_users_from_account(account)
                 if not isinstance(followed_usernames, list):
                     followed_usernames = []
-                self.update_status(f"Bot completed @{account}: {len(followed_usernames)} users followed, {len(bot.follows_data)} in follows_data")
+                self.update_status(f"Bot completed @{account}: {len(followed_usernames)} users followed, {len(bot.ledger)} in ledger")
                 
                 # Update batch with only the users actually followed in this run
                 users_added = 0
                 for username in followed_usernames:
-                    if not any(u['username'] == username for u in batch['users']):
-                        data = bot.follows_data.get(username, {})
-                        batch['users'].append({
-                            'username': username,
-                            'followed_at': data.get('followed_at', datetime.now().isoformat()),
-                            'unfollowed': False,
-                            'source_account': account
-                        })
-                        users_added += 1
-                        self.update_status(f"Added @{username} to batch from @{account}")
+                    if username in batch_usernames:
+                        continue
+                    batch_usernames.add(username)
+                    data = bot.ledger.get(username) or {}
+                    self.store.add_user(batch, {
+                        'username': username,
+                        'followed_at': data.get('followed_at', datetime.now().isoformat()),
+                        'unfollowed': False,
+                        'source_account': account
+                    })
+                    users_added += 1
+                    self.update_status(f"Added @{username} to batch from @{account}")
                 
-                # Force immediate save and display update
+                # Coalesced save; the GUI picks the new users up from the main thread
                 self.save_batches()
                 self.update_status(f"Batch updated: {users_added} users added from @{account}, {len(batch['users'])} total users")
                         
-                # Update GUI after completing each account with immediate refresh
-                self.save_batches()
                 # Force immediate GUI update from main thread
                 self.root.after(0, self.update_batches_display)
                 self.root.after(0, self.update_totals)
                 
                 account_follows = len(batch['users']) - initial_count
                 self.update_status(f"Completed @{account}: {account_follows} users followed")
-                        
-                if bot.driver:
-                    bot.driver.quit()
                 
-            batch['completed'] = True
+            self.store.set_completed(batch)
+            # Completed batches are written through, not left to the coalescing timer
             self.save_batches()
+            self.store.flush()
             # Force immediate final update from main thread
             self.root.after(0, self.update_batches_display)
             self.root.after(0, self.update_totals)
@@ -416,22 +509,29 @@ class BatchFollowGUI:
             error_msg = f"Failed to execute batch: {str(e)}"
             self.update_status(error_msg)
             messagebox.showerror("Error", error_msg)
+        finally:
+            # Whatever was followed before a failure is on disk too
+            self.store.flush()
+            if bot and bot.driver:
+                bot.driver.quit()
             
-    def unfollow_batch(self, batch):
+    def unfollow_batch(self, key):
         if not self.validate_inputs():
             return
             
         def unfollow_thread():
+            bot = None
             try:
                 self.update_status(f"Starting unfollow process...")
                 
+                # Materialize just this batch from the lazily-read file
+                self.reload_batches()
+                batch = self.store.get(key)
+                if batch is None:
+                    raise Exception("Batch not found")
+                
                 # Create bot instance
-                bot = InstagramBotGUI(
-                    self.username_var.get().strip(),
-                    self.password_var.get().strip(),
-                    [],
-                    0
-                )
+                bot = self.create_bot([], 0)
                 
                 # Initialize and login
                 if not bot.init_driver(show_browser=self.show_browser_var.get()):
@@ -441,17 +541,20 @@ class BatchFollowGUI:
                     raise Exception("Failed to login to Instagram")
                     
                 # Unfollow each user in batch
-                total_users = len([u for u in batch['users'] if not u.get('unfollowed')])
+                with self.store.lock:
+                    pending = [u for u in batch['users'] if not u.get('unfollowed')]
+                total_users = len(pending)
                 unfollowed_count = 0
                 
-                for user in batch['users']:
-                    if not user.get('unfollowed'):
-                        self.update_status(f"Unfollowing {unfollowed_count + 1}/{total_users}: @{user['username']}")
-                        if bot.unfollow_user(user['username']):
+                for user in pending:
+                    self.update_status(f"Unfollowing {unfollowed_count + 1}/{total_users}: @{user['username']}")
+                    if bot.unfollow_user(user['username']):
+                        with self.store.lock:
                             user['unfollowed'] = True
                             user['unfollowed_at'] = datetime.now().isoformat()
-                            unfollowed_count += 1
-                            self.save_batches()
+                            self.store.mark_changed(batch)
+                        unfollowed_count += 1
+                        self.save_batches()
                         
                 # Cleanup
                 if bot.driver:
@@ -463,6 +566,11 @@ class BatchFollowGUI:
                 error_msg = f"Failed to unfollow batch: {str(e)}"
                 self.update_status(error_msg)
                 messagebox.showerror("Error", error_msg)
+            finally:
+                self.store.flush()
+                # The bot buffers ledger unfollows until its next checkpoint
+                if bot is not None:
+                    bot.save_follows_data()
                 
         threading.Thread(target=unfollow_thread, daemon=True).start()
         
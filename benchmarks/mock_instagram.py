@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Instagram pages the Selenium bot drives
+Serves login, profile, followers dialog and unfollow flows with the DOM shapes the bot's selectors expect,
+plus profile pictures, a reel, avatars and a web font so lean-mode savings show up in the byte counts
+
+Run from the repository root:
+    python -m benchmarks.mock_instagram --port 8765 --followers 500 --latency-ms 50
+"""
+import argparse
+import html
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs, urlparse
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>{title}</title><meta charset="utf-8">
+<style>@font-face {{ font-family: MockSans; src: url(/media/font/sans.woff2); }} body {{ font-family: MockSans, sans-serif; }}</style>
+</head>
+<body>
+<main>
+{body}
+</main>
+<script>{script}</script>
+</body>
+</html>
+"""
+
+LOGIN_BODY = """
+<form method="post" action="/accounts/login/">
+    <input name="username" aria-label="Phone number, username, or email" type="text">
+    <input name="password" aria-label="Password" type="password">
+    <button type="submit">Log in</button>
+</form>
+"""
+
+ONETAP_BODY = """
+<div role="dialog">
+    <p>Save your login info?</p>
+    <button onclick="location.href='/'">Not now</button>
+</div>
+"""
+
+PROFILE_BODY = """
+<header>
+    <img src="/media/pic/{username}.jpg" alt="" width="150" height="150">
+    <h2>{username}</h2>
+    <button id="profile-action"><div>{action}</div></button>
+    <a href="/{username}/followers/">{followers} followers</a>
+</header>
+<video src="/media/reel/{username}.mp4" autoplay muted loop width="320"></video>
+{dialog}
+"""
+
+FOLLOWERS_DIALOG = """
+<div role="dialog">
+    <div id="followers-list" style="overflow-y: auto; height: 400px;"></div>
+</div>
+"""
+
+FOLLOWERS_SCRIPT = """
+const account = %(account)s;
+const pageSize = %(page_size)d;
+const list = document.getElementById('followers-list');
+let offset = 0, loading = false, done = false;
+
+function addRow(name, state) {
+    const row = document.createElement('div');
+    row.style.display = 'flex';
+    row.style.height = '60px';
+    row.innerHTML = `<img src="/media/pic/${name}.jpg" alt="" width="44" height="44"><a href="/${name}/">${name}</a><button><div>${state}</div></button>`;
+    const button = row.querySelector('button');
+    button.addEventListener('click', () => {
+        const label = button.querySelector('div');
+        if (label.textContent !== 'Follow') return;
+        fetch(`/api/follow/${name}`, {method: 'POST'}).then(() => { label.textContent = 'Following'; });
+    });
+    list.appendChild(row);
+}
+
+function loadMore() {
+    if (loading || done) return;
+    loading = true;
+    fetch(`/api/followers/${account}?offset=${offset}&limit=${pageSize}`)
+        .then(r => r.json())
+        .then(data => {
+            data.users.forEach(u => addRow(u.username, u.following ? 'Following' : 'Follow'));
+            offset += data.users.length;
+            done = !data.has_more;
+            loading = false;
+        });
+}
+
+list.addEventListener('scroll', () => {
+    if (list.scrollTop + list.clientHeight >= list.scrollHeight - 120) loadMore();
+});
+loadMore();
+"""
+
+UNFOLLOW_SCRIPT = """
+const username = %(username)s;
+const action = document.querySelector('#profile-action');
+action.addEventListener('click', () => {
+    const label = action.querySelector('div');
+    if (label.textContent.trim() !== 'Following') return;
+    const dialog = document.createElement('div');
+    dialog.setAttribute('role', 'dialog');
+    dialog.innerHTML = '<button id="confirm-unfollow"><span>Unfollow</span></button>';
+    setTimeout(() => {
+        document.body.appendChild(dialog);
+        dialog.querySelector('#confirm-unfollow').addEventListener('click', () => {
+            fetch(`/api/unfollow/${username}`, {method: 'POST'}).then(() => {
+                dialog.remove();
+                label.textContent = 'Follow';
+            });
+        });
+    }, %(menu_delay_ms)d);
+});
+"""
+
+
+MEDIA_TYPES = {
+    'jpg': 'image/jpeg',
+    'mp4': 'video/mp4',
+    'woff2': 'font/woff2'
+}
+
+
+class MockInstagramState:
+    """Accounts, follower lists and who the logged-in user follows"""
+
+    def __init__(self, followers_per_account=200, page_size=12, latency_ms=0, menu_delay_ms=150, media_kb=24):
+        self.followers_per_account = followers_per_account
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.menu_delay_ms = menu_delay_ms
+        # Every image, video and font is served as media_kb of filler; reels are 8x that
+        self.media_kb = media_kb
+        self.sessions = set()
+        self.following = set()
+        self.requests = 0
+        self.requests_by_kind = Counter()
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    def followers_of(self, account, offset, limit):
+        end = min(offset + limit, self.followers_per_account)
+        with self.lock:
+            return [
+                {'username': f'{account}_fan{i}', 'following': f'{account}_fan{i}' in self.following}
+                for i in range(offset, end)
+            ], end < self.followers_per_account
+
+
+class MockInstagramHandler(BaseHTTPRequestHandler):
+    server_version = "MockInstagram/1.0"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def _session_id(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        morsel = cookie.get('sessionid')
+        return morsel.value if morsel else None
+
+    def _logged_in(self):
+        return self._session_id() in self.state.sessions
+
+    def _delay(self):
+        with self.state.lock:
+            self.state.requests += 1
+        if self.state.latency_ms:
+            time.sleep(self.state.latency_ms / 1000.0)
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None, kind='page'):
+        payload = body if isinstance(body, bytes) else body.encode('utf-8')
+        with self.state.lock:
+            self.state.requests_by_kind[kind] += 1
+            self.state.bytes_sent += len(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _page(self, title, body, script=''):
+        self._send(200, PAGE_TEMPLATE.format(title=html.escape(title), body=body, script=script))
+
+    def _redirect(self, location, headers=None):
+        headers = dict(headers or {})
+        headers['Location'] = location
+        self._send(302, '', headers=headers)
+
+    def do_GET(self):
+        self._delay()
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+
+        if url.path == '/accounts/login/':
+            if self._logged_in():
+                return self._redirect('/')
+            return self._page('Login • Instagram', LOGIN_BODY)
+        if url.path == '/accounts/onetap/':
+            return self._page('Instagram', ONETAP_BODY)
+        if url.path == '/accounts/edit/':
+            if not self._logged_in():
+                return self._redirect('/accounts/login/')
+            return self._page('Edit profile • Instagram', '<h1>Edit profile</h1>')
+        if url.path == '/':
+            return self._page('Instagram', '<h1>Home</h1>' if self._logged_in() else LOGIN_BODY)
+        if len(parts) == 3 and parts[0] == 'api' and parts[1] == 'followers':
+            query = parse_qs(url.query)
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', [str(self.state.page_size)])[0])
+            users, has_more = self.state.followers_of(parts[2], offset, limit)
+            return self._send(200, json.dumps({'users': users, 'has_more': has_more}), 'application/json', kind='api')
+        if len(parts) == 3 and parts[0] == 'media':
+            return self._media(parts[1], parts[2])
+        if len(parts) in (1, 2) and (len(parts) == 1 or parts[1] == 'followers'):
+            return self._profile(parts[0], show_followers=len(parts) == 2)
+
+        self._page('Page not found • Instagram', "<h2>Sorry, this page isn't available.</h2>")
+
+    def _media(self, kind, name):
+        extension = name.rsplit('.', 1)[-1]
+        if extension not in MEDIA_TYPES:
+            return self._send(404, b'', 'application/octet-stream', kind='media')
+        size = self.state.media_kb * 1024 * (8 if kind == 'reel' else 1)
+        self._send(200, b'\0' * size, MEDIA_TYPES[extension], {'Cache-Control': 'no-store'}, kind='media')
+
+    def _profile(self, username, show_followers):
+        with self.state.lock:
+            action = 'Following' if username in self.state.following else 'Follow'
+        body = PROFILE_BODY.format(
+            username=html.escape(username),
+            action=action,
+            followers=self.state.followers_per_account,
+            dialog=FOLLOWERS_DIALOG if show_followers else ''
+        )
+        script = UNFOLLOW_SCRIPT % {'username': json.dumps(username), 'menu_delay_ms': self.state.menu_delay_ms}
+        if show_followers:
+            script += FOLLOWERS_SCRIPT % {'account': json.dumps(username), 'page_size': self.state.page_size}
+        self._page(f'@{username} • Instagram', body, script)
+
+    def do_POST(self):
+        self._delay()
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode('utf-8')) if length else {}
+        parts = [p for p in urlparse(self.path).path.split('/') if p]
+
+        if self.path.startswith('/accounts/login/'):
+            if not form.get('username') or not form.get('password'):
+                return self._page('Login • Instagram', '<div id="slfErrorAlert">Sorry, your password was incorrect.</div>' + LOGIN_BODY)
+            session_id = uuid.uuid4().hex
+            with self.state.lock:
+                self.state.sessions.add(session_id)
+            return self._redirect('/accounts/onetap/', {'Set-Cookie': f'sessionid={session_id}; Path=/'})
+        if len(parts) == 3 and parts[0] == 'api' and parts[1] in ('follow', 'unfollow'):
+            if not self._logged_in():
+                return self._send(403, json.dumps({'status': 'fail'}), 'application/json', kind='api')
+            with self.state.lock:
+                if parts[1] == 'follow':
+                    self.state.following.add(parts[2])
+                else:
+                    self.state.following.discard(parts[2])
+            return self._send(200, json.dumps({'status': 'ok'}), 'application/json', kind='api')
+
+        self._send(404, json.dumps({'status': 'fail'}), 'application/json', kind='api')
+
+
+def start_mock_server(host='127.0.0.1', port=0, **state_options):
+    """Start the mock in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), MockInstagramHandler)
+    server.daemon_threads = True
+    server.state = MockInstagramState(**state_options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local mock of the Instagram pages the bot uses")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--followers', type=int, default=200, help="Followers listed per account")
+    parser.add_argument('--page-size', type=int, default=12, help="Rows loaded per followers-dialog page")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Added latency for every request")
+    parser.add_argument('--media-kb', type=int, default=24, help="Size of each image/font (reels are 8x)")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(
+        args.host, args.port,
+        followers_per_account=args.followers,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        media_kb=args.media_kb
+    )
+    print(f"🧪 Mock Instagram serving at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the Selenium bot against the local mock Instagram
+Drives the real InstagramBotGUI in headless Chrome and reports wall time, WebDriver calls and scroll passes per follow,
+plus the bytes Chrome fetched; compare a run with --lean against one without to see what lean mode saves
+
+Run from the repository root:
+    python -m benchmarks.run_benchmark --accounts 2 --follows 25 --unfollows 10 --latency-ms 30
+    python -m benchmarks.run_benchmark --lean
+"""
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+from collections import Counter
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from benchmarks.mock_instagram import start_mock_server
+from deployment_package.instagram_gui import InstagramBotGUI
+from deployment_package.timing import PhaseTimer
+from deployment_package.waits import PacingPolicy
+
+
+class CommandCounter:
+    """Counts WebDriver wire commands issued through driver.execute"""
+
+    def __init__(self, driver):
+        self.total = 0
+        self.by_command = Counter()
+        original_execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            self.total += 1
+            self.by_command[driver_command] += 1
+            return original_execute(driver_command, params)
+
+        driver.execute = counted_execute
+
+
+def chrome_rss_mb(driver):
+    """Resident memory of chromedriver and every Chrome process under it, or None without psutil"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return round(total / (1024 * 1024), 1)
+
+
+def run_benchmark(accounts=2, follows_per_account=25, unfollows=10, followers=200,
+                  page_size=12, latency_ms=0, keep_pacing=False, show_browser=False, lean=False, media_kb=24):
+    server, base_url = start_mock_server(
+        followers_per_account=followers,
+        page_size=page_size,
+        latency_ms=latency_ms,
+        media_kb=media_kb
+    )
+    data_dir = tempfile.mkdtemp(prefix='bot_bench_')
+    pacing = None if keep_pacing else PacingPolicy({step: 0 for step in PacingPolicy.DEFAULTS})
+    target_accounts = [f'target{i}' for i in range(accounts)]
+    timer = PhaseTimer(data_dir)
+
+    bot = InstagramBotGUI(
+        'bench_user', 'bench_password', target_accounts, follows_per_account,
+        data_dir=data_dir, pacing=pacing, base_url=base_url, timer=timer,
+        lean=lean, track_network=True
+    )
+    phases = {}
+    chrome_rss = None
+    try:
+        started = time.perf_counter()
+        if not bot.init_driver(show_browser=show_browser):
+            raise RuntimeError("Chrome driver failed to start")
+        phases['init_driver'] = time.perf_counter() - started
+        counter = CommandCounter(bot.driver)
+
+        started = time.perf_counter()
+        if not bot.login():
+            raise RuntimeError("Login against the mock server failed")
+        phases['login'] = time.perf_counter() - started
+
+        calls_before = counter.total
+        started = time.perf_counter()
+        followed = []
+        for account in target_accounts:
+            followed.extend(bot.follow_users_from_account(account))
+        phases['follow'] = time.perf_counter() - started
+        follow_calls = counter.total - calls_before
+
+        calls_before = counter.total
+        started = time.perf_counter()
+        unfollowed = sum(1 for username in followed[:unfollows] if bot.unfollow_user(username))
+        phases['unfollow'] = time.perf_counter() - started
+        unfollow_calls = counter.total - calls_before
+        network = bot.network_usage()
+        chrome_rss = chrome_rss_mb(bot.driver)
+    finally:
+        if bot.driver:
+            bot.driver.quit()
+        bot.action_log.close()
+        timer.close()
+        server.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    follows = len(followed)
+    return {
+        'accounts': accounts,
+        'follows': follows,
+        'unfollows': unfollowed,
+        'latency_ms': latency_ms,
+        'wall_seconds': {name: round(seconds, 3) for name, seconds in phases.items()},
+        'wall_seconds_total': round(sum(phases.values()), 3),
+        'seconds_per_follow': round(phases['follow'] / follows, 3) if follows else None,
+        'webdriver_calls_per_follow': round(follow_calls / follows, 2) if follows else None,
+        'scroll_passes_per_follow': round(bot.scroll_passes / follows, 3) if follows else None,
+        'webdriver_calls_per_unfollow': round(unfollow_calls / unfollowed, 2) if unfollowed else None,
+        'webdriver_calls_by_command': dict(counter.by_command.most_common()),
+        'phase_timings': timer.summary(),
+        'mock_requests': server.state.requests,
+        'mock_requests_by_kind': dict(server.state.requests_by_kind),
+        'mock_bytes_sent': server.state.bytes_sent,
+        'lean': lean,
+        'network': network,
+        'chrome_rss_mb': chrome_rss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark InstagramBotGUI against the local mock Instagram")
+    parser.add_argument('--accounts', type=int, default=2, help="Target accounts to follow from")
+    parser.add_argument('--follows', type=int, default=25, help="Follows per target account")
+    parser.add_argument('--unfollows', type=int, default=10, help="Users to unfollow afterwards")
+    parser.add_argument('--followers', type=int, default=200, help="Followers listed per mock account")
+    parser.add_argument('--page-size', type=int, default=12, help="Rows loaded per followers-dialog page")
+    parser.add_argument('--latency-ms', type=int, default=0, help="Added latency for every mock request")
+    parser.add_argument('--keep-pacing', action='store_true', help="Keep the default pacing delays instead of zeroing them")
+    parser.add_argument('--show-browser', action='store_true')
+    parser.add_argument('--lean', action='store_true', help="Block images/media/fonts and trim Chrome (bot_settings.lean_driver)")
+    parser.add_argument('--media-kb', type=int, default=24, help="Size of each mock image/font (reels are 8x)")
+    parser.add_argument('--json', action='store_true', help="Print the raw report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    report = run_benchmark(
+        accounts=args.accounts,
+        follows_per_account=args.follows,
+        unfollows=args.unfollows,
+        followers=args.followers,
+        page_size=args.page_size,
+        latency_ms=args.latency_ms,
+        keep_pacing=args.keep_pacing,
+        show_browser=args.show_browser,
+        lean=args.lean,
+        media_kb=args.media_kb
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"📊 Benchmark: {report['follows']} follows from {report['accounts']} accounts, "
+          f"{report['unfollows']} unfollows, {report['latency_ms']}ms mock latency"
+          f"{', lean driver' if report['lean'] else ''}")
+    for phase, seconds in report['wall_seconds'].items():
+        print(f"   {phase:<12} {seconds:>8.3f}s")
+    print(f"   {'total':<12} {report['wall_seconds_total']:>8.3f}s")
+    print(f"⏱️ Seconds per follow:        {report['seconds_per_follow']}")
+    print(f"🔁 WebDriver calls per follow: {report['webdriver_calls_per_follow']}")
+    print(f"📜 Scroll passes per follow:   {report['scroll_passes_per_follow']}")
+    print(f"🔁 WebDriver calls per unfollow: {report['webdriver_calls_per_unfollow']}")
+    network = report['network'] or {}
+    print(f"🌐 Chrome network: {network.get('requests', 0)} requests, {network.get('blocked', 0)} blocked, "
+          f"{network.get('bytes', 0) / 1e6:.2f} MB downloaded")
+    print(f"🧪 Mock served: {report['mock_bytes_sent'] / 1e6:.2f} MB, {report['mock_requests_by_kind']}")
+    if report['chrome_rss_mb'] is not None:
+        print(f"💾 Chrome process tree RSS: {report['chrome_rss_mb']} MB")
+    for name, row in sorted(report['phase_timings'].items()):
+        print(f"   {name:<26} n={row['count']:<4} p50={row['p50']:.3f}s p95={row['p95']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Append-only action log
+Stores one JSON record per line so logging an action never rewrites history
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+class ActionLog:
+    def __init__(self, data_dir, fsync_policy='interval', fsync_interval=5.0, migrate=True):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy} (expected one of {', '.join(FSYNC_POLICIES)})")
+
+        self.data_dir = Path(data_dir)
+        self.path = self.data_dir / 'action_log.jsonl'
+        self.legacy_path = self.data_dir / 'action_log.json'
+
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self._last_fsync = 0.0
+        self._handle = None
+        self._lock = threading.Lock()
+
+        if migrate:
+            self.migrate_legacy()
+
+    def migrate_legacy(self):
+        """Convert a legacy action_log.json array into the JSONL log, once"""
+        if not self.legacy_path.exists():
+            return 0
+
+        try:
+            with open(self.legacy_path, 'r') as f:
+                legacy_entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(legacy_entries, list):
+            return 0
+
+        # Legacy history goes first, followed by anything already appended
+        tmp_path = self.path.with_suffix('.jsonl.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            for entry in legacy_entries:
+                out.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            if self.path.exists():
+                with open(self.path, 'r', encoding='utf-8') as existing:
+                    for line in existing:
+                        out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.replace(tmp_path, self.path)
+        self.legacy_path.rename(self.legacy_path.with_name('action_log.json.migrated'))
+        return len(legacy_entries)
+
+    def append(self, entry):
+        """Append a single record - O(1) regardless of history size"""
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._handle is None:
+                self._handle = open(self.path, 'a', encoding='utf-8')
+            self._handle.write(line)
+            self._handle.flush()
+
+            if self.fsync_policy == 'always':
+                os.fsync(self._handle.fileno())
+            elif self.fsync_policy == 'interval':
+                now = time.monotonic()
+                if now - self._last_fsync >= self.fsync_interval:
+                    os.fsync(self._handle.fileno())
+                    self._last_fsync = now
+
+    def iter_records(self):
+        """Yield every record, including a not-yet-migrated legacy array"""
+        if self.legacy_path.exists():
+            try:
+                with open(self.legacy_path, 'r') as f:
+                    legacy_entries = json.load(f)
+                if isinstance(legacy_entries, list):
+                    yield from legacy_entries
+            except (OSError, ValueError):
+                pass
+
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    continue
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+                if self.fsync_policy != 'never':
+                    os.fsync(self._handle.fileno())
+                self._handle.close()
+                self._handle = None
@@ -0,0 +1,223 @@
+"""
+Lazy reader for batch files (follow_batches.json, the extension's batches.json)
+Byte offsets and a small summary of every batch are indexed once into a sidecar;
+batches are parsed from an mmap only when asked for
+"""
+import codecs
+import json
+import logging
+import mmap
+import os
+import tempfile
+from pathlib import Path
+
+try:
+    from .storage import atomic_write_json, file_signature
+except ImportError:
+    from storage import atomic_write_json, file_signature
+
+INDEX_VERSION = 1
+
+_WHITESPACE = ' \t\r\n'
+
+logger = logging.getLogger(__name__)
+
+
+def iter_array_elements(buf, chunk_size=1 << 20):
+    """Yield (element, start, end) for each element of a top-level JSON array, with byte offsets
+
+    Parses chunk by chunk with the C decoder, so only one element and one chunk are in memory at a time
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    size = len(buf)
+    read_pos = 0
+    text = ''
+    i = 0
+    # Byte offset of text[0]; everything between elements is ASCII, one byte per character
+    base = 0
+    seen_open = False
+
+    def more():
+        nonlocal read_pos, text
+        if read_pos >= size:
+            return False
+        end = min(size, read_pos + chunk_size)
+        text += utf8.decode(buf[read_pos:end], final=end >= size)
+        read_pos = end
+        return True
+
+    while True:
+        while i < len(text) and (text[i] in _WHITESPACE or (seen_open and text[i] == ',')):
+            i += 1
+        if i >= len(text):
+            if not more():
+                raise ValueError("Unexpected end of batch file")
+            continue
+        if not seen_open:
+            if text[i] != '[':
+                raise ValueError("Batch file is not a JSON array")
+            seen_open = True
+            i += 1
+            continue
+        if text[i] == ']':
+            return
+        try:
+            element, end = decoder.raw_decode(text, i)
+        except ValueError:
+            # Element runs past the decoded text; pull in the next chunk and retry
+            if not more():
+                raise
+            continue
+        start_byte = base + i
+        end_byte = start_byte + len(text[i:end].encode('utf-8'))
+        yield element, start_byte, end_byte
+        # Drop what was consumed so memory stays bounded by one chunk
+        text = text[end:]
+        base = end_byte
+        i = 0
+
+
+def summarize(batch):
+    """What list views need from a batch, without its user list"""
+    users = batch.get('users', [])
+    return {
+        'id': batch.get('id'),
+        'timestamp': batch.get('timestamp'),
+        'source_accounts': batch.get('source_accounts', []),
+        'user_count': len(users),
+        'unfollowed_count': sum(1 for user in users if user.get('unfollowed')),
+        'completed': batch.get('completed', False),
+        'version': batch.get('version', 0)
+    }
+
+
+class LazyBatchFile:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + '.idx')
+        self.spans = []
+        self.summaries = []
+        # (mtime, size) of the file as mapped, so callers can tell when another process replaced it
+        self.signature = None
+        self._file = None
+        self._map = None
+        self.open()
+
+    def open(self):
+        """(Re)map the file, reusing the sidecar index when it matches the file's signature"""
+        self.close()
+        self.spans, self.summaries = [], []
+        signature = file_signature(self.path)
+        self.signature = signature
+        if signature is None or signature[1] == 0:
+            return
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._load_index(signature):
+            return
+        try:
+            self._build_index(signature)
+        except (ValueError, AttributeError) as e:
+            # Corrupt or truncated: start empty like the old json.load fallback, leaving the file as it is
+            logger.error(f"❌ Could not read {self.path}, starting with no batches: {e}")
+            self.close()
+            self.spans, self.summaries = [], []
+
+    def _load_index(self, signature):
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if index.get('version') != INDEX_VERSION or tuple(index.get('signature', ())) != signature:
+            return False
+        self.spans = [tuple(span) for span in index['spans']]
+        self.summaries = index['summaries']
+        return True
+
+    def _build_index(self, signature):
+        # One pass over the file; only one batch is materialized at a time
+        self.spans, self.summaries = [], []
+        for batch, start, end in iter_array_elements(self._map):
+            self.spans.append((start, end))
+            self.summaries.append(summarize(batch))
+        self._save_index(signature)
+
+    def _save_index(self, signature):
+        try:
+            atomic_write_json(self.index_path, {
+                'version': INDEX_VERSION,
+                'signature': list(signature),
+                'spans': self.spans,
+                'summaries': self.summaries
+            })
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self.spans)
+
+    def raw(self, index):
+        start, end = self.spans[index]
+        return self._map[start:end]
+
+    def load(self, index):
+        return json.loads(self.raw(index))
+
+    def __iter__(self):
+        for index in range(len(self.spans)):
+            yield self.load(index)
+
+    def rewrite(self, items):
+        """Stream a new file from items, each an existing index (copied raw) or a batch dict
+
+        Returns the new summaries; the reader is remapped onto the new file
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f'.{self.path.name}.', suffix='.tmp', dir=str(self.path.parent))
+        spans, summaries = [], []
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(b'[\n')
+                offset = 2
+                for n, item in enumerate(items):
+                    if n:
+                        out.write(b',\n')
+                        offset += 2
+                    if isinstance(item, int):
+                        data = self.raw(item)
+                        summary = self.summaries[item]
+                    else:
+                        data = json.dumps(item, indent=2).encode('utf-8')
+                        summary = summarize(item)
+                    out.write(data)
+                    spans.append((offset, offset + len(data)))
+                    summaries.append(summary)
+                    offset += len(data)
+                out.write(b'\n]\n')
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+        self.close()
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.spans, self.summaries = spans, summaries
+        self.signature = file_signature(self.path)
+        self._save_index(self.signature)
+        return summaries
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,262 @@
+"""
+Follow batch store
+Serializes batch mutations under one lock and coalesces saves into at most one atomic write per interval.
+Batches are read lazily from an mmap (see batch_reader); only changed or recently used ones live in memory
+"""
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from .batch_reader import LazyBatchFile, summarize
+    from .storage import file_signature
+except ImportError:
+    from batch_reader import LazyBatchFile, summarize
+    from storage import file_signature
+
+
+def batch_key(batch):
+    return batch.get('id') or batch.get('timestamp')
+
+
+def merge_batch_copy(batch, other):
+    """Fold another process's copy of the same batch into batch, in place
+
+    Users are merged by username and an unfollow or completion on either side is kept
+    """
+    users = {user['username']: user for user in batch.setdefault('users', [])}
+    for user in other.get('users', []):
+        mine = users.get(user['username'])
+        if mine is None:
+            batch['users'].append(user)
+        elif user.get('unfollowed') and not mine.get('unfollowed'):
+            mine['unfollowed'] = True
+            mine['unfollowed_at'] = user.get('unfollowed_at')
+    for account in other.get('source_accounts', []):
+        if account not in batch.setdefault('source_accounts', []):
+            batch['source_accounts'].append(account)
+    if other.get('completed'):
+        batch['completed'] = True
+    batch['version'] = max(batch.get('version', 0), other.get('version', 0)) + 1
+
+
+class BatchStore:
+    def __init__(self, batches_file, save_interval=2.0, cache_size=64):
+        self.batches_file = Path(batches_file)
+        self.save_interval = save_interval
+        self.cache_size = cache_size
+        # Held by any thread reading or mutating batches (or the dicts inside them)
+        self.lock = threading.RLock()
+        self._generation = 0
+        self._saved_generation = 0
+        self._timer = None
+        # Every username in any batch, built on first use and kept current by add_user
+        self._followed = None
+
+        self.reader = LazyBatchFile(self.batches_file)
+        self._index_reader()
+
+    def _index_reader(self):
+        self.order = []
+        self._summaries = {}
+        self._file_index = {}
+        for index, summary in enumerate(self.reader.summaries):
+            key = batch_key(summary)
+            self.order.append(key)
+            self._summaries[key] = summary
+            self._file_index[key] = index
+        # Changed or new batches, held until written
+        self._dirty = {}
+        # Batches deleted here since the last write, so a merge with another process's file keeps them gone
+        self._deleted = set()
+        # Clean batches materialized recently, evicted least-recently-used first
+        self._cache = OrderedDict()
+
+    def changed(self):
+        """Has another process replaced the file since it was mapped? Costs one stat"""
+        return file_signature(self.batches_file) != self.reader.signature
+
+    def reload(self):
+        """Pick up changes another process wrote; skipped while this store has unsaved changes"""
+        with self.lock:
+            if self._generation != self._saved_generation or not self.changed():
+                return False
+            self.reader.open()
+            self._index_reader()
+            self._refresh_followed()
+            return True
+
+    def summaries(self):
+        """Per-batch summaries (no user lists) in file order"""
+        with self.lock:
+            return [self._summaries[key] for key in self.order]
+
+    def summary(self, key):
+        with self.lock:
+            return self._summaries.get(key)
+
+    def get(self, key):
+        """The full batch, parsed from the file on first use"""
+        with self.lock:
+            if key in self._dirty:
+                return self._dirty[key]
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            if key not in self._file_index:
+                return None
+            batch = self.reader.load(self._file_index[key])
+            self._cache[key] = batch
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return batch
+
+    def iter_batches(self):
+        """Every batch in file order without keeping them in memory"""
+        for key in list(self.order):
+            with self.lock:
+                batch = self._dirty.get(key) or self._cache.get(key)
+                if batch is None and key in self._file_index:
+                    batch = self.reader.load(self._file_index[key])
+            if batch is not None:
+                yield batch
+
+    def add(self, batch):
+        with self.lock:
+            key = batch_key(batch)
+            self.order.append(key)
+            self._mark_dirty(batch)
+            if self._followed is not None:
+                self._followed.update(user['username'] for user in batch.get('users', []))
+        self.save()
+
+    def _mark_dirty(self, batch):
+        key = batch_key(batch)
+        self._cache.pop(key, None)
+        self._dirty[key] = batch
+        self._summaries[key] = summarize(batch)
+        # Every mutation counts as unsaved, so reload() cannot drop it and flush() cannot skip it
+        self._generation += 1
+
+    def mark_changed(self, batch):
+        """Record an in-place change to batch; bumps its version so list views rebuild its row"""
+        with self.lock:
+            batch['version'] = batch.get('version', 0) + 1
+            self._mark_dirty(batch)
+
+    def followed_usernames(self):
+        """Set of usernames ever added to a batch; deleting a batch does not remove them"""
+        with self.lock:
+            if self._followed is None:
+                self._followed = {u['username'] for b in self.iter_batches() for u in b.get('users', [])}
+            return self._followed
+
+    def add_user(self, batch, user):
+        with self.lock:
+            batch['users'].append(user)
+            self._mark_dirty(batch)
+            if self._followed is not None:
+                self._followed.add(user['username'])
+
+    def set_completed(self, batch):
+        with self.lock:
+            batch['completed'] = True
+            self._mark_dirty(batch)
+
+    def delete(self, key):
+        with self.lock:
+            if key not in self._summaries:
+                return False
+            self.order = [k for k in self.order if k != key]
+            del self._summaries[key]
+            self._dirty.pop(key, None)
+            self._cache.pop(key, None)
+            self._deleted.add(key)
+            self._generation += 1
+        self.save()
+        return True
+
+    def save(self):
+        """Mark the store dirty; the write happens at most once per save_interval"""
+        with self.lock:
+            self._generation += 1
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.save_interval, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        with self.lock:
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        """Write pending changes now - used when a batch completes and on shutdown
+
+        Untouched batches are copied byte-for-byte from the old file, so this never loads the whole file.
+        If another process replaced the file meanwhile, its batches are merged in rather than overwritten
+        """
+        with self.lock:
+            if self._generation == self._saved_generation:
+                return False
+            if self.changed():
+                self._merge_file()
+            items = [self._dirty[key] if key in self._dirty else self._file_index[key] for key in self.order]
+            self.reader.rewrite(items)
+            self._file_index = {key: index for index, key in enumerate(self.order)}
+            for key, batch in self._dirty.items():
+                self._cache[key] = batch
+            self._dirty = {}
+            self._deleted = set()
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self._saved_generation = self._generation
+        return True
+
+    def _merge_file(self):
+        """Remap the file another process wrote and lay this store's unsaved changes over it"""
+        order, dirty, deleted = self.order, self._dirty, self._deleted
+        self.reader.open()
+        self._index_reader()
+        self._deleted = deleted
+        self.order = [key for key in self.order if key not in deleted]
+        for key in order:
+            batch = dirty.get(key)
+            if batch is None:
+                continue
+            if key in self._file_index:
+                merge_batch_copy(batch, self.reader.load(self._file_index[key]))
+            else:
+                self.order.append(key)
+            self._mark_dirty(batch)
+        self._refresh_followed()
+
+    def _refresh_followed(self):
+        # Updated in place rather than dropped: bots hold this set through FollowedIndex
+        if self._followed is not None:
+            self._followed.update(u['username'] for b in self.iter_batches() for u in b.get('users', []))
+
+    def close(self):
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.flush()
+        self.reader.close()
+
+
+class FollowedIndex:
+    """O(1) 'already followed ever' check across every batch and the follow ledger
+
+    Used as the bot's follows_data so known users are skipped before any click
+    """
+
+    def __init__(self, usernames, ledger=None):
+        self.usernames = usernames
+        self.ledger = ledger
+
+    def __contains__(self, username):
+        if username in self.usernames:
+            return True
+        return self.ledger is not None and username in self.ledger
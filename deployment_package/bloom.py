@@ -0,0 +1,176 @@
+"""
+Compact "ever followed" prefilter
+A Bloom filter in a memory-mapped file; a miss is definitive, a hit is confirmed against the ledger
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+MAGIC = b'IGBLOOM2'
+# magic, size in bits, hash count, capacity, items added, ledger rows covered
+HEADER = struct.Struct('<8sQIQQQ')
+
+
+def _optimal_params(capacity, error_rate):
+    bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, int(round(bits / capacity * math.log(2))))
+    return bits, hashes
+
+
+class BloomFilter:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.bits, self.hashes, self.capacity, self.count, self.ledger_rows = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self.bits // 8:
+            self.close()
+            raise ValueError(f"{self.path} is not a bloom filter file")
+
+    @classmethod
+    def create(cls, path, capacity, error_rate=0.001):
+        """Write an empty filter sized for capacity items, replacing any existing file"""
+        bits, hashes = _optimal_params(capacity, error_rate)
+        path = Path(path)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, bits, hashes, capacity, 0, 0))
+            f.truncate(HEADER.size + bits // 8)
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    def _positions(self, username):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(username.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def __contains__(self, username):
+        offset = HEADER.size
+        for pos in self._positions(username):
+            if not self._map[offset + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, username):
+        offset = HEADER.size
+        with self._lock:
+            for pos in self._positions(username):
+                index = offset + (pos >> 3)
+                self._map[index] |= 1 << (pos & 7)
+            # Counted on top of what every process sharing the file has added so far
+            self.count = max(self.count, HEADER.unpack_from(self._map, 0)[4]) + 1
+            self._write_header()
+
+    def _write_header(self):
+        """Store count and ledger_rows, never lowering values another process wrote to the shared map"""
+        count, ledger_rows = HEADER.unpack_from(self._map, 0)[4:]
+        self.count = max(self.count, count)
+        self.ledger_rows = max(self.ledger_rows, ledger_rows)
+        HEADER.pack_into(self._map, 0, MAGIC, self.bits, self.hashes, self.capacity, self.count, self.ledger_rows)
+
+    def mark_synced(self, ledger_rows):
+        """Record that every one of the ledger's ledger_rows users has been added"""
+        with self._lock:
+            self.ledger_rows = ledger_rows
+            self._write_header()
+
+    def advance(self, added, ledger_rows):
+        """After adding the users of `added` new ledger rows, move the synced row count to ledger_rows
+
+        Only when nothing else grew the ledger meanwhile; otherwise the count is left behind so the
+        next open_bloom rebuilds. The header is re-read because other processes share the mapping
+        """
+        with self._lock:
+            stored = HEADER.unpack_from(self._map, 0)[5]
+            if stored + added != ledger_rows:
+                return False
+            self.ledger_rows = ledger_rows
+            self._write_header()
+            return True
+
+    @property
+    def saturated(self):
+        return self.count > self.capacity
+
+    def flush(self):
+        with self._lock:
+            self._map.flush()
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+BLOOM_FILE = 'followed.bloom'
+
+
+def open_bloom(data_dir, ledger, error_rate=0.001, min_capacity=100000):
+    """Open followed.bloom for data_dir, (re)building it from the ledger when missing, stale or full"""
+    path = Path(data_dir) / BLOOM_FILE
+    known = len(ledger)
+    bloom = None
+    if path.exists():
+        try:
+            bloom = BloomFilter(path)
+        except (OSError, ValueError):
+            bloom = None
+    # Ledgers never drop rows, so any other row count means the ledger changed behind the filter's back
+    if bloom is not None and (bloom.saturated or bloom.ledger_rows != known):
+        bloom.close()
+        bloom = None
+    if bloom is None:
+        bloom = BloomFilter.create(path, max(min_capacity, known * 2), error_rate)
+        for username in ledger.usernames():
+            bloom.add(username)
+        bloom.mark_synced(known)
+        bloom.flush()
+    return bloom
+
+
+def add_to_bloom(data_dir, usernames, rows_before, rows_after):
+    """Add usernames written to the ledger by another tool to data_dir's filter, if it has one
+
+    rows_before/rows_after are the ledger's row counts around that write
+
+    The file is shared-mapped, so bots that already have it open see the new names at once.
+    An unreadable file is removed and rebuilt from the ledger by the next open_bloom
+    """
+    path = Path(data_dir) / BLOOM_FILE
+    if not path.exists():
+        return
+    try:
+        bloom = BloomFilter(path)
+    except (OSError, ValueError):
+        path.unlink(missing_ok=True)
+        return
+    try:
+        for username in usernames:
+            bloom.add(username)
+        bloom.advance(rows_after - rows_before, rows_after)
+    finally:
+        bloom.close()
+
+
+class PrefilteredMembership:
+    """'in' answered by the Bloom filter, with an exact ledger lookup only on a positive hit"""
+
+    def __init__(self, bloom, exact):
+        self.bloom = bloom
+        self.exact = exact
+
+    def __contains__(self, username):
+        return username in self.bloom and username in self.exact
@@ -0,0 +1,307 @@
+"""
+Validated, change-driven configuration
+config.json is parsed and checked once per change into frozen dataclasses; a watcher thread only
+stats the file, and subscribers hear about the sections that actually changed
+"""
+import json
+import logging
+import threading
+import typing
+from dataclasses import dataclass, field, fields, is_dataclass
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+try:
+    from .action_log import FSYNC_POLICIES
+    from .ledger import LEDGER_BACKENDS
+    from .storage import atomic_write_json, file_signature
+except ImportError:
+    from action_log import FSYNC_POLICIES
+    from ledger import LEDGER_BACKENDS
+    from storage import atomic_write_json, file_signature
+
+class ConfigError(ValueError):
+    pass
+
+
+def _require(ok, path, message):
+    if not ok:
+        raise ConfigError(f"{path} {message}")
+
+
+@dataclass(frozen=True)
+class InstagramConfig:
+    username: str = ""
+    password: str = ""
+    target_accounts: Tuple[str, ...] = ()
+    users_per_account: int = 5
+    daily_follow_limit: int = 15
+    daily_unfollow_limit: int = 50
+    unfollow_after_hours: float = 48.0
+
+    def __post_init__(self):
+        accounts = tuple(a.strip().lstrip('@') for a in self.target_accounts if a.strip().lstrip('@'))
+        object.__setattr__(self, 'target_accounts', accounts)
+        _require(self.users_per_account >= 0, 'instagram.users_per_account', "must be 0 or more")
+        _require(self.daily_follow_limit >= 0, 'instagram.daily_follow_limit', "must be 0 or more")
+        _require(self.daily_unfollow_limit >= 0, 'instagram.daily_unfollow_limit', "must be 0 or more")
+        _require(self.unfollow_after_hours > 0, 'instagram.unfollow_after_hours', "must be positive")
+
+
+@dataclass(frozen=True)
+class ScheduleConfig:
+    follow_time: str = "09:00"
+    unfollow_interval_minutes: int = 30
+
+    def __post_init__(self):
+        try:
+            datetime.strptime(self.follow_time, '%H:%M')
+        except ValueError:
+            raise ConfigError(f"schedule.follow_time must be HH:MM, got {self.follow_time!r}")
+        _require(self.unfollow_interval_minutes >= 1, 'schedule.unfollow_interval_minutes', "must be at least 1")
+
+
+@dataclass(frozen=True)
+class EmailConfig:
+    enabled: bool = False
+    smtp_server: str = "smtp.gmail.com"
+    smtp_port: int = 587
+    sender_email: str = ""
+    sender_password: str = ""
+    recipient_email: str = ""
+    use_tls: bool = True
+    daily_report: bool = True
+    error_alerts: bool = True
+
+    def __post_init__(self):
+        _require(0 < self.smtp_port < 65536, 'notifications.email.smtp_port', "must be a TCP port")
+
+
+@dataclass(frozen=True)
+class DiscordConfig:
+    enabled: bool = False
+    webhook_url: str = ""
+    daily_report: bool = True
+    error_alerts: bool = True
+
+    def __post_init__(self):
+        _require(not self.enabled or self.webhook_url.startswith(('http://', 'https://')),
+                 'notifications.discord.webhook_url', "must be an http(s) URL when Discord is enabled")
+
+
+@dataclass(frozen=True)
+class NotificationsConfig:
+    email: EmailConfig = field(default_factory=EmailConfig)
+    discord: DiscordConfig = field(default_factory=DiscordConfig)
+
+
+@dataclass(frozen=True)
+class DashboardConfig:
+    enabled: bool = True
+    port: int = 5000
+    password: str = "admin123"
+    host: str = "0.0.0.0"
+
+    def __post_init__(self):
+        _require(0 < self.port < 65536, 'web_dashboard.port', "must be a TCP port")
+
+
+@dataclass(frozen=True)
+class BotSettings:
+    action_log_fsync: str = "interval"
+    ledger_backend: str = "json"
+    bloom_prefilter: bool = False
+    reuse_driver: bool = False
+    driver_max_cycles: int = 10
+    driver_max_hours: float = 12.0
+    timing: bool = True
+    # Block images/media/fonts and trim Chrome (lean_driver.py); network_stats logs requests/bytes per cycle
+    lean_driver: bool = False
+    network_stats: bool = False
+    # Chrome process tree limits checked by ResourceWatchdog; 0 turns a limit off
+    watchdog_rss_limit_mb: int = 1500
+    watchdog_cpu_limit_percent: float = 0.0
+    watchdog_interval_seconds: float = 5.0
+    # step -> (low, high) seconds; see PacingPolicy
+    pacing: Mapping[str, Tuple[float, float]] = field(default_factory=lambda: MappingProxyType({}))
+
+    def __post_init__(self):
+        _require(self.action_log_fsync in FSYNC_POLICIES, 'bot_settings.action_log_fsync',
+                 f"must be one of {', '.join(FSYNC_POLICIES)}")
+        _require(self.ledger_backend in LEDGER_BACKENDS, 'bot_settings.ledger_backend',
+                 f"must be one of {', '.join(LEDGER_BACKENDS)}")
+        _require(self.driver_max_cycles >= 1, 'bot_settings.driver_max_cycles', "must be at least 1")
+        _require(self.driver_max_hours > 0, 'bot_settings.driver_max_hours', "must be positive")
+        _require(self.watchdog_rss_limit_mb >= 0, 'bot_settings.watchdog_rss_limit_mb', "must be 0 or more")
+        _require(self.watchdog_cpu_limit_percent >= 0, 'bot_settings.watchdog_cpu_limit_percent', "must be 0 or more")
+        _require(self.watchdog_interval_seconds > 0, 'bot_settings.watchdog_interval_seconds', "must be positive")
+        for step, (low, high) in self.pacing.items():
+            _require(0 <= low <= high, f'bot_settings.pacing.{step}', "must be [low, high] with 0 <= low <= high")
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    level: str = "INFO"
+    # JSON lines instead of plain text, for jq and log shippers
+    json_format: bool = False
+    # Gzipped daily files kept after rotation
+    backup_days: int = 14
+
+    def __post_init__(self):
+        object.__setattr__(self, 'level', self.level.upper())
+        _require(isinstance(logging.getLevelName(self.level), int), 'logging.level',
+                 "must be DEBUG, INFO, WARNING, ERROR or CRITICAL")
+        _require(self.backup_days >= 0, 'logging.backup_days', "must be 0 or more")
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    instagram: InstagramConfig = field(default_factory=InstagramConfig)
+    schedule: ScheduleConfig = field(default_factory=ScheduleConfig)
+    notifications: NotificationsConfig = field(default_factory=NotificationsConfig)
+    web_dashboard: DashboardConfig = field(default_factory=DashboardConfig)
+    bot_settings: BotSettings = field(default_factory=BotSettings)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+
+
+def _coerce(hint, value, path, unknown):
+    if is_dataclass(hint):
+        return _build(hint, value, path, unknown)
+    if hint is bool:
+        _require(isinstance(value, bool), path, f"must be true or false, got {value!r}")
+        return value
+    if hint is int:
+        _require(isinstance(value, int) and not isinstance(value, bool), path, f"must be a whole number, got {value!r}")
+        return value
+    if hint is float:
+        _require(isinstance(value, (int, float)) and not isinstance(value, bool), path, f"must be a number, got {value!r}")
+        return float(value)
+    if hint is str:
+        _require(isinstance(value, str), path, f"must be a string, got {value!r}")
+        return value
+    origin = typing.get_origin(hint)
+    if origin is tuple:
+        # Tuple[str, ...]: a list of strings
+        _require(isinstance(value, (list, tuple)), path, "must be a list")
+        return tuple(_coerce(str, item, f"{path}[{i}]", unknown) for i, item in enumerate(value))
+    if origin is not None and issubclass(origin, Mapping):
+        # Pacing map: each step is a number or a [low, high] pair
+        _require(isinstance(value, dict), path, "must be an object")
+        steps = {}
+        for step, bounds in value.items():
+            bounds = bounds if isinstance(bounds, (list, tuple)) else [bounds, bounds]
+            _require(len(bounds) == 2, f"{path}.{step}", "must be a number or [low, high]")
+            steps[step] = tuple(_coerce(float, bound, f"{path}.{step}", unknown) for bound in bounds)
+        return MappingProxyType(steps)
+    raise TypeError(f"No validator for {hint!r} at {path}")
+
+
+def _build(cls, data, path, unknown):
+    if data is None:
+        data = {}
+    _require(isinstance(data, dict), path, "must be an object")
+    hints = typing.get_type_hints(cls)
+    names = {f.name for f in fields(cls)}
+    unknown.extend(f"{path}.{key}".lstrip('.') for key in data if key not in names)
+    values = {f.name: _coerce(hints[f.name], data[f.name], f"{path}.{f.name}".lstrip('.'), unknown)
+              for f in fields(cls) if f.name in data}
+    return cls(**values)
+
+
+def validate_config(raw, unknown=None):
+    """Check a parsed config.json and return it as a BotConfig; raises ConfigError naming the bad key
+
+    Keys the bot does not know are ignored; pass a list as unknown to collect their paths
+    """
+    return _build(BotConfig, raw, '', unknown if unknown is not None else [])
+
+
+def as_dict(value):
+    """Plain JSON-style dicts and lists from a config section"""
+    if is_dataclass(value):
+        return {f.name: as_dict(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, Mapping):
+        return {key: as_dict(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [as_dict(item) for item in value]
+    return value
+
+
+# Written for new installs. It is the dataclass defaults spelled out, so a key missing from an
+# older config.json means exactly what a freshly written file says
+DEFAULT_CONFIG = as_dict(BotConfig())
+
+
+class ConfigService:
+    def __init__(self, config_file, logger, poll_interval=2.0):
+        self.config_file = Path(config_file)
+        self.logger = logger
+        self.poll_interval = poll_interval
+        self.config = BotConfig()
+        self._signature = None
+        self._subscribers = {}
+        self._watcher = None
+        self._stop = threading.Event()
+
+        if not self.config_file.exists():
+            atomic_write_json(self.config_file, DEFAULT_CONFIG, indent=2)
+            self.logger.info(f"📝 Created default config file: {self.config_file}")
+        self.reload()
+
+    def subscribe(self, section, callback):
+        """callback(new_section, old_section) runs when that top-level section changes"""
+        self._subscribers.setdefault(section, []).append(callback)
+
+    def changed(self):
+        """Cheap check: has config.json been rewritten since it was last applied?"""
+        return file_signature(self.config_file) != self._signature
+
+    def reload(self):
+        """Parse, validate and apply config.json if it changed; an invalid file keeps the current config
+
+        Returns the names of the sections that changed
+        """
+        signature = file_signature(self.config_file)
+        if signature == self._signature:
+            return []
+        # Remember the signature even on failure, so a bad file is reported once rather than every poll
+        self._signature = signature
+        unknown = []
+        try:
+            with open(self.config_file, 'r') as f:
+                config = validate_config(json.load(f), unknown)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"❌ Invalid config, keeping the previous one: {e}")
+            return []
+        if unknown:
+            self.logger.warning(f"⚠️ Ignoring unknown config keys: {', '.join(unknown)}")
+
+        old, self.config = self.config, config
+        changed = [f.name for f in fields(BotConfig) if getattr(old, f.name) != getattr(config, f.name)]
+        for section in changed:
+            for callback in self._subscribers.get(section, []):
+                try:
+                    callback(getattr(config, section), getattr(old, section))
+                except Exception as e:
+                    self.logger.error(f"❌ Error applying {section} config: {e}")
+        if changed:
+            self.logger.info(f"✅ Configuration loaded ({', '.join(changed)} changed)")
+        return changed
+
+    def watch(self, on_change):
+        """Poll config.json's (mtime, size) in the background and call on_change when it moves
+
+        on_change should hand off to the thread that calls reload(), so subscribers run there
+        """
+        def run():
+            while not self._stop.wait(self.poll_interval):
+                if self.changed():
+                    on_change()
+
+        self._watcher = threading.Thread(target=run, name='config-watcher', daemon=True)
+        self._watcher.start()
+
+    def close(self):
+        self._stop.set()
@@ -0,0 +1,111 @@
+"""
+Warm WebDriver holder for the server process
+Keeps one logged-in bot alive between scheduled cycles and recycles it periodically
+"""
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+
+class WarmDriverHolder:
+    def __init__(self, bot_factory, logger, max_cycles=10, max_hours=12, show_browser=False, metrics=None):
+        self.bot_factory = bot_factory
+        self.logger = logger
+        # Optional MetricsRegistry for launch/restart counters
+        self.metrics = metrics
+        self.max_cycles = max_cycles
+        self.max_hours = max_hours
+        self.show_browser = show_browser
+
+        self.bot = None
+        self.started_at = None
+        self.cycles_on_driver = 0
+
+        # Lifetime counters, reported in the logs after every acquire
+        self.launches = 0
+        self.reuses = 0
+        self.recycles = 0
+
+    def acquire(self, target_accounts, users_per_account):
+        """Return a logged-in bot, reusing the warm driver when it is still healthy"""
+        if self.bot is not None:
+            reason = self._recycle_reason()
+            if reason:
+                self.recycles += 1
+                self._count_restart('age')
+                self.discard(reason)
+            elif not self._is_healthy():
+                self.recycles += 1
+                self._count_restart('unhealthy')
+                self.discard("health check failed")
+
+        if self.bot is None:
+            self._launch()
+        else:
+            self.reuses += 1
+
+        self.cycles_on_driver += 1
+        self.bot.target_accounts = target_accounts
+        self.bot.users_per_account = users_per_account
+        self.logger.info(
+            f"♻️ Driver pool: cycle {self.cycles_on_driver} on current driver "
+            f"(launches={self.launches}, reuses={self.reuses}, recycles={self.recycles})"
+        )
+        return self.bot
+
+    def _launch(self):
+        bot = self.bot_factory()
+        if not bot.init_driver(show_browser=self.show_browser):
+            raise Exception("Failed to initialize Chrome driver")
+        if not bot.login():
+            if bot.driver:
+                bot.driver.quit()
+            raise Exception("Failed to login to Instagram")
+
+        self.bot = bot
+        self.started_at = time.monotonic()
+        self.cycles_on_driver = 0
+        self.launches += 1
+        if self.metrics:
+            self.metrics.inc('instagram_bot_driver_launches_total')
+
+    def _count_restart(self, reason):
+        if self.metrics:
+            self.metrics.inc('instagram_bot_driver_restarts_total', {'reason': reason})
+
+    def _recycle_reason(self):
+        if self.max_cycles and self.cycles_on_driver >= self.max_cycles:
+            return f"reached {self.max_cycles} cycles"
+        if self.max_hours and time.monotonic() - self.started_at >= self.max_hours * 3600:
+            return f"older than {self.max_hours}h"
+        return None
+
+    def _is_healthy(self):
+        """Driver still answers and the Instagram session is still logged in"""
+        # A failed mid-cycle restart leaves the bot without a driver
+        if self.bot.driver is None:
+            return False
+        try:
+            self.bot.driver.current_url
+        except WebDriverException:
+            return False
+        if self.bot.is_logged_in():
+            return True
+        # Session dropped but the browser is fine - a re-login is cheaper than a relaunch
+        return self.bot.login()
+
+    def discard(self, reason):
+        """Quit the current driver; the next acquire launches a fresh one"""
+        if self.bot is None:
+            return
+        self.logger.info(f"♻️ Driver pool: recycling driver ({reason})")
+        try:
+            if self.bot.driver:
+                self.bot.driver.quit()
+        except WebDriverException:
+            pass
+        self.bot = None
+        self.cycles_on_driver = 0
+
+    def shutdown(self):
+        self.discard("shutdown")
@@ -0,0 +1,98 @@
+"""
+Live activity events
+One tailer thread follows action_log.jsonl and fans new records out to any number of subscribers
+"""
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+LIVE_ACTIONS = ('follow', 'unfollow', 'error')
+
+
+class ActionLogTailer:
+    def __init__(self, data_dir, poll_interval=0.5, queue_size=100, actions=LIVE_ACTIONS):
+        self.path = Path(data_dir) / 'action_log.jsonl'
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.actions = set(actions)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self):
+        """Queue receiving every new live record; starts the tailer on first use"""
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='action-log-tailer', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, entry):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(entry)
+            except queue.Full:
+                # A stalled viewer loses events rather than holding up everyone else
+                pass
+
+    def _run(self):
+        handle = None
+        inode = None
+        partial = ''
+        while True:
+            try:
+                if handle is None:
+                    handle = open(self.path, 'r', encoding='utf-8')
+                    inode = os.fstat(handle.fileno()).st_ino
+                    # Viewers only care about what happens from now on
+                    handle.seek(0, os.SEEK_END)
+                    partial = ''
+
+                chunk = handle.read()
+                if chunk:
+                    lines = (partial + chunk).split('\n')
+                    partial = lines.pop()
+                    for line in lines:
+                        self._dispatch(line)
+                    continue
+
+                # Log replaced (legacy migration) or truncated: start over on the new file
+                st = os.stat(self.path)
+                if st.st_ino != inode or st.st_size < handle.tell():
+                    handle.close()
+                    handle = open(self.path, 'r', encoding='utf-8')
+                    inode = os.fstat(handle.fileno()).st_ino
+                    partial = ''
+                    continue
+            except OSError:
+                if handle is not None:
+                    handle.close()
+                    handle = None
+            time.sleep(self.poll_interval)
+
+    def _dispatch(self, line):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return
+        if entry.get('action') in self.actions:
+            self.publish(entry)
+
+
+def format_sse(entry):
+    """One server-sent event; the action doubles as the event type"""
+    return f"event: {entry.get('action', 'message')}\ndata: {json.dumps(entry, ensure_ascii=False)}\n\n"
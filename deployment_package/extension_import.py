@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Chrome extension import
+Merges batches.json exports from the extension into the follow ledger and follow_batches.json.
+A cursor in the data dir remembers each export's checksum and a digest of every batch it has merged,
+so re-syncing a grown export only parses the file once and only merges batches that changed
+"""
+import argparse
+import hashlib
+import json
+import mmap
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from .batch_reader import iter_array_elements
+    from .batch_store import BatchStore, batch_key
+    from .bloom import add_to_bloom
+    from .config_service import BotSettings, validate_config
+    from .ledger import LEDGER_BACKENDS, batch_rows, open_ledger
+    from .storage import atomic_write_json, file_signature
+except ImportError:
+    from batch_reader import iter_array_elements
+    from batch_store import BatchStore, batch_key
+    from bloom import add_to_bloom
+    from config_service import BotSettings, validate_config
+    from ledger import LEDGER_BACKENDS, batch_rows, open_ledger
+    from storage import atomic_write_json, file_signature
+
+CURSOR_FILE = 'extension_import.json'
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImportCursor:
+    """What has already been imported: exports by path and batch digests by batch id"""
+
+    def __init__(self, data_dir):
+        self.path = Path(data_dir) / CURSOR_FILE
+        self.exports = {}
+        self.batches = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                self.exports = data.get('exports', {})
+                self.batches = data.get('batches', {})
+            except (OSError, ValueError):
+                pass
+
+    def seen_checksum(self, sha256):
+        return any(export.get('sha256') == sha256 for export in self.exports.values())
+
+    def save(self):
+        atomic_write_json(self.path, {'exports': self.exports, 'batches': self.batches}, indent=2)
+
+
+def local_isoformat(value):
+    """Extension timestamps are UTC with a 'Z'; the GUI writes and compares naive local ones"""
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return value
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def localize_batch(batch):
+    """Copy of an extension batch with every timestamp in the GUI's naive local form"""
+    users = []
+    for user in batch.get('users', []):
+        user = dict(user)
+        for field in ('followed_at', 'unfollowed_at'):
+            if user.get(field):
+                user[field] = local_isoformat(user[field])
+        users.append(user)
+    batch = dict(batch, users=users)
+    if batch.get('timestamp'):
+        batch['timestamp'] = local_isoformat(batch['timestamp'])
+    return batch
+
+
+def merge_batch(store, incoming):
+    """Merge one extension batch into the store by batch id, deduplicating users by username
+
+    Returns how many users were new to the batch
+    """
+    incoming = localize_batch(incoming)
+    key = batch_key(incoming)
+    with store.lock:
+        existing = store.get(key)
+        if existing is None:
+            users, seen = [], set()
+            for user in incoming.get('users', []):
+                if user.get('username') and user['username'] not in seen:
+                    seen.add(user['username'])
+                    users.append(dict(user))
+            store.add(dict(incoming, users=users))
+            return len(users)
+
+        known = {user['username']: user for user in existing.get('users', [])}
+        added = 0
+        changed = False
+        for user in incoming.get('users', []):
+            username = user.get('username')
+            if not username:
+                continue
+            current = known.get(username)
+            if current is None:
+                current = dict(user)
+                known[username] = current
+                store.add_user(existing, current)
+                added += 1
+            elif user.get('unfollowed') and not current.get('unfollowed'):
+                current['unfollowed'] = True
+                current['unfollowed_at'] = user.get('unfollowed_at')
+                changed = True
+        for account in incoming.get('source_accounts', []):
+            if account not in existing.setdefault('source_accounts', []):
+                existing['source_accounts'].append(account)
+                changed = True
+        if incoming.get('completed') and not existing.get('completed'):
+            existing['completed'] = True
+            changed = True
+        if added or changed:
+            store.mark_changed(existing)
+    return added
+
+
+def import_export(export_path, store, ledger, cursor, force=False):
+    """Merge one batches.json export; returns counts, or None when it was already imported"""
+    export_path = Path(export_path)
+    export_key = str(export_path.resolve())
+    signature = file_signature(export_path)
+    if signature is None:
+        raise FileNotFoundError(export_path)
+
+    previous = cursor.exports.get(export_key)
+    if not force and previous and tuple(previous.get('signature', ())) == signature:
+        return None
+    sha256 = file_sha256(export_path)
+    if not force and cursor.seen_checksum(sha256):
+        # Same bytes under a new mtime or path; just remember the new signature
+        cursor.exports[export_key] = dict(previous or {}, signature=list(signature), sha256=sha256)
+        cursor.save()
+        return None
+
+    result = {'batches': 0, 'changed': 0, 'users': 0}
+    rows = []
+    digests = {}
+    if signature[1]:
+        with open(export_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for batch, start, end in iter_array_elements(buf):
+                result['batches'] += 1
+                key = batch_key(batch)
+                digest = hashlib.blake2b(buf[start:end], digest_size=16).hexdigest()
+                if not key or (not force and cursor.batches.get(key) == digest):
+                    continue
+                result['users'] += merge_batch(store, batch)
+                rows.extend(batch_rows([batch]))
+                digests[key] = digest
+                result['changed'] += 1
+
+    # The cursor is written last, so an interrupted import is simply redone
+    rows_before = len(ledger)
+    ledger.merge_history(rows)
+    ledger.flush()
+    # Without this a bot's prefilter would report these users as never followed
+    add_to_bloom(cursor.path.parent, {row[0] for row in rows}, rows_before, len(ledger))
+    store.flush()
+    cursor.batches.update(digests)
+    cursor.exports[export_key] = {
+        'signature': list(signature),
+        'sha256': sha256,
+        'batches': result['batches'],
+        'imported_at': datetime.now().isoformat()
+    }
+    cursor.save()
+    return result
+
+
+def configured_backend(config_file):
+    """The ledger backend the server uses, so imports land where it reads"""
+    try:
+        with open(config_file, 'r') as f:
+            return validate_config(json.load(f)).bot_settings.ledger_backend
+    except (OSError, ValueError):
+        # ConfigService runs on the defaults when config.json is missing or invalid
+        return BotSettings().ledger_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge Chrome extension batches.json exports into the bot's data")
+    parser.add_argument('data_dir', help="Directory holding follows.json/follows.db and follow_batches.json")
+    parser.add_argument('exports', nargs='+', help="batches.json files exported from the extension")
+    parser.add_argument('--ledger-backend', choices=LEDGER_BACKENDS,
+                        help="Defaults to bot_settings.ledger_backend from the server's config.json")
+    parser.add_argument('--config', help="Server config.json (default: next to data_dir)")
+    parser.add_argument('--force', action='store_true', help="Re-merge every batch even if the cursor has seen it")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    backend = args.ledger_backend or configured_backend(Path(args.config) if args.config else data_dir.parent / 'config.json')
+    ledger = open_ledger(data_dir, backend)
+    store = BatchStore(data_dir / 'follow_batches.json')
+    cursor = ImportCursor(data_dir)
+    try:
+        for path in args.exports:
+            result = import_export(path, store, ledger, cursor, force=args.force)
+            if result is None:
+                print(f"⏭️ {path} already imported")
+            else:
+                print(f"📥 {path}: {result['changed']}/{result['batches']} batches changed, {result['users']} new users")
+        print(f"📊 Ledger now holds {len(ledger)} users: {ledger.counts()}")
+    finally:
+        store.close()
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ import time
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import urlparse
 import os
 
 # Modified Instagram bot class for GUI use
@@ -27,70 +28,152 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 
+try:
+    from .action_log import ActionLog
+    from .ledger import open_ledger, read_counts
+    from .stats import open_stats
+    from .timing import NULL_TIMER, timed
+    from .bloom import open_bloom, PrefilteredMembership
+    from .lean_driver import (LEAN_WINDOW_SIZE, NetworkUsage, apply_lean_options, enable_network_log,
+                              enable_request_blocking)
+    from .waits import (PacingPolicy, wait_for_page_ready, wait_until, wait_for_js,
+                        wait_for_button_text, LOGIN_ERROR_JS, NOT_NOW_PRESENT_JS)
+except ImportError:
+    from action_log import ActionLog
+    from ledger import open_ledger, read_counts
+    from stats import open_stats
+    from timing import NULL_TIMER, timed
+    from bloom import open_bloom, PrefilteredMembership
+    from lean_driver import (LEAN_WINDOW_SIZE, NetworkUsage, apply_lean_options, enable_network_log,
+                             enable_request_blocking)
+    from waits import (PacingPolicy, wait_for_page_ready, wait_until, wait_for_js,
+                       wait_for_button_text, LOGIN_ERROR_JS, NOT_NOW_PRESENT_JS)
+
+class DriverRestartError(WebDriverException):
+    """Chrome was stopped for crossing a watchdog limit and could not be brought back; bot.driver is None"""
+
+
+# Page-side extraction of every row in the followers dialog in one round trip.
+# Each row's button is tagged with data-bot-row so it can be clicked by index afterwards.
+FOLLOWER_ROWS_JS = """
+const dialog = document.querySelector("div[role='dialog']");
+if (!dialog) return null;
+const states = {'Follow': 'follow', 'Following': 'following', 'Requested': 'requested'};
+const rows = [];
+for (const button of dialog.querySelectorAll('button')) {
+    const state = states[button.innerText.trim()];
+    if (!state) continue;
+    let row = button.parentElement;
+    let link = null;
+    while (row && row !== dialog && !link) {
+        link = Array.from(row.querySelectorAll('a[href]')).find(a => {
+            const href = a.getAttribute('href');
+            return href && href !== '/' && !href.includes('/followers/') && !href.includes('/following/');
+        });
+        row = row.parentElement;
+    }
+    if (!link) continue;
+    const username = new URL(link.href, location.origin).pathname.split('/').filter(Boolean)[0];
+    if (!username) continue;
+    button.setAttribute('data-bot-row', String(rows.length));
+    rows.push({username: username, button_index: rows.length, state: state});
+}
+return rows;
+"""
+
+CLICK_ROW_JS = """
+const button = document.querySelector(`div[role='dialog'] button[data-bot-row='${arguments[0]}']`);
+if (!button) return false;
+button.scrollIntoView({block: 'center'});
+button.click();
+return true;
+"""
+
+# Scrolls the dialog's scrollable list; returns false once it can't move any further
+SCROLL_DIALOG_JS = """
+const dialog = document.querySelector("div[role='dialog']");
+if (!dialog) return false;
+const scroller = Array.from(dialog.querySelectorAll('div')).find(d => d.scrollHeight > d.clientHeight + 1 &&
+    ['auto', 'scroll'].includes(getComputedStyle(d).overflowY)) || dialog;
+const before = scroller.scrollTop;
+scroller.scrollTop = before + scroller.offsetHeight;
+return scroller.scrollTop !== before;
+"""
+
+MORE_ROWS_LOADED_JS = """
+return Array.from(document.querySelectorAll("div[role='dialog'] button"))
+    .filter(b => ['Follow', 'Following', 'Requested'].includes(b.innerText.trim())).length > arguments[0];
+"""
+
 class InstagramBotGUI:
-    def __init__(self, username, password, target_accounts, users_per_account=25):
+    def __init__(self, username, password, target_accounts, users_per_account=25, action_log_fsync='interval',
+                 ledger=None, ledger_backend='json', data_dir='instagram_data', session=None,
+                 pacing=None, base_url='https://www.instagram.com', timer=None, use_bloom=False,
+                 lean=False, track_network=False, watchdog=None):
         self.username = username
         self.password = password
         self.target_accounts = target_accounts
         self.users_per_account = users_per_account
         self.driver = None
+        # Overridable so the bot can be driven against a local mock server
+        self.base_url = base_url.rstrip('/')
+        # Optional BrowserSession used to skip the login form when cookies are still valid
+        self.session = session
         
         # Setup directories
-        self.data_dir = Path('instagram_data')
+        self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
-        # Files for tracking
-        self.follows_file = self.data_dir / 'follows.json'
-        self.action_log_file = self.data_dir / 'action_log.json'
+        # Deliberate spacing between actions; page readiness is waited on separately
+        self.pacing = pacing or PacingPolicy()
+        
+        # Scroll passes over follower dialogs, for benchmarking
+        self.scroll_passes = 0
+        # Per-phase spans (PhaseTimer); the default is disabled and costs nothing
+        self.timer = timer or NULL_TIMER
         
-        # Timing settings
-        self.follow_delay_min = 3  # Changed from 10
-        self.follow_delay_max = 3  # Changed from 15
-        self.page_load_delay = 3
+        # Lean mode blocks images/media/fonts and trims Chrome; track_network counts what was fetched
+        self.lean = lean
+        self.network = NetworkUsage() if track_network else None
+        # Optional ResourceWatchdog; when Chrome outgrows its limits the driver is restarted mid-cycle
+        self.watchdog = watchdog
+        self.show_browser = False
         
         # Initialize data files
-        self.follows_data = self.load_follows_data()
-        self.action_log = self.load_action_log()
+        self.ledger = ledger if ledger is not None else open_ledger(self.data_dir, ledger_backend)
+        # Optional Bloom prefilter so most never-seen candidates skip the ledger lookup
+        self.bloom = open_bloom(self.data_dir, self.ledger) if use_bloom else None
+        self._bloom_pending = 0
+        # Membership view used to skip known users; callers may swap in their own mapping
+        self.follows_data = PrefilteredMembership(self.bloom, self.ledger) if self.bloom else self.ledger
+        self.action_log = ActionLog(self.data_dir, fsync_policy=action_log_fsync)
+        self.stats = open_stats(self.data_dir, self.action_log, self.ledger.counts)
         
         # Setup logging
         self.logger = logging.getLogger(__name__)
         
-    def load_follows_data(self):
-        if self.follows_file.exists():
-            try:
-                with open(self.follows_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
-        
     def save_follows_data(self):
-        with open(self.follows_file, 'w') as f:
-            json.dump(self.follows_data, f, indent=2)
+        self.ledger.flush()
+        self.stats.flush()
+        if self.bloom is not None:
+            # Each new follow added one ledger row and one filter entry
+            self.bloom.advance(self._bloom_pending, len(self.ledger))
+            self._bloom_pending = 0
+            self.bloom.flush()
             
-    def load_action_log(self):
-        if self.action_log_file.exists():
-            try:
-                with open(self.action_log_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return []
-        
-    def save_action_log(self):
-        with open(self.action_log_file, 'w') as f:
-            json.dump(self.action_log, f, indent=2)
-            
-    def log_action(self, action_type, target_user, details=""):
+    def log_action(self, action_type, target_user, details="", source_account=None):
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "action": action_type,
             "target": target_user,
             "details": details
         }
+        if source_account:
+            log_entry["source"] = source_account
         self.action_log.append(log_entry)
-        self.save_action_log()
+        self.stats.record(log_entry)
         
+    @timed('init_driver')
     def init_driver(self, show_browser=False):
         try:
             options = Options()
@@ -99,12 +182,17 @@ class InstagramBotGUI:
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
             options.add_argument('--disable-gpu')
-            options.add_argument('--window-size=1920,1080')
+            options.add_argument(f'--window-size={LEAN_WINDOW_SIZE if self.lean else "1920,1080"}')
             options.add_argument('--disable-blink-features=AutomationControlled')
             options.add_argument('--disable-extensions')
             options.add_argument('--disable-plugins')
             options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
             
+            if self.lean:
+                apply_lean_options(options)
+            if self.network is not None:
+                enable_network_log(options)
+            
             # Add headless mode unless showing browser
             if not show_browser:
                 options.add_argument('--headless')
@@ -114,25 +202,100 @@ class InstagramBotGUI:
             options.add_experimental_option('useAutomationExtension', False)
             
             self.driver = webdriver.Chrome(options=options)
+            self.show_browser = show_browser
+            if self.watchdog is not None:
+                self.watchdog.attach(self.driver.service.process.pid)
+            if self.lean:
+                enable_request_blocking(self.driver)
             
             # Remove automation indicators
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
             self.driver.implicitly_wait(10)
-            mode = "visible" if show_browser else "headless"
+            mode = ("visible" if show_browser else "headless") + (", lean" if self.lean else "")
             self.logger.info(f"Chrome driver initialized successfully in {mode} mode")
             return True
         except Exception as e:
             self.logger.error(f"Error initializing driver: {str(e)}")
             return False
 
+    def restart_driver_if_bloated(self):
+        """Checkpoint and relaunch Chrome when the watchdog says it crossed a limit; True if restarted
+
+        Call only between actions, where every follow so far is already in the ledger
+        """
+        if self.watchdog is None:
+            return False
+        over = self.watchdog.over_limit()
+        if over is None:
+            return False
+        kind, description = over
+        self.logger.warning(f"🐘 Chrome over its {kind} limit ({description}), checkpointing and restarting the driver")
+        self.save_follows_data()
+        if self.network is not None:
+            # Counted before the old browser and its log go away
+            self.network.collect(self.driver)
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+        self.driver = None
+        self.watchdog.detach()
+        self.watchdog.record_restart(kind)
+        if not self.init_driver(show_browser=self.show_browser):
+            raise DriverRestartError(f"Could not restart Chrome after it crossed its {kind} limit")
+        if not self.login():
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+            raise DriverRestartError(f"Could not log in again after restarting Chrome ({kind} limit)")
+        return True
+
+    def network_usage(self):
+        """Requests/bytes fetched and blocked since the last call, or None when not tracking"""
+        if self.network is None or self.driver is None:
+            return None
+        self.network.collect(self.driver)
+        return self.network.take()
+
+    def is_logged_in(self):
+        """Cheap check: session cookie present and not bounced to the login page"""
+        try:
+            if '/accounts/login' in self.driver.current_url:
+                return False
+            return any(c.get('name') == 'sessionid' and c.get('value') for c in self.driver.get_cookies())
+        except WebDriverException:
+            return False
+            
+    def restore_session(self):
+        """Try the saved session before falling back to the full login flow"""
+        if self.is_logged_in():
+            return True
+        if not self.session or not self.session.restore_cookies(self.driver, f'{self.base_url}/'):
+            return False
+        
+        # A page that requires auth tells us whether the restored cookies are still valid
+        self.driver.get(f'{self.base_url}/accounts/edit/')
+        if self.is_logged_in():
+            return True
+        self.logger.info("Saved session expired, logging in again")
+        self.session.clear()
+        return False
+
+    @timed('login')
     def login(self):
         try:
+            if self.restore_session():
+                self.logger.info(f"✅ Reusing existing session for {self.username}")
+                return True
+            
             self.logger.info(f"Attempting to login as {self.username}")
             
             # Try direct login page first
-            self.driver.get('https://www.instagram.com/accounts/login/')
-            time.sleep(self.page_load_delay)
+            self.driver.get(f'{self.base_url}/accounts/login/')
+            wait_for_page_ready(self.driver)
             
             # Check if we got redirected to main page
             if '/accounts/login' not in self.driver.current_url:
@@ -160,7 +323,7 @@ class InstagramBotGUI:
             
             username_input.clear()
             username_input.send_keys(self.username)
-            time.sleep(1)
+            self.pacing.pause('typing')
             
             # Fill password with appropriate selectors
             self.logger.info("Filling password...")
@@ -175,7 +338,7 @@ class InstagramBotGUI:
             
             password_input.clear()
             password_input.send_keys(self.password)
-            time.sleep(1)
+            self.pacing.pause('typing')
             
             # Click login button with appropriate selector
             self.logger.info("Clicking login button...")
@@ -194,19 +357,28 @@ class InstagramBotGUI:
                     EC.element_to_be_clickable((By.CSS_SELECTOR, "button[type='submit'], form button"))
                 )
             
+            login_url = self.driver.current_url
             login_button.click()
             
-            # Wait for login to process
-            time.sleep(8)
+            # Wait for login to process: we leave the login page, or Instagram shows an error
+            wait_until(
+                self.driver,
+                lambda d: d.current_url != login_url or d.execute_script(LOGIN_ERROR_JS),
+                timeout=20
+            )
             
             # Handle post-login dialogs
-            try:
-                not_now_button = WebDriverWait(self.driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Not Now')]"))
-                )
-                not_now_button.click()
-                time.sleep(2)
-            except:
+            if wait_for_js(self.driver, NOT_NOW_PRESENT_JS, timeout=3):
+                try:
+                    not_now_button = WebDriverWait(self.driver, 5).until(
+                        EC.element_to_be_clickable((By.XPATH, "//*[self::button or @role='button'][translate(normalize-space(.), 'NOTW', 'notw')='not now']"))
+                    )
+                    dialog_url = self.driver.current_url
+                    not_now_button.click()
+                    wait_until(self.driver, lambda d: d.current_url != dialog_url or not d.execute_script(NOT_NOW_PRESENT_JS), timeout=5)
+                except:
+                    self.logger.debug("Could not dismiss 'Save Login Info' dialog")
+            else:
                 self.logger.debug("No 'Save Login Info' dialog found")
             
             # Check if we're still on login page (failed login)
@@ -216,8 +388,10 @@ class InstagramBotGUI:
                 return False
             
             # Final verification - check if we're on Instagram home page
-            if "instagram.com" in current_url and "login" not in current_url:
+            if urlparse(self.base_url).netloc in current_url and "login" not in current_url:
                 self.logger.info("✅ Login completed successfully!")
+                if self.session:
+                    self.session.save_cookies(self.driver)
                 return True
             else:
                 self.logger.error(f"Unexpected page after login: {current_url}")
@@ -232,107 +406,130 @@ class InstagramBotGUI:
     
 
 
-    def follow_users_from_account(self, account):
-        try:
-            self.logger.info(f"🎯 Navigating to account: {account}")
-            self.driver.get(f"https://www.instagram.com/{account}/")
-            
-            # Check if account exists and is accessible
-            page_source = self.driver.page_source.lower()
-            if "sorry, this page isn't available" in page_source or "user not found" in page_source:
-                self.logger.error(f"❌ Account {account} not found or not accessible")
-                return []
-            if "this account is private" in page_source:
-                self.logger.error(f"❌ Account {account} is private")
-                return []
-            
+    def open_followers_dialog(self, account):
+        """Navigate to the account and open its followers dialog with the first rows loaded"""
+        self.logger.info(f"🎯 Navigating to account: {account}")
+        self.driver.get(f"{self.base_url}/{account}/")
+        
+        # Check if account exists and is accessible
+        page_source = self.driver.page_source.lower()
+        if "sorry, this page isn't available" in page_source or "user not found" in page_source:
+            self.logger.error(f"❌ Account {account} not found or not accessible")
+            return False
+        if "this account is private" in page_source:
+            self.logger.error(f"❌ Account {account} is private")
+            return False
+        
+        with self.timer.span('followers_dialog', account=account):
             # Open followers modal
             try:
                 followers_link = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, "//a[contains(@href, '/followers/') or contains(text(), 'followers') or contains(@title, 'followers')]"))
-                        )
-            self.driver.execute_script("arguments[0].click();", followers_link)
+                )
+                self.driver.execute_script("arguments[0].click();", followers_link)
             except Exception as e:
                 self.logger.error(f"❌ Could not open followers modal: {e}")
-                return []
-            
+                return False
+        
             # Wait for modal
             try:
-                modal = WebDriverWait(self.driver, 10).until(
+                WebDriverWait(self.driver, 10).until(
                     EC.presence_of_element_located((By.XPATH, "//div[@role='dialog']"))
                 )
             except Exception as e:
                 self.logger.error(f"❌ Followers modal failed to load: {e}")
+                return False
+        
+            # Rows are loaded asynchronously after the dialog itself appears
+            if not wait_for_js(self.driver, MORE_ROWS_LOADED_JS, 0, timeout=10):
+                self.logger.error(f"❌ No follower rows loaded for @{account}")
+                return False
+        return True
+
+    @timed('follow_users_from_account')
+    def follow_users_from_account(self, account):
+        """Usernames followed from the account, including those followed before an error cut it short"""
+        followed_usernames = []
+        try:
+            if not self.open_followers_dialog(account):
                 return []
             
             followed_count = 0
-            followed_usernames = []
             processed_usernames = set()
             max_scrolls = 100
             scroll_attempts = 0
             
             while followed_count < self.users_per_account and scroll_attempts < max_scrolls:
-                # Find all visible follow buttons and their usernames
-                follow_buttons = self.driver.find_elements(By.XPATH, "//button[.//div[text()='Follow']]")
-                if not follow_buttons:
+                # Follows so far are recorded; a fresh browser reopens the dialog and skips rows already seen
+                if self.restart_driver_if_bloated() and not self.open_followers_dialog(account):
+                    break
+                # One round trip returns every visible row: username, button index and state
+                rows = self.driver.execute_script(FOLLOWER_ROWS_JS) or []
+                if not any(row['state'] == 'follow' for row in rows):
                     break  # No more follow buttons, stop
                 found_new = False
-                        for button in follow_buttons:
-                                try:
-                                    parent = button.find_element(By.XPATH, "./ancestor::div[contains(@style, 'display: flex') or contains(@class, 'x1dm5mii')]")
-                                    username_link = parent.find_element(By.XPATH, ".//a[contains(@href, '/') and not(contains(@href, '/followers/')) and not(contains(@href, '/following/'))]")
-                        username = username_link.get_attribute('href').split('/')[-2]
-                        if not username or username in processed_usernames or username in self.follows_data:
-                                        continue
-                        # Wait 1 second before each follow click
-                                    time.sleep(1)
-                        # Click follow
-                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                                    try:
-                                        button.click()
-                        except Exception:
-                                        try:
-                                            self.driver.execute_script("arguments[0].click();", button)
-                            except Exception:
-                                            actions = webdriver.ActionChains(self.driver)
-                                            actions.move_to_element(button).click().perform()
-                        # Assume follow is always successful
-                        self.logger.info(f"✅ Followed @{username} ({followed_count + 1})")
-                                            self.follows_data[username] = {
-                                                'status': 'following',
-                                                'followed_at': datetime.now().isoformat(),
-                                                'source_account': account
-                                            }
-                                            self.log_action('follow', username, f'From {account}')
-                        followed_usernames.append(username)
-                        followed_count += 1
-                        processed_usernames.add(username)
-                        found_new = True
-                        if followed_count >= self.users_per_account:
-                            break
+                for row in rows:
+                    username = row['username']
+                    # Rows seen on earlier scroll passes are never re-processed
+                    if username in processed_usernames:
+                        continue
+                    processed_usernames.add(username)
+                    found_new = True
+                    if row['state'] != 'follow' or username in self.follows_data:
+                        continue
+                    # Deliberate pause before each follow click
+                    self.pacing.pause('before_follow')
+                    # Click follow
+                    try:
+                        with self.timer.span('follow_click'):
+                            clicked = self.driver.execute_script(CLICK_ROW_JS, row['button_index'])
+                        if not clicked:
+                            continue
                     except Exception:
-                                    continue
+                        continue
+                    # Assume follow is always successful
+                    self.logger.info(f"✅ Followed @{username} ({followed_count + 1})")
+                    self.ledger.record_follow(username, account)
+                    if self.bloom is not None:
+                        self.bloom.add(username)
+                        self._bloom_pending += 1
+                    self.log_action('follow', username, f'From {account}', source_account=account)
+                    followed_usernames.append(username)
+                    followed_count += 1
+                    if followed_count >= self.users_per_account:
+                        break
                 if followed_count >= self.users_per_account:
-                                break
-                # Always scroll after each pass, then re-query for buttons
-                modal_element = self.driver.find_element(By.XPATH, "//div[@role='dialog']")
-                self.driver.execute_script("arguments[0].scrollTop = arguments[0].scrollTop + arguments[0].offsetHeight;", modal_element)
+                    break
+                # Always scroll after each pass, then re-query for rows
+                row_count = len(rows)
+                with self.timer.span('scroll_pass', account=account):
+                    moved = self.driver.execute_script(SCROLL_DIALOG_JS)
                     scroll_attempts += 1
+                    self.scroll_passes += 1
+                    exhausted = not moved and not found_new and not wait_for_js(self.driver, MORE_ROWS_LOADED_JS, row_count, timeout=3)
+                if exhausted:
+                    break  # Bottom of the list and nothing new loaded
             self.save_follows_data()
+            if self.network is not None:
+                # Keep chromedriver's performance log buffer from growing over a long cycle
+                self.network.collect(self.driver)
             self.logger.info(f"🎉 Completed following from @{account}: {followed_count} users followed.")
             return followed_usernames
         except Exception as e:
+            # Follows made before the error are already in the ledger; callers still need them
             self.logger.error(f"❌ Failed to follow users from {account}: {str(e)}")
-            return []
+            self.save_follows_data()
+            return followed_usernames
 
+    @timed('unfollow_user')
     def unfollow_user(self, username):
         """Unfollow a specific user"""
         try:
             self.logger.info(f"🔄 Attempting to unfollow @{username}")
             
             # Navigate to user's profile
-            self.driver.get(f"https://www.instagram.com/{username}/")
-            time.sleep(self.page_load_delay)
+            self.driver.get(f"{self.base_url}/{username}/")
+            wait_for_page_ready(self.driver)
             
             # Check if page exists
             if "Sorry, this page isn't available" in self.driver.page_source:
@@ -349,24 +546,24 @@ class InstagramBotGUI:
                 # Click the Following button to open dropdown
                 self.logger.info(f"📋 Clicking Following button for @{username}")
                 following_button.click()
-                time.sleep(2)
                 
-                # Now find and click the "Unfollow" button in the dropdown
+                # Now find and click the "Unfollow" button in the dropdown once it is clickable
                 unfollow_button = WebDriverWait(self.driver, 5).until(
                     EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Unfollow')]"))
                 )
                 
                 self.logger.info(f"🎯 Clicking Unfollow button for @{username}")
                 unfollow_button.click()
-                time.sleep(2)
+                
+                # The profile button flips back to "Follow" once Instagram applied the unfollow
+                if not wait_for_button_text(self.driver, 'Follow', timeout=5):
+                    self.logger.debug(f"Follow button did not reappear for @{username}, assuming unfollow went through")
                 
                 # Update the follows data
-                if username in self.follows_data:
-                    self.follows_data[username]['status'] = 'unfollowed'
-                    self.follows_data[username]['unfollowed_at'] = datetime.now().isoformat()
-                    self.save_follows_data()
+                source_account = (self.ledger.get(username) or {}).get('source_account')
+                self.ledger.mark_unfollowed(username)
                 
-                self.log_action('unfollow', username, 'Unfollowed user successfully')
+                self.log_action('unfollow', username, 'Unfollowed user successfully', source_account=source_account)
                 self.logger.info(f"✅ Successfully unfollowed @{username}")
                 return True
                 
@@ -382,19 +579,8 @@ class InstagramBotGUI:
     def unfollow_old_users(self, hours_threshold=48):
         """Unfollow users followed more than X hours ago"""
         try:
-            current_time = datetime.now()
-            users_to_unfollow = []
-            
             # Find users eligible for unfollowing
-            for username, data in self.follows_data.items():
-                if data.get('status') != 'following':
-                    continue
-                    
-                followed_time = datetime.fromisoformat(data['followed_at'])
-                hours_passed = (current_time - followed_time).total_seconds() / 3600
-                
-                if hours_passed >= hours_threshold:
-                    users_to_unfollow.append(username)
+            users_to_unfollow = self.ledger.eligible_for_unfollow(hours_threshold)
             
             self.logger.info(f"🕒 Found {len(users_to_unfollow)} users eligible for unfollowing (>{hours_threshold}h old)")
             
@@ -404,7 +590,7 @@ class InstagramBotGUI:
                 if self.unfollow_user(username):
                     unfollowed_count += 1
                     # Small delay between unfollows
-                    time.sleep(random.randint(3, 8))
+                    self.pacing.pause('between_unfollows')
                 
             self.logger.info(f"🔄 Unfollowed {unfollowed_count} users")
             return unfollowed_count
@@ -412,26 +598,49 @@ class InstagramBotGUI:
         except Exception as e:
             self.logger.error(f"❌ Error in unfollow process: {str(e)}")
             return 0
+        finally:
+            self.save_follows_data()
+
+    def unfollow_due_users(self, queue, limit):
+        """Unfollow up to limit users whose turn has come in the unfollow queue"""
+        unfollowed_count = 0
+        try:
+            while unfollowed_count < limit:
+                self.restart_driver_if_bloated()
+                username = queue.pop_due()
+                if username is None:
+                    break
+                # Unfollowed elsewhere (batch manager, extension import) since it was queued
+                if (self.ledger.get(username) or {}).get('status') != 'following':
+                    continue
+                if self.unfollow_user(username):
+                    queue.done(username)
+                    unfollowed_count += 1
+                    self.pacing.pause('between_unfollows')
+                elif not queue.retry(username):
+                    self.logger.warning(f"⚠️ Giving up on unfollowing @{username} after {queue.max_attempts} attempts")
+        finally:
+            # Unfollows are buffered like follows; one ledger write per slot
+            self.save_follows_data()
+            queue.save()
+            
+        self.logger.info(f"🔄 Unfollowed {unfollowed_count} due users, {len(queue)} still queued")
+        return unfollowed_count
 
     def test_unfollow_recent_user(self):
         """Test function: unfollow the most recently followed user (ignoring 48h rule)"""
         try:
             # Find the most recently followed user
-            recent_follows = [
-                (username, data) for username, data in self.follows_data.items()
-                if data.get('status') == 'following'
-            ]
+            most_recent_user = self.ledger.latest_following()
             
-            if not recent_follows:
+            if not most_recent_user:
                 self.logger.info("❌ No users currently being followed")
                 return False
             
-            # Sort by followed_at timestamp to get most recent
-            recent_follows.sort(key=lambda x: x[1]['followed_at'], reverse=True)
-            most_recent_user = recent_follows[0][0]
-            
             self.logger.info(f"🧪 TEST MODE: Unfollowing most recent user @{most_recent_user}")
-            return self.unfollow_user(most_recent_user)
+            unfollowed = self.unfollow_user(most_recent_user)
+            self.save_follows_data()
+            return unfollowed
             
         except Exception as e:
             self.logger.error(f"❌ Error in test unfollow: {str(e)}")
@@ -450,6 +659,8 @@ class InstagramAutomationGUI:
         
         self.data_dir = Path('instagram_data')
         self.data_dir.mkdir(exist_ok=True)
+        self.stats = open_stats(self.data_dir, ActionLog(self.data_dir, migrate=False),
+                                lambda: read_counts(self.data_dir))
         
         self.setup_logging()
         self.create_gui()
@@ -801,8 +1012,9 @@ class InstagramAutomationGUI:
                 
                 # Wait between accounts (except for the last one)
                 if self.automation_running and i < len(target_accounts) - 1:
-                    self.root.after(0, lambda: self.add_status_message(f"⏳ Waiting 60 seconds before next account..."))
-                    for wait_time in range(60):
+                    wait_seconds = int(self.bot.pacing.delay('between_accounts'))
+                    self.root.after(0, lambda s=wait_seconds: self.add_status_message(f"⏳ Waiting {s} seconds before next account..."))
+                    for wait_time in range(wait_seconds):
                         if not self.automation_running:
                             break
                         time.sleep(1)
@@ -834,37 +1046,14 @@ class InstagramAutomationGUI:
         
     def update_stats(self):
         try:
-            follows_file = self.data_dir / 'follows.json'
-            action_log_file = self.data_dir / 'action_log.json'
-            
-            follows_data = {}
-            action_log = []
-            
-            if follows_file.exists():
-                with open(follows_file, 'r') as f:
-                    follows_data = json.load(f)
-                    
-            if action_log_file.exists():
-                with open(action_log_file, 'r') as f:
-                    action_log = json.load(f)
-            
-            now = datetime.now()
-            today = now.date()
-            
-            following = [u for u, d in follows_data.items() if d.get('status') == 'following']
-            
-            today_follows = len([
-                a for a in action_log 
-                if a.get('action') == 'follow' 
-                and datetime.fromisoformat(a['timestamp']).date() == today
-            ])
+            stats = self.stats.snapshot()
             
-            self.following_var.set(str(len(following)))
-            self.today_follows_var.set(str(today_follows))
+            self.following_var.set(str(stats['total_following']))
+            self.today_follows_var.set(str(stats['today_follows']))
             
             # Update activity
             self.activity_listbox.delete(0, tk.END)
-            for action in action_log[-15:]:
+            for action in stats['recent_actions'][-15:]:
                 timestamp = datetime.fromisoformat(action['timestamp']).strftime("%H:%M")
                 text = f"[{timestamp}] {action['action'].title()}: {action['target']}"
                 self.activity_listbox.insert(tk.END, text)
@@ -0,0 +1,118 @@
+"""
+Lean Chrome profile for unattended server cycles
+Images, video and fonts are blocked through DevTools, the window is small and background subsystems are off.
+NetworkUsage reads Chrome's performance log to count what was fetched and what the block list saved
+"""
+import json
+from collections import Counter
+
+from selenium.common.exceptions import WebDriverException
+
+# Network.setBlockedURLs wildcards; query strings follow the extension on Instagram's CDN
+BLOCKED_URL_PATTERNS = [
+    '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.heic*', '*.ico*',
+    '*.mp4*', '*.m4s*', '*.m4a*', '*.webm*', '*.mp3*',
+    '*.woff*', '*.woff2*', '*.ttf*', '*.otf*',
+    # Instagram's media CDN (profile pictures, posts, reels)
+    '*//scontent*',
+]
+
+LEAN_WINDOW_SIZE = '1024,768'
+
+LEAN_ARGUMENTS = [
+    '--mute-audio',
+    '--autoplay-policy=user-gesture-required',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-notifications',
+    '--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication,InterestFeedContentSuggestions',
+    '--metrics-recording-only',
+    '--no-first-run',
+    '--renderer-process-limit=2',
+]
+
+LEAN_PREFS = {
+    'profile.default_content_setting_values.notifications': 2,
+    'profile.default_content_setting_values.geolocation': 2,
+    'profile.default_content_setting_values.media_stream': 2,
+}
+
+
+def apply_lean_options(options):
+    for argument in LEAN_ARGUMENTS:
+        options.add_argument(argument)
+    options.add_experimental_option('prefs', LEAN_PREFS)
+
+
+def enable_network_log(options):
+    """Ask chromedriver to keep Network.* events in the 'performance' log"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+
+def enable_request_blocking(driver, patterns=BLOCKED_URL_PATTERNS):
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+
+
+class NetworkUsage:
+    """Requests and bytes seen by Chrome, accumulated from its performance log"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+        self.failed = 0
+        self.blocked_by_type = Counter()
+        self._types = {}
+
+    def collect(self, driver):
+        """Drain chromedriver's buffered performance log; call it often enough that the buffer stays small"""
+        try:
+            entries = driver.get_log('performance')
+        except WebDriverException:
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                # Redirect hops fire this again under the same id and count as requests too
+                self.requests += 1
+                self._types[params.get('requestId')] = params.get('type', 'Other')
+            elif method == 'Network.loadingFinished':
+                self.bytes += int(params.get('encodedDataLength', 0))
+                self._types.pop(params.get('requestId'), None)
+            elif method == 'Network.loadingFailed':
+                resource_type = params.get('type') or self._types.get(params.get('requestId'), 'Other')
+                self._types.pop(params.get('requestId'), None)
+                if params.get('blockedReason') or 'ERR_BLOCKED_BY_CLIENT' in params.get('errorText', ''):
+                    self.blocked += 1
+                    self.blocked_by_type[resource_type] += 1
+                else:
+                    self.failed += 1
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'blocked': self.blocked,
+            'failed': self.failed,
+            'bytes': self.bytes,
+            'blocked_by_type': dict(self.blocked_by_type)
+        }
+
+    def take(self):
+        """Counts since the last take, then start over"""
+        usage = self.as_dict()
+        pending = self._types
+        self.reset()
+        # Requests still in flight finish (and are counted) in the next window
+        self._types = pending
+        return usage
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Follow ledger backends
+Tracks who we followed, when, and whether they have been unfollowed yet
+"""
+import argparse
+import json
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    from .storage import file_signature
+except ImportError:
+    from storage import file_signature
+
+LEDGER_BACKENDS = ('json', 'sqlite')
+
+
+def _to_ts(value):
+    """ISO string / datetime / epoch -> epoch seconds"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _to_iso(ts):
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+def batch_rows(batches):
+    """Historical ledger rows for every user in GUI or extension batches"""
+    rows = []
+    for batch in batches:
+        for user in batch.get('users', []):
+            followed_at = user.get('followed_at') or batch.get('timestamp')
+            if not user.get('username') or not followed_at:
+                continue
+            rows.append((
+                user['username'],
+                'unfollowed' if user.get('unfollowed') else 'following',
+                _to_ts(followed_at.replace('Z', '+00:00')),
+                _to_ts(user['unfollowed_at'].replace('Z', '+00:00')) if user.get('unfollowed_at') else None,
+                user.get('source_account'),
+                batch.get('id')
+            ))
+    return rows
+
+
+class FollowLedger(ABC):
+    """Interface shared by every ledger backend"""
+
+    def __contains__(self, username):
+        return self.get(username) is not None
+
+    @abstractmethod
+    def __len__(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def usernames(self):
+        """Iterate every username ever recorded, followed or unfollowed"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, username, default=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def record_follow(self, username, source_account, followed_at=None, batch_id=None):
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_unfollowed(self, username, unfollowed_at=None):
+        """False if username was never recorded; like record_follow, only durable after flush()"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def eligible_for_unfollow(self, hours_threshold, now=None, limit=None):
+        """Usernames still followed after hours_threshold, oldest first"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def followed_since(self, since=None):
+        """(username, followed_at epoch) of users still followed, followed at or after since, oldest first"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def latest_following(self):
+        """Most recently followed username that is still being followed"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def counts(self):
+        """Number of users per status"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def merge_history(self, rows):
+        """Merge (username, status, followed_at, unfollowed_at, source_account, batch_id) rows,
+        keeping the most recent follow of each username; re-importing a follow never undoes its unfollow"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist changes buffered since the last flush; callers flush at checkpoints, not per action"""
+
+    def close(self):
+        pass
+
+
+class JsonFollowLedger(FollowLedger):
+    """Legacy follows.json dict, rewritten wholesale on flush"""
+
+    def __init__(self, follows_file):
+        self.follows_file = Path(follows_file)
+        self.follows_data = self._load()
+        # Per-status counts, recomputed after the next change rather than on every stats query
+        self._counts = None
+
+    def _load(self):
+        if self.follows_file.exists():
+            try:
+                with open(self.follows_file, 'r') as f:
+                    return json.load(f)
+            except:
+                pass
+        return {}
+
+    def __len__(self):
+        return len(self.follows_data)
+
+    def usernames(self):
+        return iter(list(self.follows_data))
+
+    def get(self, username, default=None):
+        return self.follows_data.get(username, default)
+
+    def record_follow(self, username, source_account, followed_at=None, batch_id=None):
+        if followed_at is None:
+            followed_at = datetime.now()
+        if isinstance(followed_at, datetime):
+            followed_at = followed_at.isoformat()
+        entry = {
+            'status': 'following',
+            'followed_at': followed_at,
+            'source_account': source_account
+        }
+        if batch_id:
+            entry['batch_id'] = batch_id
+        self.follows_data[username] = entry
+        self._counts = None
+
+    def mark_unfollowed(self, username, unfollowed_at=None):
+        if username not in self.follows_data:
+            return False
+        self.follows_data[username]['status'] = 'unfollowed'
+        self.follows_data[username]['unfollowed_at'] = (unfollowed_at or datetime.now()).isoformat()
+        self._counts = None
+        return True
+
+    def eligible_for_unfollow(self, hours_threshold, now=None, limit=None):
+        cutoff = (now or datetime.now()) - timedelta(hours=hours_threshold)
+        eligible = []
+        for username, data in self.follows_data.items():
+            if data.get('status') != 'following':
+                continue
+            followed_at = datetime.fromisoformat(data['followed_at'])
+            if followed_at <= cutoff:
+                eligible.append((followed_at, username))
+        eligible.sort()
+        usernames = [username for _, username in eligible]
+        return usernames[:limit] if limit else usernames
+
+    def followed_since(self, since=None):
+        following = []
+        for username, data in self.follows_data.items():
+            if data.get('status') != 'following':
+                continue
+            followed_at = _to_ts(data['followed_at'])
+            if since is None or followed_at >= since:
+                following.append((followed_at, username))
+        following.sort()
+        return [(username, followed_at) for followed_at, username in following]
+
+    def latest_following(self):
+        following = [
+            (data['followed_at'], username) for username, data in self.follows_data.items()
+            if data.get('status') == 'following'
+        ]
+        return max(following)[1] if following else None
+
+    def counts(self):
+        if self._counts is None:
+            counts = {'following': 0, 'unfollowed': 0}
+            for data in self.follows_data.values():
+                status = data.get('status')
+                counts[status] = counts.get(status, 0) + 1
+            self._counts = counts
+        return dict(self._counts)
+
+    def merge_history(self, rows):
+        for username, status, followed_at, unfollowed_at, source_account, batch_id in rows:
+            current = self.follows_data.get(username)
+            followed_iso = _to_iso(followed_at)
+            if current:
+                if current['followed_at'] == followed_iso:
+                    # The same follow imported again; an unfollow already recorded for it stands
+                    if current.get('status') == 'unfollowed':
+                        continue
+                elif _to_ts(current['followed_at']) > followed_at:
+                    continue
+            entry = {
+                'status': status,
+                'followed_at': followed_iso,
+                'source_account': source_account
+            }
+            if unfollowed_at is not None:
+                entry['unfollowed_at'] = _to_iso(unfollowed_at)
+            batch_id = batch_id or (current or {}).get('batch_id')
+            if batch_id:
+                entry['batch_id'] = batch_id
+            self.follows_data[username] = entry
+        self._counts = None
+        return len(rows)
+
+    def flush(self):
+        with open(self.follows_file, 'w') as f:
+            json.dump(self.follows_data, f, indent=2)
+
+
+class SqliteFollowLedger(FollowLedger):
+    """SQLite ledger - eligibility for unfollowing is an indexed range query"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS follows (
+            username TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            followed_at REAL NOT NULL,
+            unfollowed_at REAL,
+            source_account TEXT,
+            batch_id TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_follows_status_followed_at ON follows (status, followed_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, db_file, legacy_dir=None):
+        self.db_file = Path(db_file)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+        if legacy_dir is not None and not self.get_meta('legacy_imported_at'):
+            self.import_legacy(legacy_dir)
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def _row_to_entry(self, row):
+        entry = {
+            'status': row['status'],
+            'followed_at': _to_iso(row['followed_at']),
+            'source_account': row['source_account']
+        }
+        if row['unfollowed_at'] is not None:
+            entry['unfollowed_at'] = _to_iso(row['unfollowed_at'])
+        if row['batch_id']:
+            entry['batch_id'] = row['batch_id']
+        return entry
+
+    def __contains__(self, username):
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM follows WHERE username = ?", (username,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM follows").fetchone()[0]
+
+    def usernames(self, page_size=10000):
+        # Keyset pages keep memory flat and never hold the lock across a yield
+        last = ''
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT username FROM follows WHERE username > ? ORDER BY username LIMIT ?",
+                    (last, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[0]
+            last = rows[-1][0]
+
+    def get(self, username, default=None):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM follows WHERE username = ?", (username,)).fetchone()
+        return self._row_to_entry(row) if row else default
+
+    def record_follow(self, username, source_account, followed_at=None, batch_id=None):
+        with self._lock, self.conn:
+            self.conn.execute(
+                """INSERT INTO follows (username, status, followed_at, unfollowed_at, source_account, batch_id)
+                   VALUES (?, 'following', ?, NULL, ?, ?)
+                   ON CONFLICT(username) DO UPDATE SET
+                       status = 'following', followed_at = excluded.followed_at, unfollowed_at = NULL,
+                       source_account = excluded.source_account, batch_id = excluded.batch_id""",
+                (username, _to_ts(followed_at or datetime.now()), source_account, batch_id)
+            )
+
+    def mark_unfollowed(self, username, unfollowed_at=None):
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE follows SET status = 'unfollowed', unfollowed_at = ? WHERE username = ?",
+                (_to_ts(unfollowed_at or datetime.now()), username)
+            )
+        return cursor.rowcount > 0
+
+    def eligible_for_unfollow(self, hours_threshold, now=None, limit=None):
+        cutoff = _to_ts((now or datetime.now()) - timedelta(hours=hours_threshold))
+        query = "SELECT username FROM follows WHERE status = 'following' AND followed_at <= ? ORDER BY followed_at"
+        params = [cutoff]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row['username'] for row in self.conn.execute(query, params)]
+
+    def followed_since(self, since=None):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT username, followed_at FROM follows WHERE status = 'following' AND followed_at >= ? ORDER BY followed_at",
+                (since if since is not None else float('-inf'),)
+            ).fetchall()
+        return [(row['username'], row['followed_at']) for row in rows]
+
+    def latest_following(self):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT username FROM follows WHERE status = 'following' ORDER BY followed_at DESC LIMIT 1"
+            ).fetchone()
+        return row['username'] if row else None
+
+    def counts(self):
+        counts = {'following': 0, 'unfollowed': 0}
+        with self._lock:
+            for row in self.conn.execute("SELECT status, COUNT(*) AS n FROM follows GROUP BY status"):
+                counts[row['status']] = row['n']
+        return counts
+
+    def merge_history(self, rows):
+        return self._upsert_historical(rows)
+
+    def _upsert_historical(self, rows):
+        """Merge imported rows, keeping the most recent follow of each username; a re-imported
+        follow never undoes the unfollow already recorded for it"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """INSERT INTO follows (username, status, followed_at, unfollowed_at, source_account, batch_id)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(username) DO UPDATE SET
+                       status = excluded.status, followed_at = excluded.followed_at,
+                       unfollowed_at = excluded.unfollowed_at, source_account = excluded.source_account,
+                       batch_id = COALESCE(excluded.batch_id, follows.batch_id)
+                   WHERE excluded.followed_at > follows.followed_at
+                      OR (excluded.followed_at = follows.followed_at AND follows.status != 'unfollowed')""",
+                rows
+            )
+        return len(rows)
+
+    def import_follows_json(self, follows_file):
+        """Import a legacy follows.json dict"""
+        with open(follows_file, 'r') as f:
+            follows_data = json.load(f)
+
+        rows = []
+        for username, data in follows_data.items():
+            if not data.get('followed_at'):
+                continue
+            rows.append((
+                username,
+                data.get('status', 'following'),
+                _to_ts(data['followed_at']),
+                _to_ts(data.get('unfollowed_at')),
+                data.get('source_account'),
+                data.get('batch_id')
+            ))
+        return self._upsert_historical(rows)
+
+    def import_batches_json(self, batches_file):
+        """Import follow_batches.json (GUI) or an extension batches.json export"""
+        with open(batches_file, 'r') as f:
+            batches = json.load(f)
+        return self._upsert_historical(batch_rows(batches))
+
+    def import_legacy(self, data_dir):
+        """One-shot import of follows.json and follow_batches.json from data_dir"""
+        data_dir = Path(data_dir)
+        imported = 0
+        follows_file = data_dir / 'follows.json'
+        batches_file = data_dir / 'follow_batches.json'
+        if follows_file.exists():
+            imported += self.import_follows_json(follows_file)
+        if batches_file.exists():
+            imported += self.import_batches_json(batches_file)
+        self.set_meta('legacy_imported_at', datetime.now().isoformat())
+        return imported
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def open_ledger(data_dir, backend='json'):
+    """Open the ledger for data_dir with the configured backend"""
+    data_dir = Path(data_dir)
+    if backend == 'json':
+        return JsonFollowLedger(data_dir / 'follows.json')
+    if backend == 'sqlite':
+        return SqliteFollowLedger(data_dir / 'follows.db', legacy_dir=data_dir)
+    raise ValueError(f"Unknown ledger backend: {backend} (expected one of {', '.join(LEDGER_BACKENDS)})")
+
+
+def ledger_files(data_dir, backend='json'):
+    """Files whose (mtime, size) moves whenever the ledger's contents change"""
+    data_dir = Path(data_dir)
+    if backend == 'sqlite':
+        # WAL mode: recent writes live in the -wal file until a checkpoint
+        return [data_dir / 'follows.db', data_dir / 'follows.db-wal']
+    return [data_dir / 'follows.json']
+
+
+# (data_dir, backend) -> (ledger file signatures, counts)
+_counts_cache = {}
+
+
+def read_counts(data_dir, backend='json'):
+    """Current per-status counts for processes that do not keep a ledger open
+
+    Cached by the ledger files' signatures, so polling only stats them until the ledger changes
+    """
+    key = (str(Path(data_dir).resolve()), backend)
+    # Taken before reading, so a write that lands mid-read is picked up by the next call
+    signature = tuple(file_signature(path) for path in ledger_files(data_dir, backend))
+    cached = _counts_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return dict(cached[1])
+    ledger = open_ledger(data_dir, backend)
+    try:
+        counts = ledger.counts()
+    finally:
+        ledger.close()
+    _counts_cache[key] = (signature, counts)
+    return dict(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import legacy follow data into the SQLite ledger")
+    parser.add_argument('data_dir', help="Directory holding follows.db (e.g. bot_data or instagram_data)")
+    parser.add_argument('files', nargs='*', help="follows.json / follow_batches.json files to import (default: the ones in data_dir)")
+    args = parser.parse_args()
+
+    ledger = SqliteFollowLedger(Path(args.data_dir) / 'follows.db')
+    if args.files:
+        for path in args.files:
+            with open(path, 'r') as f:
+                is_batches = isinstance(json.load(f), list)
+            imported = ledger.import_batches_json(path) if is_batches else ledger.import_follows_json(path)
+            print(f"📥 Imported {imported} records from {path}")
+    else:
+        imported = ledger.import_legacy(args.data_dir)
+        print(f"📥 Imported {imported} records from {args.data_dir}")
+    print(f"📊 Ledger now holds {len(ledger)} users: {ledger.counts()}")
+    ledger.close()
+
+
+if __name__ == "__main__":
+    main()
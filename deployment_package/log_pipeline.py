@@ -0,0 +1,127 @@
+"""
+Non-blocking log pipeline for the server bot
+Loggers only put records on a queue; a listener thread formats them and writes a console stream plus
+a log file that rotates at midnight, with old days gzipped. Records can be plain text or JSON lines
+"""
+import copy
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+# LogRecord attributes that are not user-supplied extra fields
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; extra={...} fields are kept as top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                entry[key] = value
+        # QueueHandler.prepare cleared exc_info; the traceback arrives as exc_text (see _QueueHandler)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif getattr(record, 'exc_text', None):
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Keeps the traceback as exc_text instead of folding it into msg, so each formatter decides where it goes"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+        # Arguments are merged and exc_info/stack_info dropped, as the base class does: they may not pickle
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        if record.stack_info:
+            record.exc_text = '\n'.join(part for part in (record.exc_text, record.stack_info) if part)
+            record.stack_info = None
+        return record
+
+
+def _gzip_namer(name):
+    return name + '.gz'
+
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def rotating_file_handler(path, backup_days=14):
+    """Midnight-rotating handler whose finished days become <name>.YYYY-MM-DD.gz"""
+    handler = logging.handlers.TimedRotatingFileHandler(path, when='midnight', backupCount=backup_days,
+                                                        encoding='utf-8', delay=True)
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+class LogPipeline:
+    """Root logger -> QueueHandler -> QueueListener thread -> console + rotating file"""
+
+    def __init__(self, log_dir, filename='bot.log', level=logging.INFO):
+        self.log_file = Path(log_dir) / filename
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.queue = queue.Queue(-1)
+        self.listener = None
+        self.handlers = []
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_QueueHandler(self.queue))
+        self.settings = None
+        self.configure()
+
+    def configure(self, json_format=False, backup_days=14, level=None):
+        """(Re)build the output handlers; records queued meanwhile are written by the new listener"""
+        settings = (json_format, backup_days)
+        if level is not None:
+            logging.getLogger().setLevel(level)
+        if settings == self.settings:
+            return
+        self._stop_listener()
+
+        formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+        file_handler = rotating_file_handler(self.log_file, backup_days)
+        console_handler = logging.StreamHandler()
+        for handler in (file_handler, console_handler):
+            handler.setFormatter(formatter)
+        self.handlers = [file_handler, console_handler]
+        self.listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+        self.settings = settings
+
+    def _stop_listener(self):
+        if self.listener is not None:
+            # stop() writes out everything already queued before returning
+            self.listener.stop()
+            self.listener = None
+        for handler in self.handlers:
+            handler.close()
+        self.handlers = []
+
+    def close(self):
+        self._stop_listener()
@@ -0,0 +1,144 @@
+"""
+Prometheus-style metrics for the server bot
+The bot process updates counters, gauges and histograms and persists them to metrics.json;
+the dashboard reloads that small file only when it changed and renders the text exposition format
+"""
+import json
+import threading
+from pathlib import Path
+
+try:
+    from .storage import atomic_write_json, file_signature
+except ImportError:
+    from storage import atomic_write_json, file_signature
+
+CYCLE_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+PHASE_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+DRIFT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60)
+RSS_BUCKETS = (128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'instagram_bot_cycles_total': ('counter', "Scheduled cycles run, by cycle and outcome", None),
+    'instagram_bot_errors_total': ('counter', "Errors raised in the bot, by where they happened", None),
+    'instagram_bot_driver_launches_total': ('counter', "Chrome drivers launched", None),
+    'instagram_bot_driver_restarts_total': ('counter', "Drivers discarded and relaunched, by reason", None),
+    'instagram_bot_cycle_duration_seconds': ('histogram', "Wall time of scheduled cycles", CYCLE_BUCKETS),
+    'instagram_bot_phase_duration_seconds': ('histogram', "Wall time of bot phases such as init_driver and login", PHASE_BUCKETS),
+    'instagram_bot_network_requests_total': ('counter', "Browser requests per outcome (loaded, blocked, failed)", None),
+    'instagram_bot_network_bytes_total': ('counter', "Bytes Chrome downloaded during cycles", None),
+    'instagram_bot_chrome_peak_rss_megabytes': ('histogram', "Peak RSS of the chromedriver/Chrome process tree per cycle", RSS_BUCKETS),
+    'instagram_bot_schedule_drift_seconds': ('histogram', "How late scheduled jobs started, by job", DRIFT_BUCKETS),
+    'instagram_bot_following': ('gauge', "Users currently followed by the bot, as of the last cycle", None),
+}
+
+# Rendered from the stats rollup rather than stored here
+ACTIONS_METRIC = 'instagram_bot_actions_total'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = []
+    for key in sorted(labels):
+        value = str(labels[key]).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return ','.join(escaped)
+
+
+def _sample(name, label_str, value, extra_label=None):
+    labels = ','.join(part for part in (label_str, extra_label) if part)
+    return f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+
+
+class MetricsRegistry:
+    def __init__(self, data_dir, filename='metrics.json'):
+        self.metrics_file = Path(data_dir) / filename
+        self._lock = threading.Lock()
+        self._signature = None
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.refresh()
+
+    def refresh(self):
+        """Reload metrics.json only if another process rewrote it"""
+        signature = file_signature(self.metrics_file)
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            with open(self.metrics_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        with self._lock:
+            self.counters = data.get('counters', {})
+            self.gauges = data.get('gauges', {})
+            self.histograms = data.get('histograms', {})
+            self._signature = signature
+        return True
+
+    def inc(self, name, labels=None, value=1):
+        key = format_labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, labels=None):
+        key = format_labels(labels)
+        with self._lock:
+            self.gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name, value, labels=None):
+        buckets = METRICS[name][2]
+        key = format_labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.setdefault(key, {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist['buckets'][i] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    def observe_span(self, name, duration, **fields):
+        """PhaseTimer hook: every timed phase feeds the phase histogram"""
+        self.observe('instagram_bot_phase_duration_seconds', duration, {'phase': name})
+
+    def save(self):
+        with self._lock:
+            data = {'counters': self.counters, 'gauges': self.gauges, 'histograms': self.histograms}
+            atomic_write_json(self.metrics_file, data)
+            self._signature = file_signature(self.metrics_file)
+
+    def render(self, stats=None):
+        """Text exposition format; stats (a StatsAggregator) supplies the per-source action counters
+
+        Only reads metrics.json and the stats rollup, each reloaded when its file changed
+        """
+        self.refresh()
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text, buckets) in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                if metric_type != 'histogram':
+                    series = self.counters if metric_type == 'counter' else self.gauges
+                    for label_str, value in sorted(series.get(name, {}).items()):
+                        lines.append(_sample(name, label_str, value))
+                    continue
+                for label_str, hist in sorted(self.histograms.get(name, {}).items()):
+                    for bound, count in zip(buckets, hist['buckets']):
+                        lines.append(_sample(f"{name}_bucket", label_str, count, f'le="{bound}"'))
+                    lines.append(_sample(f"{name}_bucket", label_str, hist['count'], 'le="+Inf"'))
+                    lines.append(_sample(f"{name}_sum", label_str, round(hist['sum'], 4)))
+                    lines.append(_sample(f"{name}_count", label_str, hist['count']))
+
+        if stats is not None:
+            lines.append(f"# HELP {ACTIONS_METRIC} Actions logged by the bot, by action and source account")
+            lines.append(f"# TYPE {ACTIONS_METRIC} counter")
+            for source, counts in sorted(stats.totals_by_source().items()):
+                for action, value in sorted(counts.items()):
+                    lines.append(_sample(ACTIONS_METRIC, format_labels({'action': action, 'source': source}), value))
+
+        return '\n'.join(lines) + '\n'
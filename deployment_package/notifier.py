@@ -0,0 +1,196 @@
+"""
+Background notification dispatcher
+Email and Discord messages are queued and sent from one worker thread, so a slow SMTP server or
+webhook never holds up a cycle. The worker keeps its SMTP connection and HTTP session between sends
+and folds messages that arrive close together into a single digest per channel
+"""
+import queue
+import smtplib
+import threading
+import time
+from datetime import datetime, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Discord rejects embed descriptions longer than 4096 characters
+DISCORD_DESCRIPTION_LIMIT = 4000
+_STOP = object()
+
+
+class Notifier:
+    def __init__(self, config, logger, digest_window=5.0, max_retries=3, smtp_timeout=15,
+                 smtp_idle_seconds=120, http_timeout=(5, 10), queue_size=1000):
+        # The notifications section of config.json as a dict; replaced by update_config on reload
+        self.config = config
+        self.logger = logger
+        self.digest_window = digest_window
+        self.max_retries = max_retries
+        self.smtp_timeout = smtp_timeout
+        self.smtp_idle_seconds = smtp_idle_seconds
+        self.http_timeout = http_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._smtp = None
+        self._smtp_key = None
+        self._smtp_used = 0.0
+        self._session = self._create_session()
+        self._thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+        self._thread.start()
+
+    def _create_session(self):
+        session = requests.Session()
+        # Retries connection errors, 429 (honouring Retry-After) and 5xx with backoff
+        retry = Retry(total=self.max_retries, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(['POST']), raise_on_status=False)
+        session.mount('https://', HTTPAdapter(max_retries=retry, pool_maxsize=1))
+        session.mount('http://', HTTPAdapter(max_retries=retry, pool_maxsize=1))
+        return session
+
+    def _channel_config(self, channel, is_error):
+        config = (self.config or {}).get(channel, {})
+        if not config.get('enabled'):
+            return None
+        if is_error and not config.get('error_alerts', True):
+            return None
+        return config
+
+    def update_config(self, config):
+        """Takes effect from the next message; the SMTP connection is rebuilt if its server, login or TLS setting changed"""
+        self.config = config
+
+    def _enqueue(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.logger.warning(f"⚠️ Notification queue full, dropping {item['channel']} message")
+
+    def email(self, subject, body, is_error=False):
+        if self._channel_config('email', is_error) is not None:
+            self._enqueue({'channel': 'email', 'subject': subject, 'body': body, 'is_error': is_error})
+
+    def discord(self, message, is_error=False):
+        if self._channel_config('discord', is_error) is not None:
+            self._enqueue({'channel': 'discord', 'body': message, 'is_error': is_error})
+
+    def close(self, timeout=30):
+        """Send whatever is queued, then stop the worker and drop its connections"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            # Gather the rest of the burst into one digest
+            deadline = time.monotonic() + self.digest_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._dispatch(batch)
+        self._close_smtp()
+        self._session.close()
+
+    def _dispatch(self, batch):
+        emails = [item for item in batch if item['channel'] == 'email']
+        discords = [item for item in batch if item['channel'] == 'discord']
+        if emails:
+            try:
+                self._send_email(emails)
+            except Exception as e:
+                self.logger.error(f"❌ Failed to send email: {e}")
+        if discords:
+            try:
+                self._send_discord(discords)
+            except Exception as e:
+                self.logger.error(f"❌ Failed to send Discord notification: {e}")
+
+    def _smtp_connection(self, config):
+        key = (config['smtp_server'], config['smtp_port'], config.get('sender_email'), config.get('sender_password'),
+               config.get('use_tls', True))
+        stale = time.monotonic() - self._smtp_used > self.smtp_idle_seconds
+        if self._smtp is not None and (key != self._smtp_key or stale):
+            self._close_smtp()
+        if self._smtp is None:
+            server = smtplib.SMTP(config['smtp_server'], config['smtp_port'], timeout=self.smtp_timeout)
+            if config.get('use_tls', True):
+                server.starttls()
+            if config.get('sender_password'):
+                server.login(config['sender_email'], config['sender_password'])
+            self._smtp, self._smtp_key = server, key
+        return self._smtp
+
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _send_email(self, items):
+        config = self._channel_config('email', False)
+        if config is None:
+            return
+        if len(items) == 1:
+            subject, body = items[0]['subject'], items[0]['body']
+        else:
+            subject = f"Digest ({len(items)}): " + ', '.join(item['subject'] for item in items)
+            body = '\n\n'.join(f"--- {item['subject']} ---\n{item['body']}" for item in items)
+
+        msg = MIMEMultipart()
+        msg['From'] = config['sender_email']
+        msg['To'] = config['recipient_email']
+        msg['Subject'] = f"[Instagram Bot] {subject}"[:200]
+        msg.attach(MIMEText(body, 'plain'))
+        text = msg.as_string()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._smtp_connection(config).sendmail(config['sender_email'], config['recipient_email'], text)
+                self._smtp_used = time.monotonic()
+                self.logger.info(f"📧 Email sent: {subject}")
+                return
+            except (smtplib.SMTPException, OSError) as e:
+                # The server may have dropped an idle connection; reconnect on the next attempt
+                self._close_smtp()
+                if attempt == self.max_retries:
+                    raise
+                self.logger.warning(f"⚠️ Email attempt {attempt + 1} failed: {e}")
+                time.sleep(2 ** attempt)
+
+    def _send_discord(self, items):
+        config = self._channel_config('discord', False)
+        if config is None:
+            return
+        description = '\n\n'.join(item['body'] for item in items)
+        if len(description) > DISCORD_DESCRIPTION_LIMIT:
+            description = description[:DISCORD_DESCRIPTION_LIMIT - 1] + '…'
+        is_error = any(item['is_error'] for item in items)
+        payload = {
+            "embeds": [{
+                "title": "Instagram Bot Update" if len(items) == 1 else f"Instagram Bot Digest ({len(items)})",
+                "description": description,
+                "color": 0xff0000 if is_error else 0x00ff00,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }]
+        }
+        response = self._session.post(config['webhook_url'], json=payload, timeout=self.http_timeout)
+        if response.ok:
+            self.logger.info(f"📱 Discord notification sent")
+        else:
+            self.logger.error(f"❌ Discord notification failed: {response.status_code}")
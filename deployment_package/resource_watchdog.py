@@ -0,0 +1,150 @@
+"""
+Chrome resource watchdog
+A daemon thread samples RSS and CPU of chromedriver and every Chrome process under it and keeps the peaks.
+It only reads process stats through psutil and never touches the WebDriver; the bot asks over_limit()
+between actions and restarts its driver at a point where progress is already saved
+"""
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MB = 1024 * 1024
+
+
+class ResourceWatchdog:
+    def __init__(self, logger, rss_limit_mb=1500, cpu_limit_percent=0, interval=5.0, cpu_samples=6):
+        self.logger = logger
+        # 0 disables a limit; peaks are still recorded
+        self.rss_limit_mb = rss_limit_mb
+        self.cpu_limit_percent = cpu_limit_percent
+        self.interval = interval
+        # CPU has to stay above its limit this many samples in a row; page loads spike briefly
+        self.cpu_samples = cpu_samples
+        self.enabled = psutil is not None
+        if not self.enabled:
+            self.logger.warning("⚠️ psutil not installed, Chrome resource watchdog disabled")
+
+        self._lock = threading.Lock()
+        self._root = None
+        # pid -> psutil.Process, kept so cpu_percent() measures from the previous sample
+        self._processes = {}
+        self._cpu_high = 0
+        self._reason = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._reset_peaks()
+
+    def _reset_peaks(self):
+        self.peak_rss_mb = 0.0
+        self.peak_cpu_percent = 0.0
+        self.samples = 0
+        # kind ('memory' or 'cpu') -> driver restarts
+        self.restarts = {}
+
+    def attach(self, pid):
+        """Watch the process tree under pid (chromedriver); replaces whatever was watched before"""
+        if not self.enabled:
+            return
+        try:
+            root = psutil.Process(pid)
+        except psutil.Error:
+            return
+        with self._lock:
+            self._root = root
+            self._processes = {}
+            self._cpu_high = 0
+            self._reason = None
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='chrome-watchdog', daemon=True)
+            self._thread.start()
+
+    def detach(self):
+        with self._lock:
+            self._root = None
+            self._processes = {}
+            self._reason = None
+
+    def close(self):
+        self.detach()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.debug(f"Watchdog sample failed: {e}")
+
+    def sample(self):
+        """One reading of the whole tree: (rss_mb, cpu_percent), or None when nothing is attached"""
+        with self._lock:
+            root = self._root
+        if root is None:
+            return None
+        try:
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            # chromedriver exited; the next attach starts over
+            self.detach()
+            return None
+
+        processes = {}
+        rss = 0
+        cpu = 0.0
+        for process in tree:
+            process = self._processes.get(process.pid, process)
+            try:
+                rss += process.memory_info().rss
+                # The first call on a new Process reports 0.0 and starts its measurement
+                cpu += process.cpu_percent(None)
+            except psutil.Error:
+                continue
+            processes[process.pid] = process
+        rss_mb = rss / MB
+
+        with self._lock:
+            if self._root is not root:
+                return None
+            self._processes = processes
+            self.samples += 1
+            self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+            self.peak_cpu_percent = max(self.peak_cpu_percent, cpu)
+            if self.cpu_limit_percent and cpu > self.cpu_limit_percent:
+                self._cpu_high += 1
+            else:
+                self._cpu_high = 0
+            if self._reason is None:
+                if self.rss_limit_mb and rss_mb > self.rss_limit_mb:
+                    self._reason = ('memory', f"RSS {rss_mb:.0f} MB > {self.rss_limit_mb} MB")
+                elif self.cpu_samples and self._cpu_high >= self.cpu_samples:
+                    self._reason = ('cpu', f"CPU {cpu:.0f}% > {self.cpu_limit_percent}% "
+                                           f"for {self._cpu_high * self.interval:.0f}s")
+        return rss_mb, cpu
+
+    def over_limit(self):
+        """(kind, description) once the tree crossed a limit, else None; cleared by attach()"""
+        with self._lock:
+            return self._reason
+
+    def record_restart(self, kind):
+        with self._lock:
+            self.restarts[kind] = self.restarts.get(kind, 0) + 1
+
+    def take_peaks(self):
+        """Peaks and restarts since the last take, then start over"""
+        # A fresh reading so a cycle shorter than the interval still reports something
+        self.sample()
+        with self._lock:
+            peaks = {
+                'rss_mb': round(self.peak_rss_mb, 1),
+                'cpu_percent': round(self.peak_cpu_percent, 1),
+                'samples': self.samples,
+                'restarts': dict(self.restarts)
+            }
+            self._reset_peaks()
+        return peaks
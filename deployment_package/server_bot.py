@@ -3,22 +3,39 @@
 Instagram Automation Server Bot - Autonomous Deployment Version
 Runs 24/7 on server, reads config file for settings, sends notifications
 """
-import json
+import math
 import time
 import logging
 import schedule
-import smtplib
-import requests
 from datetime import datetime, timedelta
 from pathlib import Path
-from email.mime.text import MimeText
-from email.mime.multipart import MimeMultipart
 import os
 import sys
 import signal
+import threading
 
 # Import the bot logic from our GUI version
-from instagram_gui import InstagramBotGUI
+from instagram_gui import InstagramBotGUI, DriverRestartError
+from action_log import ActionLog
+from ledger import open_ledger, read_counts
+from stats import open_stats
+from session import BrowserSession
+from driver_pool import WarmDriverHolder
+from waits import PacingPolicy
+from timing import PhaseTimer
+from metrics import MetricsRegistry
+from unfollow_queue import UnfollowQueue
+from notifier import Notifier
+from config_service import ConfigService, as_dict
+from log_pipeline import LogPipeline
+from resource_watchdog import ResourceWatchdog
+
+# Upper bound on one idle wait, so a wall-clock jump cannot strand the loop past a due job
+MAX_IDLE_SECONDS = 300
+# Jobs starting later than this are logged as warnings
+DRIFT_WARN_SECONDS = 5
+# Longest pause between unfollow slots after repeated failures (e.g. a login that keeps failing)
+MAX_UNFOLLOW_BACKOFF_SECONDS = 6 * 3600
 
 class ServerInstagramBot:
     def __init__(self):
@@ -28,219 +45,231 @@ class ServerInstagramBot:
         self.config_file = Path('config.json')
         self.running = True
         
+        # Set to cut the main loop's idle wait short (shutdown, config reload)
+        self.wakeup = threading.Event()
+        self.reload_requested = False
+        
         # Setup logging
         self.setup_logging()
         
-        # Load configuration
-        self.config = self.load_config()
+        # Validated config, re-read only when config.json changes
+        self.config_service = ConfigService(self.config_file, self.logger)
+        self.on_logging_config(self.config.logging)
+        
+        # Email/Discord messages go out from a background worker, batched into digests
+        self.notifier = Notifier(as_dict(self.config.notifications), self.logger)
+        
+        # Running stats shared with the bot instances and the dashboard
+        self.stats = self.open_stats()
+        
+        # Errors go to the action log too, so the dashboard's live stream shows them
+        self.action_log = ActionLog(self.data_dir, migrate=False)
+        
+        # Counters, gauges and histograms persisted to bot_data/metrics.json for the dashboard's /metrics
+        self.metrics = MetricsRegistry(self.data_dir)
+        
+        # Per-phase timings summarized per cycle and fed to the metrics; bot_settings.timing adds timings.jsonl
+        self.timer = self.create_timer()
+        
+        # Due-time queue of users to unfollow, drained a few at a time through the day
+        self.unfollow_queue = self.open_unfollow_queue()
+        
+        # Consecutive failed unfollow slots; they back off and alert once instead of every slot
+        self.unfollow_failures = 0
+        self.unfollow_retry_at = 0.0
+        
+        # Samples Chrome's memory/CPU; bots restart their driver mid-cycle when it crosses the limits
+        self.watchdog = self.create_watchdog()
+        
+        # Optional warm driver reused across scheduled cycles
+        self.driver_pool = self.create_driver_pool()
+        
+        # Each subsystem hears only about the config sections it depends on
+        self.config_service.subscribe('schedule', self.on_schedule_config)
+        self.config_service.subscribe('instagram', self.on_instagram_config)
+        self.config_service.subscribe('notifications', lambda new, old: self.notifier.update_config(as_dict(new)))
+        self.config_service.subscribe('bot_settings', self.on_bot_settings)
+        self.config_service.subscribe('logging', self.on_logging_config)
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGTERM, self.signal_handler)
         signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGHUP, self.reload_signal_handler)
         
         self.logger.info("🚀 Server Instagram Bot initialized")
         
     def setup_logging(self):
-        """Setup comprehensive logging"""
-        log_dir = Path('logs')
-        log_dir.mkdir(exist_ok=True)
+        """Route every logger through a queue to a console and a daily-rotated, gzipped logs/bot.log"""
+        self.log_pipeline = LogPipeline(Path('logs'))
+        self.logger = logging.getLogger('ServerBot')
+        
+    def on_logging_config(self, new, old=None):
+        self.log_pipeline.configure(json_format=new.json_format, backup_days=new.backup_days, level=new.level)
+        
+    def send_email_notification(self, subject, body, is_error=False):
+        """Queue an email notification; the notifier thread sends it"""
+        self.notifier.email(subject, body, is_error)
+            
+    def send_discord_notification(self, message, is_error=False):
+        """Queue a Discord webhook notification; the notifier thread sends it"""
+        self.notifier.discord(message, is_error)
+            
+    def open_stats(self):
+        """Open the stats rollup, seeding it from history on first run"""
+        return open_stats(self.data_dir, ActionLog(self.data_dir, migrate=False),
+                          lambda: read_counts(self.data_dir, self.config.bot_settings.ledger_backend))
+            
+    def open_unfollow_queue(self):
+        """Load the unfollow queue and bring it fully in line with the ledger"""
+        queue = UnfollowQueue(self.data_dir, self.config.instagram.unfollow_after_hours)
+        ledger = open_ledger(self.data_dir, self.config.bot_settings.ledger_backend)
+        try:
+            queue.sync(ledger, full=True)
+        finally:
+            ledger.close()
+        self.logger.info(f"📋 Unfollow queue holds {len(queue)} users")
+        return queue
+        
+    def unfollow_budget(self, now=None):
+        """Unfollows allowed this slot: what is left of the daily cap, split over the day's remaining slots"""
+        now = now or datetime.now()
+        remaining = self.config.instagram.daily_unfollow_limit - self.get_bot_stats().get('today_unfollows', 0)
+        if remaining <= 0:
+            return 0
+        interval = self.config.schedule.unfollow_interval_minutes
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        slots_left = max(1, math.ceil((midnight - now).total_seconds() / 60 / interval))
+        return math.ceil(remaining / slots_left)
         
-        # Create formatters
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    def create_bot(self, target_accounts, users_per_account):
+        """Build a bot bound to the server's data dir and saved browser session"""
+        instagram_config = self.config.instagram
+        bot_settings = self.config.bot_settings
+        return InstagramBotGUI(
+            instagram_config.username,
+            instagram_config.password,
+            target_accounts,
+            users_per_account,
+            action_log_fsync=bot_settings.action_log_fsync,
+            ledger_backend=bot_settings.ledger_backend,
+            data_dir=self.data_dir,
+            session=BrowserSession(self.data_dir, instagram_config.username),
+            pacing=PacingPolicy(bot_settings.pacing),
+            timer=self.timer,
+            use_bloom=bot_settings.bloom_prefilter,
+            lean=bot_settings.lean_driver,
+            track_network=bot_settings.network_stats,
+            watchdog=self.watchdog
         )
         
-        # File handler - daily rotation
-        today = datetime.now().strftime("%Y%m%d")
-        file_handler = logging.FileHandler(log_dir / f'bot_{today}.log')
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(logging.INFO)
+    def create_timer(self):
+        timings_dir = self.data_dir if self.config.bot_settings.timing else None
+        return PhaseTimer(timings_dir, on_record=self.metrics.observe_span)
         
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        console_handler.setLevel(logging.INFO)
+    def create_watchdog(self):
+        bot_settings = self.config.bot_settings
+        return ResourceWatchdog(
+            self.logger,
+            rss_limit_mb=bot_settings.watchdog_rss_limit_mb,
+            cpu_limit_percent=bot_settings.watchdog_cpu_limit_percent,
+            interval=bot_settings.watchdog_interval_seconds
+        )
         
-        # Setup logger
-        self.logger = logging.getLogger('ServerBot')
-        self.logger.setLevel(logging.INFO)
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-        
-    def load_config(self):
-        """Load configuration from config.json"""
-        default_config = {
-            "instagram": {
-                "username": "",
-                "password": "",
-                "target_accounts": ["deadmau5", "skrillex", "1001tracklists"],
-                "users_per_account": 5,
-                "daily_follow_limit": 15,
-                "unfollow_after_hours": 48
-            },
-            "schedule": {
-                "follow_time": "09:00",
-                "unfollow_time": "15:00",
-                "timezone": "UTC"
-            },
-            "notifications": {
-                "email": {
-                    "enabled": True,
-                    "smtp_server": "smtp.gmail.com",
-                    "smtp_port": 587,
-                    "sender_email": "",
-                    "sender_password": "",
-                    "recipient_email": "",
-                    "daily_report": True,
-                    "error_alerts": True
-                },
-                "discord": {
-                    "enabled": False,
-                    "webhook_url": "",
-                    "daily_report": True,
-                    "error_alerts": True
-                }
-            },
-            "web_dashboard": {
-                "enabled": True,
-                "port": 5000,
-                "password": "admin123",
-                "host": "0.0.0.0"
-            },
-            "bot_settings": {
-                "headless": True,
-                "follow_delay_min": 15,
-                "follow_delay_max": 30,
-                "max_retries": 3
-            }
-        }
-        
-        if not self.config_file.exists():
-            with open(self.config_file, 'w') as f:
-                json.dump(default_config, f, indent=2)
-            self.logger.info(f"📝 Created default config file: {self.config_file}")
-            
-        try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
-            self.logger.info("✅ Configuration loaded successfully")
-            return config
-        except Exception as e:
-            self.logger.error(f"❌ Error loading config: {e}")
-            return default_config
-            
-    def save_config(self):
-        """Save current configuration"""
+    def create_driver_pool(self):
+        """Warm driver holder, or None when bot_settings.reuse_driver is off"""
+        bot_settings = self.config.bot_settings
+        if not bot_settings.reuse_driver:
+            return None
+        return WarmDriverHolder(
+            lambda: self.create_bot([], 0),
+            self.logger,
+            max_cycles=bot_settings.driver_max_cycles,
+            max_hours=bot_settings.driver_max_hours,
+            metrics=self.metrics
+        )
+        
+    def acquire_bot(self, target_accounts, users_per_account):
+        """Logged-in bot for one cycle, taken from the warm pool when enabled"""
+        if self.driver_pool:
+            return self.driver_pool.acquire(target_accounts, users_per_account)
+            
+        bot = self.create_bot(target_accounts, users_per_account)
+        if not bot.init_driver(show_browser=False):  # Always headless on server
+            raise Exception("Failed to initialize Chrome driver")
+        self.metrics.inc('instagram_bot_driver_launches_total')
+        if not bot.login():
+            bot.driver.quit()
+            raise Exception("Failed to login to Instagram")
+        return bot
+        
+    def release_bot(self, bot, failed=False):
+        """Hand the bot back after a cycle; a failed cycle never leaves its driver warm"""
+        if self.driver_pool:
+            if failed and self.driver_pool.bot is not None:
+                self.metrics.inc('instagram_bot_driver_restarts_total', {'reason': 'cycle_failed'})
+                self.driver_pool.discard("cycle failed")
+            return
+        if bot and bot.driver:
+            bot.driver.quit()
+            
+    def record_network(self, cycle, bot):
+        """Log and count the requests and bytes Chrome used during a cycle"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
-            self.logger.info("💾 Configuration saved")
+            usage = bot.network_usage()
         except Exception as e:
-            self.logger.error(f"❌ Error saving config: {e}")
-            
-    def send_email_notification(self, subject, body, is_error=False):
-        """Send email notification"""
+            self.logger.error(f"❌ Error reading network usage: {e}")
+            return
+        if not usage:
+            return
+        self.logger.info(f"🌐 {cycle.title()} cycle network: {usage['requests']} requests, "
+                         f"{usage['blocked']} blocked, {usage['bytes'] / 1e6:.2f} MB downloaded")
+        loaded = usage['requests'] - usage['blocked'] - usage['failed']
+        for outcome, count in (('loaded', loaded), ('blocked', usage['blocked']), ('failed', usage['failed'])):
+            if count > 0:
+                self.metrics.inc('instagram_bot_network_requests_total', {'cycle': cycle, 'outcome': outcome}, count)
+        self.metrics.inc('instagram_bot_network_bytes_total', {'cycle': cycle}, usage['bytes'])
+        
+    def record_resources(self, cycle):
+        """Log Chrome's peak memory/CPU for the cycle and count watchdog restarts"""
+        peaks = self.watchdog.take_peaks()
+        for kind, count in peaks['restarts'].items():
+            self.metrics.inc('instagram_bot_driver_restarts_total', {'reason': kind}, count)
+        if not peaks['samples']:
+            return
+        self.logger.info(f"🧠 {cycle.title()} cycle Chrome peak: {peaks['rss_mb']:.0f} MB RSS, "
+                         f"{peaks['cpu_percent']:.0f}% CPU ({sum(peaks['restarts'].values())} watchdog restarts)")
+        self.metrics.observe('instagram_bot_chrome_peak_rss_megabytes', peaks['rss_mb'], {'cycle': cycle})
+        
+    def log_error_event(self, where, message):
+        """Append an 'error' record to the action log for live viewers"""
         try:
-            email_config = self.config['notifications']['email']
-            if not email_config['enabled']:
-                return
-                
-            if is_error and not email_config['error_alerts']:
-                return
-                
-            msg = MimeMultipart()
-            msg['From'] = email_config['sender_email']
-            msg['To'] = email_config['recipient_email']
-            msg['Subject'] = f"[Instagram Bot] {subject}"
-            
-            msg.attach(MimeText(body, 'plain'))
-            
-            server = smtplib.SMTP(email_config['smtp_server'], email_config['smtp_port'])
-            server.starttls()
-            server.login(email_config['sender_email'], email_config['sender_password'])
-            text = msg.as_string()
-            server.sendmail(email_config['sender_email'], email_config['recipient_email'], text)
-            server.quit()
-            
-            self.logger.info(f"📧 Email sent: {subject}")
-            
+            self.action_log.append({
+                "timestamp": datetime.now().isoformat(),
+                "action": "error",
+                "target": where,
+                "details": message
+            })
         except Exception as e:
-            self.logger.error(f"❌ Failed to send email: {e}")
+            self.logger.error(f"❌ Error logging error event: {e}")
             
-    def send_discord_notification(self, message, is_error=False):
-        """Send Discord webhook notification"""
+    def record_cycle(self, cycle, started, failed):
+        """Count and time a finished cycle, then publish metrics for the dashboard"""
         try:
-            discord_config = self.config['notifications']['discord']
-            if not discord_config['enabled']:
-                return
-                
-            if is_error and not discord_config['error_alerts']:
-                return
-                
-            color = 0xff0000 if is_error else 0x00ff00
-            
-            payload = {
-                "embeds": [{
-                    "title": "Instagram Bot Update",
-                    "description": message,
-                    "color": color,
-                    "timestamp": datetime.utcnow().isoformat()
-                }]
-            }
-            
-            response = requests.post(discord_config['webhook_url'], json=payload)
-            if response.status_code == 204:
-                self.logger.info(f"📱 Discord notification sent")
-            else:
-                self.logger.error(f"❌ Discord notification failed: {response.status_code}")
-                
+            self.metrics.inc('instagram_bot_cycles_total', {'cycle': cycle, 'outcome': 'failed' if failed else 'ok'})
+            self.metrics.observe('instagram_bot_cycle_duration_seconds', time.monotonic() - started, {'cycle': cycle})
+            # Published here so /metrics never has to read the ledger
+            following = read_counts(self.data_dir, self.config.bot_settings.ledger_backend).get('following', 0)
+            self.metrics.set('instagram_bot_following', following)
+            self.metrics.save()
         except Exception as e:
-            self.logger.error(f"❌ Failed to send Discord notification: {e}")
+            self.logger.error(f"❌ Error saving metrics: {e}")
             
     def get_bot_stats(self):
         """Get current bot statistics"""
         try:
-            follows_file = self.data_dir / 'follows.json'
-            action_log_file = self.data_dir / 'action_log.json'
-            
-            follows_data = {}
-            action_log = []
-            
-            if follows_file.exists():
-                with open(follows_file, 'r') as f:
-                    follows_data = json.load(f)
-                    
-            if action_log_file.exists():
-                with open(action_log_file, 'r') as f:
-                    action_log = json.load(f)
-            
-            # Calculate stats
-            now = datetime.now()
-            today = now.date()
-            
-            following = [u for u, d in follows_data.items() if d.get('status') == 'following']
-            unfollowed = [u for u, d in follows_data.items() if d.get('status') == 'unfollowed']
-            
-            today_follows = len([
-                a for a in action_log 
-                if a.get('action') == 'follow' 
-                and datetime.fromisoformat(a['timestamp']).date() == today
-            ])
-            
-            today_unfollows = len([
-                a for a in action_log 
-                if a.get('action') == 'unfollow' 
-                and datetime.fromisoformat(a['timestamp']).date() == today
-            ])
-            
-            return {
-                'total_following': len(following),
-                'total_unfollowed': len(unfollowed),
-                'today_follows': today_follows,
-                'today_unfollows': today_unfollows,
-                'last_action': action_log[-1]['timestamp'] if action_log else None,
-                'status': 'running' if self.running else 'stopped'
-            }
+            stats = self.stats.snapshot()
+            stats['status'] = 'running' if self.running else 'stopped'
+            return stats
             
         except Exception as e:
             self.logger.error(f"❌ Error getting stats: {e}")
@@ -261,8 +290,8 @@ class ServerInstagramBot:
 • Followed: {stats.get('today_follows', 0)} new users
 • Unfollowed: {stats.get('today_unfollows', 0)} users
 
-🎯 Target Accounts: {', '.join(self.config['instagram']['target_accounts'])}
-⚙️ Daily Limit: {self.config['instagram']['daily_follow_limit']} follows
+🎯 Target Accounts: {', '.join(self.config.instagram.target_accounts)}
+⚙️ Daily Limit: {self.config.instagram.daily_follow_limit} follows
 
 {f"🕒 Last Action: {stats.get('last_action', 'None')}" if stats.get('last_action') else "📋 No actions today"}
 
@@ -283,152 +312,231 @@ Autonomous Instagram Bot Server
             
     def run_follow_cycle(self):
         """Run the follow cycle"""
+        bot = None
+        failed = False
+        started = time.monotonic()
         try:
             self.logger.info("🚀 Starting follow cycle")
             
             # Check daily limit
             stats = self.get_bot_stats()
-            if stats.get('today_follows', 0) >= self.config['instagram']['daily_follow_limit']:
-                self.logger.info(f"📊 Daily follow limit reached ({self.config['instagram']['daily_follow_limit']})")
+            if stats.get('today_follows', 0) >= self.config.instagram.daily_follow_limit:
+                self.logger.info(f"📊 Daily follow limit reached ({self.config.instagram.daily_follow_limit})")
                 return
                 
-            # Create bot instance
-            instagram_config = self.config['instagram']
-            bot = InstagramBotGUI(
-                instagram_config['username'],
-                instagram_config['password'],
-                instagram_config['target_accounts'],
-                instagram_config['users_per_account']
-            )
-            
-            # Initialize driver
-            if not bot.init_driver(show_browser=False):  # Always headless on server
-                raise Exception("Failed to initialize Chrome driver")
-                
-            # Login
-            if not bot.login():
-                raise Exception("Failed to login to Instagram")
-                
+            # Get a logged-in bot
+            instagram_config = self.config.instagram
+            bot = self.acquire_bot(list(instagram_config.target_accounts), instagram_config.users_per_account)
             self.logger.info("✅ Bot logged in successfully")
             
             # Follow users from target accounts
             total_follows = 0
-            for account in instagram_config['target_accounts']:
+            for account in instagram_config.target_accounts:
                 try:
                     follows = bot.follow_users_from_account(account)
-                    total_follows += follows
-                    self.logger.info(f"📊 Followed {follows} users from @{account}")
+                    total_follows += len(follows)
+                    self.logger.info(f"📊 Followed {len(follows)} users from @{account}")
                     
                     # Check if we've hit daily limit
                     current_stats = self.get_bot_stats()
-                    if current_stats.get('today_follows', 0) >= instagram_config['daily_follow_limit']:
+                    if current_stats.get('today_follows', 0) >= instagram_config.daily_follow_limit:
                         self.logger.info("📊 Daily follow limit reached, stopping")
                         break
                         
                 except Exception as e:
+                    self.metrics.inc('instagram_bot_errors_total', {'where': 'follow_account'})
                     self.logger.error(f"❌ Error with account @{account}: {e}")
+                    self.log_error_event(account, str(e))
+                    
+                # The watchdog stopped Chrome and it did not come back; fail the cycle so the bot is discarded
+                if bot.driver is None:
+                    self.unfollow_queue.sync(bot.ledger)
+                    raise DriverRestartError(f"Chrome restart failed after {total_follows} follows")
                     
-            # Cleanup
-            if bot.driver:
-                bot.driver.quit()
-                
             self.logger.info(f"🎉 Follow cycle completed: {total_follows} total follows")
+            self.unfollow_queue.sync(bot.ledger)
             
             # Send notification for significant activity
             if total_follows > 0:
-                message = f"✅ Follow cycle completed: {total_follows} new follows from {len(instagram_config['target_accounts'])} accounts"
+                message = f"✅ Follow cycle completed: {total_follows} new follows from {len(instagram_config.target_accounts)} accounts"
                 self.send_discord_notification(message)
                 
         except Exception as e:
+            failed = True
+            self.metrics.inc('instagram_bot_errors_total', {'where': 'follow_cycle'})
             error_msg = f"❌ Follow cycle failed: {str(e)}"
             self.logger.error(error_msg)
+            self.log_error_event('follow_cycle', str(e))
             self.send_email_notification("Follow Cycle Error", error_msg, is_error=True)
             self.send_discord_notification(error_msg, is_error=True)
+        finally:
+            if bot is not None:
+                self.record_network('follow', bot)
+                self.record_resources('follow')
+            self.release_bot(bot, failed)
+            self.timer.log_summary(self.logger, "Follow cycle")
+            self.record_cycle('follow', started, failed)
             
     def run_unfollow_cycle(self):
-        """Run the unfollow cycle"""
+        """Unfollow whoever is due in the unfollow queue, within this slot's share of the daily cap"""
+        bot = None
+        failed = False
+        started = time.monotonic()
         try:
-            self.logger.info("🔄 Starting unfollow cycle")
-            
-            # Create bot instance
-            instagram_config = self.config['instagram']
-            bot = InstagramBotGUI(
-                instagram_config['username'],
-                instagram_config['password'],
-                [],  # No target accounts needed for unfollow
-                0
-            )
-            
-            # Initialize driver
-            if not bot.init_driver(show_browser=False):
-                raise Exception("Failed to initialize Chrome driver")
+            instagram_config = self.config.instagram
+            budget = self.unfollow_budget()
+            if budget <= 0:
+                self.logger.info(f"📊 Daily unfollow limit reached ({instagram_config.daily_unfollow_limit})")
+                return
                 
-            # Login
-            if not bot.login():
-                raise Exception("Failed to login to Instagram")
+            # Nothing due means no browser at all
+            next_due = self.unfollow_queue.next_due()
+            if next_due is None or next_due > time.time():
+                return
                 
+            if time.time() < self.unfollow_retry_at:
+                self.logger.info(f"⏸️ Unfollow cycle backing off after {self.unfollow_failures} failures, "
+                                 f"next try at {datetime.fromtimestamp(self.unfollow_retry_at).strftime('%H:%M')}")
+                return
+                
+            self.logger.info(f"🔄 Starting unfollow cycle (up to {budget} users)")
+            
+            # Get a logged-in bot (no target accounts needed for unfollow)
+            bot = self.acquire_bot([], 0)
             self.logger.info("✅ Bot logged in for unfollow cycle")
             
-            # Unfollow old users
-            unfollowed_count = bot.unfollow_old_users(
-                hours_threshold=instagram_config['unfollow_after_hours']
-            )
+            # Pick up follows made outside the follow cycle before draining
+            self.unfollow_queue.sync(bot.ledger)
+            unfollowed_count = bot.unfollow_due_users(self.unfollow_queue, budget)
             
-            # Cleanup
-            if bot.driver:
-                bot.driver.quit()
-                
             self.logger.info(f"🔄 Unfollow cycle completed: {unfollowed_count} users unfollowed")
             
+            if self.unfollow_failures:
+                self.send_discord_notification(f"✅ Unfollow cycle recovered after {self.unfollow_failures} failed attempts")
+                self.unfollow_failures = 0
+                self.unfollow_retry_at = 0.0
+                
             # Send notification if users were unfollowed
             if unfollowed_count > 0:
-                message = f"🔄 Unfollow cycle completed: {unfollowed_count} users unfollowed (48+ hours old)"
+                message = f"🔄 Unfollow cycle completed: {unfollowed_count} users unfollowed ({instagram_config.unfollow_after_hours:g}+ hours old)"
                 self.send_discord_notification(message)
                 
         except Exception as e:
+            failed = True
+            self.metrics.inc('instagram_bot_errors_total', {'where': 'unfollow_cycle'})
             error_msg = f"❌ Unfollow cycle failed: {str(e)}"
             self.logger.error(error_msg)
-            self.send_email_notification("Unfollow Cycle Error", error_msg, is_error=True)
-            self.send_discord_notification(error_msg, is_error=True)
+            self.log_error_event('unfollow_cycle', str(e))
+            
+            # Retry on the next slot, then every 2nd, 4th, 8th... slot (half a slot of slack for scheduling
+            # jitter), and alert only on the first failure of a streak
+            self.unfollow_failures += 1
+            interval = self.config.schedule.unfollow_interval_minutes * 60
+            backoff = min(interval * (2 ** (self.unfollow_failures - 1)), MAX_UNFOLLOW_BACKOFF_SECONDS)
+            self.unfollow_retry_at = time.time() + backoff - interval / 2
+            if self.unfollow_failures == 1:
+                self.send_email_notification("Unfollow Cycle Error", error_msg, is_error=True)
+                self.send_discord_notification(error_msg, is_error=True)
+        finally:
+            if bot is not None:
+                self.record_network('unfollow', bot)
+                self.record_resources('unfollow')
+            self.release_bot(bot, failed)
+            self.timer.log_summary(self.logger, "Unfollow cycle")
+            self.record_cycle('unfollow', started, failed)
             
     def setup_schedule(self):
         """Setup the automation schedule"""
-        schedule_config = self.config['schedule']
+        schedule_config = self.config.schedule
         
         # Daily follow schedule
-        schedule.every().day.at(schedule_config['follow_time']).do(self.run_follow_cycle)
-        self.logger.info(f"📅 Follow cycle scheduled for {schedule_config['follow_time']} daily")
+        schedule.every().day.at(schedule_config.follow_time).do(self.run_follow_cycle)
+        self.logger.info(f"📅 Follow cycle scheduled for {schedule_config.follow_time} daily")
         
-        # Daily unfollow schedule  
-        schedule.every().day.at(schedule_config['unfollow_time']).do(self.run_unfollow_cycle)
-        self.logger.info(f"📅 Unfollow cycle scheduled for {schedule_config['unfollow_time']} daily")
+        # Unfollow queue drained in small slots through the day
+        interval = schedule_config.unfollow_interval_minutes
+        schedule.every(interval).minutes.do(self.run_unfollow_cycle)
+        self.logger.info(f"📅 Unfollow queue drained every {interval} minutes")
         
         # Daily report schedule
         schedule.every().day.at("20:00").do(self.send_daily_report)
         self.logger.info("📅 Daily report scheduled for 20:00")
         
-        # Config reload schedule (every hour)
-        schedule.every().hour.do(self.reload_config)
+    @property
+    def config(self):
+        """Current validated BotConfig"""
+        return self.config_service.config
         
     def reload_config(self):
-        """Reload configuration from file"""
+        """Apply config.json if it changed; subscribers react to the sections that did"""
         try:
-            old_config = self.config.copy()
-            self.config = self.load_config()
-            
-            # Check if schedule changed
-            if old_config.get('schedule') != self.config.get('schedule'):
-                schedule.clear()
-                self.setup_schedule()
-                self.logger.info("🔄 Schedule updated due to config change")
-                
+            self.config_service.reload()
         except Exception as e:
             self.logger.error(f"❌ Error reloading config: {e}")
             
+    def on_schedule_config(self, new, old):
+        schedule.clear()
+        self.setup_schedule()
+        self.logger.info("🔄 Schedule updated due to config change")
+        
+    def on_instagram_config(self, new, old):
+        # Due times follow unfollow_after_hours, so a new threshold rebuilds the queue;
+        # accounts and limits are read at the start of each cycle
+        if new.unfollow_after_hours != old.unfollow_after_hours:
+            self.unfollow_queue = self.open_unfollow_queue()
+            
+    def on_bot_settings(self, new, old):
+        # The warm bot was built with the old settings; the next cycle starts a fresh one
+        if self.driver_pool:
+            self.driver_pool.shutdown()
+        # Bots take the timer when they are built, so the fresh ones below pick up a timing toggle
+        if new.timing != old.timing:
+            self.timer.close()
+            self.timer = self.create_timer()
+        self.watchdog.close()
+        self.watchdog = self.create_watchdog()
+        self.driver_pool = self.create_driver_pool()
+        self.logger.info("🔄 Bot settings updated, driver will be relaunched")
+        
     def signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         self.logger.info(f"🛑 Received signal {signum}, shutting down gracefully...")
         self.running = False
+        self.wakeup.set()
+        
+    def reload_signal_handler(self, signum, frame):
+        """SIGHUP: reload config.json on the main loop right away"""
+        self.request_reload()
+        
+    def request_reload(self):
+        self.reload_requested = True
+        self.wakeup.set()
+        
+    def run_due_jobs(self):
+        """schedule.run_pending, logging how late each job started"""
+        jobs = sorted(job for job in schedule.jobs if job.should_run)
+        for job in jobs:
+            drift = (datetime.now() - job.next_run).total_seconds()
+            name = getattr(job.job_func, '__name__', str(job))
+            if drift > DRIFT_WARN_SECONDS:
+                self.logger.warning(f"⏰ {name} started {drift:.1f}s late")
+            else:
+                self.logger.debug(f"⏰ {name} started {drift:.3f}s late")
+            self.metrics.observe('instagram_bot_schedule_drift_seconds', max(drift, 0.0), {'job': name})
+            if job.run() is schedule.CancelJob:
+                schedule.cancel_job(job)
+        if jobs:
+            try:
+                self.metrics.save()
+            except Exception as e:
+                self.logger.error(f"❌ Error saving metrics: {e}")
+                
+    def wait_for_next_job(self):
+        """Sleep until the next job is due, or until woken by a signal or reload request"""
+        idle = schedule.idle_seconds()
+        timeout = MAX_IDLE_SECONDS if idle is None else min(max(idle, 0), MAX_IDLE_SECONDS)
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
         
     def run(self):
         """Main run loop"""
@@ -443,24 +551,41 @@ Autonomous Instagram Bot Server
             # Setup schedule
             self.setup_schedule()
             
-            # Main loop
+            # config.json edits wake the main loop within a couple of seconds
+            self.config_service.watch(self.request_reload)
+            
+            # Main loop: sleeps until the next due job instead of polling
             while self.running:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.reload_config()
+                self.run_due_jobs()
+                if self.running:
+                    self.wait_for_next_job()
                 
             self.logger.info("🛑 Bot server stopped")
             
         except Exception as e:
             error_msg = f"💥 Critical error in main loop: {str(e)}"
             self.logger.error(error_msg)
+            self.log_error_event('main_loop', str(e))
             self.send_email_notification("Critical Error", error_msg, is_error=True)
             self.send_discord_notification(error_msg, is_error=True)
             
         finally:
+            if self.driver_pool:
+                self.driver_pool.shutdown()
+            self.watchdog.close()
+            self.timer.close()
+            self.action_log.close()
+                
             # Send shutdown notification
             shutdown_msg = f"🛑 Instagram Bot Server stopped at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             self.send_email_notification("Bot Stopped", shutdown_msg)
             self.send_discord_notification(shutdown_msg)
+            self.notifier.close()
+            self.config_service.close()
+            self.log_pipeline.close()
 
 if __name__ == "__main__":
     bot = ServerInstagramBot()
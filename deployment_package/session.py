@@ -0,0 +1,64 @@
+"""
+Browser session persistence
+Saves Instagram cookies so a new driver can skip the login form
+"""
+import json
+import os
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+try:
+    from .storage import atomic_write_json
+except ImportError:
+    from storage import atomic_write_json
+
+
+class BrowserSession:
+    def __init__(self, data_dir, username):
+        self.username = username
+        self.sessions_dir = Path(data_dir) / 'sessions'
+        self.sessions_dir.mkdir(exist_ok=True)
+        self.cookies_file = self.sessions_dir / f'{username}.cookies.json'
+
+    def has_cookies(self):
+        return self.cookies_file.exists()
+
+    def save_cookies(self, driver):
+        """Persist the driver's cookies; the file holds a live session so keep it private"""
+        try:
+            cookies = driver.get_cookies()
+        except WebDriverException:
+            return False
+        atomic_write_json(self.cookies_file, cookies)
+        os.chmod(self.cookies_file, 0o600)
+        return True
+
+    def restore_cookies(self, driver, base_url):
+        """Load saved cookies into driver; the caller still has to verify the session"""
+        if not self.has_cookies():
+            return False
+        try:
+            with open(self.cookies_file, 'r') as f:
+                cookies = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        try:
+            # Cookies can only be set for the domain currently loaded
+            driver.get(base_url)
+            for cookie in cookies:
+                if cookie.get('sameSite') not in ('Strict', 'Lax', 'None'):
+                    cookie.pop('sameSite', None)
+                try:
+                    driver.add_cookie(cookie)
+                except WebDriverException:
+                    continue
+        except WebDriverException:
+            return False
+        return True
+
+    def clear(self):
+        """Forget a session that turned out to be invalid"""
+        if self.cookies_file.exists():
+            self.cookies_file.unlink()
@@ -67,11 +67,12 @@ cat > config.json << 'CONFIG'
     "target_accounts": ["deadmau5", "skrillex", "1001tracklists"],
     "users_per_account": 5,
     "daily_follow_limit": 15,
+    "daily_unfollow_limit": 50,
     "unfollow_after_hours": 48
   },
   "schedule": {
     "follow_time": "09:00",
-    "unfollow_time": "15:00"
+    "unfollow_interval_minutes": 30
   },
   "notifications": {
     "email": {
@@ -112,19 +113,8 @@ sudo ufw allow 22/tcp
 sudo ufw allow 5000/tcp
 sudo ufw --force enable
 
-# Set up log rotation
-echo "📋 Setting up log rotation..."
-sudo tee /etc/logrotate.d/instagram-bot << LOGROTATE
-/home/bot/instagram-automation/logs/*.log {
-    daily
-    missingok
-    rotate 30
-    compress
-    delaycompress
-    notifempty
-    copytruncate
-}
-LOGROTATE
+# Log rotation: the bot rotates logs/bot.log itself at midnight and gzips old days
+# (config.json logging.backup_days), so no logrotate rule is installed
 
 echo ""
 echo "✅ Instagram Bot Server Setup Complete!"
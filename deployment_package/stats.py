@@ -0,0 +1,165 @@
+"""
+Incremental bot statistics
+Running counters updated as actions are logged, persisted as a compact daily rollup.
+Writes are coalesced; following/unfollowed totals are read from the ledger, which is the source of truth
+"""
+import json
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+try:
+    from .storage import atomic_write_json, file_signature
+except ImportError:
+    from storage import atomic_write_json, file_signature
+
+RECENT_ACTIONS_KEPT = 20
+
+
+def _empty_state():
+    return {
+        'days': {},
+        'totals': {'actions': {}, 'sources': {}},
+        'last_action': None,
+        'recent_actions': []
+    }
+
+
+class StatsAggregator:
+    def __init__(self, data_dir, retention_days=90, ledger_counts=None, save_interval=5.0):
+        self.data_dir = Path(data_dir)
+        self.rollup_file = self.data_dir / 'stats_rollup.json'
+        self.retention_days = retention_days
+        # Zero-argument callable returning {'following': n, 'unfollowed': n}, e.g. ledger.counts or
+        # ledger.read_counts; snapshot() calls it every time, so it has to be cached on its side
+        self.ledger_counts = ledger_counts
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._dirty = False
+        self._timer = None
+        self.state = _empty_state()
+        self.refresh()
+
+    def refresh(self):
+        """Reload the rollup only if another process changed it since we last looked
+
+        Skipped while this instance has unsaved actions, which the reload would drop
+        """
+        if self._dirty:
+            return False
+        signature = file_signature(self.rollup_file)
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            with open(self.rollup_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        with self._lock:
+            self.state = state
+            self._signature = signature
+        return True
+
+    def exists(self):
+        return self.rollup_file.exists()
+
+    def rebuild(self, action_entries):
+        """Seed counters from full history - only needed once, when no rollup exists yet"""
+        with self._lock:
+            self.state = _empty_state()
+            for entry in action_entries:
+                self._apply(entry)
+            self._prune()
+            self._save()
+
+    def record(self, entry):
+        """Fold one action log entry into the counters; the rollup is written within save_interval"""
+        self.refresh()
+        with self._lock:
+            self._apply(entry)
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.save_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write pending counters now - called at the end of each cycle and on shutdown"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return False
+            self._prune()
+            self._save()
+            self._dirty = False
+        return True
+
+    def _apply(self, entry):
+        action = entry.get('action', 'unknown')
+        timestamp = entry.get('timestamp') or datetime.now().isoformat()
+        day_key = timestamp[:10]
+        source = entry.get('source')
+
+        day = self.state['days'].setdefault(day_key, {'actions': {}, 'sources': {}})
+        day['actions'][action] = day['actions'].get(action, 0) + 1
+        if source:
+            source_counts = day['sources'].setdefault(source, {})
+            source_counts[action] = source_counts.get(action, 0) + 1
+
+        totals = self.state['totals']
+        totals['actions'][action] = totals['actions'].get(action, 0) + 1
+        if source:
+            # Lifetime per-source counters; rollups written before this existed start from zero
+            source_totals = totals.setdefault('sources', {}).setdefault(source, {})
+            source_totals[action] = source_totals.get(action, 0) + 1
+        self.state['last_action'] = timestamp
+        recent = self.state['recent_actions']
+        recent.append(entry)
+        del recent[:-RECENT_ACTIONS_KEPT]
+
+    def _prune(self):
+        cutoff = (date.today() - timedelta(days=self.retention_days)).isoformat()
+        for day_key in [d for d in self.state['days'] if d < cutoff]:
+            del self.state['days'][day_key]
+
+    def _save(self):
+        atomic_write_json(self.rollup_file, self.state)
+        self._signature = file_signature(self.rollup_file)
+
+    def day(self, day_key=None):
+        day_key = day_key or date.today().isoformat()
+        return self.state['days'].get(day_key, {'actions': {}, 'sources': {}})
+
+    def totals_by_source(self):
+        """Lifetime {source: {action: count}}, monotonic so it can back Prometheus counters"""
+        self.refresh()
+        with self._lock:
+            return {source: dict(counts) for source, counts in self.state['totals'].get('sources', {}).items()}
+
+    def snapshot(self):
+        """Current stats in the shape the dashboards and reports expect"""
+        self.refresh()
+        # Imports and manual edits change the ledger without logging actions, so never count from actions
+        counts = self.ledger_counts() if self.ledger_counts is not None else {}
+        with self._lock:
+            today = self.day()
+            return {
+                'total_following': counts.get('following', 0),
+                'total_unfollowed': counts.get('unfollowed', 0),
+                'today_follows': today['actions'].get('follow', 0),
+                'today_unfollows': today['actions'].get('unfollow', 0),
+                'today_by_source': {source: dict(counts) for source, counts in today['sources'].items()},
+                'recent_actions': list(self.state['recent_actions']),
+                'last_action': self.state['last_action']
+            }
+
+
+def open_stats(data_dir, action_log=None, ledger_counts=None):
+    """Open the aggregator for data_dir, seeding it from history the first time"""
+    stats = StatsAggregator(data_dir, ledger_counts=ledger_counts)
+    if not stats.exists() and action_log is not None:
+        stats.rebuild(action_log.iter_records())
+    return stats
@@ -0,0 +1,39 @@
+"""
+Small file helpers shared by the bot's data stores
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write_json(path, data, indent=None):
+    """Write JSON to a temp file in the same directory, then rename over path"""
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+def atomic_write_text(path, text):
+    """Write text to a temp file in the same directory, fsync, then rename over path"""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def file_signature(path):
+    """(mtime_ns, size) of path, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
@@ -0,0 +1,134 @@
+"""
+Per-phase timing for bot operations
+Spans are appended to timings.jsonl and summarized per cycle as p50/p95 durations
+"""
+import functools
+import json
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+
+# Shared no-op span so a disabled timer allocates nothing per call
+NULL_SPAN = nullcontext()
+
+
+class Span:
+    """One timed phase; extra fields can be attached while it runs"""
+
+    __slots__ = ('timer', 'name', 'fields', 'started')
+
+    def __init__(self, timer, name, fields):
+        self.timer = timer
+        self.name = name
+        self.fields = fields
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.fields['ok'] = False
+            self.fields['error'] = exc_type.__name__
+        self.timer.record(self.name, duration, **self.fields)
+        return False
+
+
+class PhaseTimer:
+    def __init__(self, data_dir=None, enabled=True, filename='timings.jsonl', on_record=None):
+        self.enabled = enabled
+        # Optional callback(name, duration, **fields), e.g. MetricsRegistry.observe_span
+        self.on_record = on_record
+        self.timings_file = Path(data_dir) / filename if (enabled and data_dir is not None) else None
+        self.lock = threading.Lock()
+        self.cycle_durations = {}
+        self._file = None
+
+    def span(self, name, **fields):
+        """Context manager timing one phase; a shared no-op when disabled"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, fields)
+
+    def record(self, name, duration, **fields):
+        record = {"timestamp": datetime.now().isoformat(), "span": name, "seconds": round(duration, 4)}
+        record.update(fields)
+        with self.lock:
+            self.cycle_durations.setdefault(name, []).append(duration)
+            if self.timings_file is not None:
+                if self._file is None:
+                    self._file = open(self.timings_file, 'a', encoding='utf-8')
+                self._file.write(json.dumps(record) + '\n')
+                self._file.flush()
+        if self.on_record is not None:
+            self.on_record(name, duration, **fields)
+
+    def summary(self, reset=True):
+        """{span: {count, total, p50, p95}} for everything recorded since the last reset"""
+        with self.lock:
+            durations = self.cycle_durations
+            if reset:
+                self.cycle_durations = {}
+        return {
+            name: {
+                'count': len(values),
+                'total': round(sum(values), 3),
+                'p50': round(percentile(values, 50), 3),
+                'p95': round(percentile(values, 95), 3)
+            }
+            for name, values in durations.items()
+        }
+
+    def log_summary(self, logger, label, reset=True):
+        """Write one line per span for the cycle that just ended"""
+        summary = self.summary(reset=reset)
+        for name, row in sorted(summary.items()):
+            logger.info(
+                f"⏱️ {label} {name}: n={row['count']} p50={row['p50']}s p95={row['p95']}s total={row['total']}s"
+            )
+        return summary
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Default for bots built without a timer
+NULL_TIMER = PhaseTimer(enabled=False)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; 0.0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def timed(name):
+    """Decorator for bot methods: times the call as a span on self.timer
+
+    A False return (the bot's failure convention) is recorded as ok=False, a list as its length
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            timer = self.timer
+            if not timer.enabled:
+                return method(self, *args, **kwargs)
+            with timer.span(name) as span:
+                result = method(self, *args, **kwargs)
+                if isinstance(result, list):
+                    span.fields['count'] = len(result)
+                else:
+                    span.fields['ok'] = bool(result)
+                return result
+        return wrapper
+    return decorator
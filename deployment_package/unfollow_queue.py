@@ -0,0 +1,154 @@
+"""
+Unfollow queue
+A persisted min-heap of (due time, username), due being followed_at + unfollow_after_hours.
+The server drains whatever is due a few users at a time instead of scanning every follow once a day
+"""
+import heapq
+import json
+import threading
+import time
+from pathlib import Path
+
+try:
+    from .storage import atomic_write_json
+except ImportError:
+    from storage import atomic_write_json
+
+QUEUE_FILE = 'unfollow_queue.json'
+
+
+class UnfollowQueue:
+    def __init__(self, data_dir, after_hours, retry_minutes=60, max_attempts=3):
+        self.path = Path(data_dir) / QUEUE_FILE
+        self.after_hours = after_hours
+        self.retry_minutes = retry_minutes
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Heap entries can go stale (re-follow, retry); _due holds each username's live due time
+        self._heap = []
+        self._due = {}
+        self._attempts = {}
+        # username -> when retry() gave up on it; sync skips any follow from before then
+        self._given_up = {}
+        # Newest followed_at merged from the ledger, and the users followed at exactly that time; the next
+        # sync asks for follows from there on and skips those, so the boundary is never queued twice
+        self.synced_until = None
+        self._synced_names = set()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Due times depend on after_hours, so a changed setting means rebuilding from the ledger
+        if data.get('after_hours') != self.after_hours:
+            return
+        self._due = data.get('due', {})
+        self._attempts = data.get('attempts', {})
+        self._given_up = data.get('given_up', {})
+        self.synced_until = data.get('synced_until')
+        self._synced_names = set(data.get('synced_names', []))
+        self._heap = [[due, username] for username, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def save(self):
+        with self._lock:
+            data = {
+                'after_hours': self.after_hours,
+                'synced_until': self.synced_until,
+                'synced_names': sorted(self._synced_names),
+                'due': self._due,
+                'attempts': self._attempts,
+                'given_up': self._given_up
+            }
+        atomic_write_json(self.path, data)
+
+    def __len__(self):
+        return len(self._due)
+
+    def _push(self, username, due):
+        self._due[username] = due
+        heapq.heappush(self._heap, [due, username])
+
+    def sync(self, ledger, full=False):
+        """Queue follows recorded since the last sync; full re-reads every current follow
+
+        A full sync picks up history merged in with older timestamps (e.g. extension imports)
+        """
+        offset = self.after_hours * 3600
+        since = None if full else self.synced_until
+        added = 0
+        following = set()
+        with self._lock:
+            for username, followed_at in ledger.followed_since(since):
+                following.add(username)
+                if followed_at == since and username in self._synced_names:
+                    continue
+                if self.synced_until is None or followed_at > self.synced_until:
+                    self.synced_until = followed_at
+                    self._synced_names = {username}
+                elif followed_at == self.synced_until:
+                    self._synced_names.add(username)
+                given_up = self._given_up.get(username)
+                if given_up is not None:
+                    if followed_at <= given_up:
+                        continue
+                    # Followed again since; this follow gets its own attempts
+                    del self._given_up[username]
+                due = followed_at + offset
+                if username in self._attempts:
+                    # Waiting on a retry; its persisted entry already points at the retry time, and a
+                    # full rebuild must not reset the backoff or the attempt count
+                    continue
+                # A re-follow moves the user back; the older heap entry is skipped as stale
+                if self._due.get(username) != due:
+                    self._push(username, due)
+                    self._attempts.pop(username, None)
+                    added += 1
+            if full:
+                # Unfollowed by hand or elsewhere since we gave up
+                for username in [u for u in self._given_up if u not in following]:
+                    del self._given_up[username]
+        self.save()
+        return added
+
+    def _drop_stale(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Epoch time the next user becomes due, or None when the queue is empty"""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None):
+        """Next username whose due time has passed, or None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return None
+            _, username = heapq.heappop(self._heap)
+            del self._due[username]
+            return username
+
+    def done(self, username):
+        with self._lock:
+            self._attempts.pop(username, None)
+
+    def retry(self, username, now=None):
+        """Requeue a failed unfollow after retry_minutes; False once it has failed max_attempts times"""
+        now = time.time() if now is None else now
+        with self._lock:
+            attempts = self._attempts.get(username, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(username, None)
+                # Remembered so a later full sync does not queue the same follow all over again
+                self._given_up[username] = now
+                return False
+            self._attempts[username] = attempts
+            self._push(username, now + self.retry_minutes * 60)
+            return True
@@ -0,0 +1,71 @@
+"""
+Page-readiness waits and action pacing
+Readiness is waited on explicitly; deliberate spacing between actions lives in PacingPolicy
+"""
+import random
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Predicates run page-side so polling never pays the driver's implicit wait
+LOGIN_ERROR_JS = "return !!document.querySelector(\"#slfErrorAlert, div[role='alert']\");"
+NOT_NOW_PRESENT_JS = """
+return Array.from(document.querySelectorAll("button, div[role='button']"))
+    .some(b => b.textContent.trim().toLowerCase() === 'not now');
+"""
+BUTTON_TEXT_PRESENT_JS = """
+const wanted = arguments[0];
+return Array.from(document.querySelectorAll('header button, main button'))
+    .some(b => b.innerText.trim() === wanted);
+"""
+
+
+def wait_until(driver, condition, timeout=10, poll_frequency=0.2):
+    """True as soon as condition(driver) is truthy, False after timeout"""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll_frequency,
+                      ignored_exceptions=(WebDriverException,)).until(condition)
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_js(driver, script, *args, timeout=10):
+    return wait_until(driver, lambda d: d.execute_script(script, *args), timeout)
+
+
+def wait_for_page_ready(driver, timeout=10):
+    return wait_for_js(driver, "return document.readyState === 'complete';", timeout=timeout)
+
+
+def wait_for_button_text(driver, text, timeout=5):
+    """Profile action button reads exactly text, e.g. 'Follow' once an unfollow went through"""
+    return wait_for_js(driver, BUTTON_TEXT_PRESENT_JS, text, timeout=timeout)
+
+
+class PacingPolicy:
+    """Deliberate, configurable spacing between actions - independent of page readiness"""
+
+    DEFAULTS = {
+        'typing': (0.5, 1.0),
+        'before_follow': (1.0, 1.0),
+        'between_unfollows': (3.0, 8.0),
+        'between_accounts': (60.0, 60.0),
+    }
+
+    def __init__(self, delays=None):
+        self.delays = dict(self.DEFAULTS)
+        for step, bounds in (delays or {}).items():
+            low, high = bounds if isinstance(bounds, (list, tuple)) else (bounds, bounds)
+            self.delays[step] = (float(low), float(high))
+
+    def delay(self, step):
+        low, high = self.delays.get(step, (0.0, 0.0))
+        return random.uniform(low, high) if high > low else low
+
+    def pause(self, step):
+        seconds = self.delay(step)
+        if seconds > 0:
+            time.sleep(seconds)
+        return seconds
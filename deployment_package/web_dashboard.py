@@ -2,13 +2,24 @@
 """
 Web Dashboard for Instagram Bot Remote Control
 """
-from flask import Flask, render_template_string, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, Response, stream_with_context, render_template_string, request, redirect, url_for, flash, session, jsonify
+import copy
 import json
 import os
+import hashlib
+import queue
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timezone
 import threading
 
+from action_log import ActionLog
+from ledger import ledger_files, read_counts
+from stats import open_stats
+from metrics import MetricsRegistry
+from storage import atomic_write_json, file_signature
+from config_service import ConfigError, validate_config
+from events import ActionLogTailer, format_sse
+
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
@@ -17,53 +28,84 @@ class BotDashboard:
         self.config_file = Path('config.json')
         self.data_dir = Path('bot_data')
         self.data_dir.mkdir(exist_ok=True)
+        self.stats = None
+        # Written by the bot process; reloaded only when the file changes
+        self.metrics = MetricsRegistry(self.data_dir)
+        
+        # Single tailer shared by every /events viewer
+        self.events = ActionLogTailer(self.data_dir)
+        
+        # Parsed config and serialized /api/stats payload, keyed by the files' (mtime, size)
+        self._lock = threading.Lock()
+        self._config_cache = (None, {})
+        self._stats_cache = None
         
     def load_config(self):
-        if self.config_file.exists():
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
-        return {}
+        """config.json, re-parsed only when its mtime or size changed"""
+        signature = file_signature(self.config_file)
+        if signature is None:
+            return {}
+        with self._lock:
+            cached_signature, config = self._config_cache
+            if signature == cached_signature:
+                return config
+        with open(self.config_file, 'r') as f:
+            config = json.load(f)
+        with self._lock:
+            self._config_cache = (signature, config)
+        return config
         
     def save_config(self, config):
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        """Validate, then replace config.json atomically; raises ConfigError and leaves the file alone if invalid"""
+        validate_config(config)
+        atomic_write_json(self.config_file, config, indent=2)
+            
+    def get_stats_aggregator(self):
+        if self.stats is None:
+            self.stats = open_stats(self.data_dir, ActionLog(self.data_dir, migrate=False),
+                                    lambda: read_counts(self.data_dir, self.ledger_backend()))
+        return self.stats
+        
+    def ledger_backend(self):
+        return self.load_config().get('bot_settings', {}).get('ledger_backend', 'json')
             
     def get_stats(self):
         try:
-            follows_file = self.data_dir / 'follows.json'
-            action_log_file = self.data_dir / 'action_log.json'
-            
-            follows_data = {}
-            action_log = []
-            
-            if follows_file.exists():
-                with open(follows_file, 'r') as f:
-                    follows_data = json.load(f)
-                    
-            if action_log_file.exists():
-                with open(action_log_file, 'r') as f:
-                    action_log = json.load(f)
-            
-            now = datetime.now()
-            today = now.date()
-            
-            following = [u for u, d in follows_data.items() if d.get('status') == 'following']
-            
-            today_follows = len([
-                a for a in action_log 
-                if a.get('action') == 'follow' 
-                and datetime.fromisoformat(a['timestamp']).date() == today
-            ])
-            
-            return {
-                'total_following': len(following),
-                'today_follows': today_follows,
-                'recent_actions': action_log[-10:] if action_log else [],
-                'last_action': action_log[-1]['timestamp'] if action_log else None
-            }
+            stats = self.get_stats_aggregator().snapshot()
+            stats['recent_actions'] = stats['recent_actions'][-10:]
+            return stats
             
         except Exception as e:
             return {'error': str(e)}
+            
+    def get_stats_payload(self):
+        """(body, etag, last_modified) for /api/stats, rebuilt only when the rollup changed"""
+        return self.cached_stats()[1:]
+        
+    def cached_stats(self):
+        """(stats, body, etag, last_modified), shared by / and /api/stats and rebuilt only when the rollup changed
+
+        The date is part of the key because today's counters roll over at midnight without a write;
+        the ledger files are too, since following/unfollowed totals come from the ledger
+        """
+        stats = self.get_stats_aggregator()
+        signature = file_signature(stats.rollup_file)
+        ledger_signatures = tuple(file_signature(path) for path in ledger_files(self.data_dir, self.ledger_backend()))
+        key = (signature, ledger_signatures, date.today().isoformat())
+        with self._lock:
+            if self._stats_cache and self._stats_cache[0] == key:
+                return self._stats_cache[1:]
+        
+        payload = self.get_stats()
+        body = json.dumps(payload, sort_keys=True)
+        etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+        # Werkzeug reads naive datetimes as UTC
+        last_modified = datetime.fromtimestamp(signature[0] / 1e9, tz=timezone.utc) if signature else None
+        # A failed read is retried on the next request instead of being served until the rollup changes
+        if 'error' not in payload:
+            with self._lock:
+                self._stats_cache = (key, payload, body, etag, last_modified)
+        return payload, body, etag, last_modified
 
 dashboard = BotDashboard()
 
@@ -89,6 +131,9 @@ DASHBOARD_TEMPLATE = """
     <div class="container">
         <div class="header">
             <h1>🤖 Instagram Bot Dashboard</h1>
+            {% for message in get_flashed_messages() %}
+            <p>❌ {{ message }}</p>
+            {% endfor %}
         </div>
         
         <div class="grid">
@@ -104,6 +149,11 @@ DASHBOARD_TEMPLATE = """
                 </div>
             </div>
             
+            <div class="card">
+                <h3>⚡ Live Activity</h3>
+                <div id="live-activity"></div>
+            </div>
+            
             <div class="card">
                 <h3>🔧 Configuration</h3>
                 <form method="post" action="/update_config">
@@ -116,6 +166,19 @@ DASHBOARD_TEMPLATE = """
             </div>
         </div>
     </div>
+    <script>
+        const live = document.getElementById('live-activity');
+        const source = new EventSource('/events');
+        const icons = {follow: '✅', unfollow: '🔄', error: '❌'};
+        ['follow', 'unfollow', 'error'].forEach(type => source.addEventListener(type, e => {
+            const entry = JSON.parse(e.data);
+            const row = document.createElement('div');
+            row.className = 'stat';
+            row.textContent = `${icons[type]} ${entry.timestamp.slice(11, 19)} ${type} @${entry.target} ${entry.details || ''}`;
+            live.prepend(row);
+            while (live.children.length > 20) live.lastChild.remove();
+        }));
+    </script>
 </body>
 </html>
 """
@@ -123,17 +186,58 @@ DASHBOARD_TEMPLATE = """
 @app.route('/')
 def index():
     config = dashboard.load_config()
-    stats = dashboard.get_stats()
+    stats = dashboard.cached_stats()[0]
     return render_template_string(DASHBOARD_TEMPLATE, config=config, stats=stats)
 
+@app.route('/api/stats')
+def api_stats():
+    body, etag, last_modified = dashboard.get_stats_payload()
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/events')
+def events():
+    subscriber = dashboard.events.subscribe()
+    
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield format_sse(subscriber.get(timeout=15))
+                except queue.Empty:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            dashboard.events.unsubscribe(subscriber)
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/metrics')
+def metrics():
+    body = dashboard.metrics.render(dashboard.get_stats_aggregator())
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/update_config', methods=['POST'])
 def update_config():
-    config = dashboard.load_config()
+    # load_config returns the cached dict; edit a copy so a rejected change leaves the cache intact
+    config = copy.deepcopy(dashboard.load_config())
     if 'instagram' not in config:
         config['instagram'] = {}
-    config['instagram']['target_accounts'] = [acc.strip() for acc in request.form['target_accounts'].split(',')]
-    dashboard.save_config(config)
+    config['instagram']['target_accounts'] = [acc.strip() for acc in request.form['target_accounts'].split(',') if acc.strip()]
+    try:
+        dashboard.save_config(config)
+    except ConfigError as e:
+        flash(f"Config not saved: {e}")
     return redirect(url_for('index'))
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    # Threaded so open /events streams don't block other requests
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
@@ -11,15 +11,22 @@ from datetime import datetime
 import random
 import threading
 
+from deployment_package.batch_store import BatchStore, batch_key
+
+# Batch frames are built a page at a time; the rest stay unparsed on disk
+BATCHES_PAGE_SIZE = 50
+
 class InstagramBotGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Instagram Bot")
         self.root.geometry("800x600")
         
-        # Initialize batches data first
+        # Initialize batches data first - indexed lazily, batches are parsed on demand
         self.batches_file = Path('instagram_data/follow_batches.json')
-        self.batches = self.load_batches()
+        self.batches_file.parent.mkdir(exist_ok=True)
+        self.store = BatchStore(self.batches_file)
+        self.batches_shown = BATCHES_PAGE_SIZE
         
         # Create notebook for tabs
         self.notebook = ttk.Notebook(self.root)
@@ -34,6 +41,13 @@ class InstagramBotGUI:
         # Load settings if they exist
         self.load_settings()
         
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    def on_close(self):
+        """Write any pending batch progress before the window goes away"""
+        self.store.close()
+        self.root.destroy()
+        
     def create_login_tab(self):
         """Create login and settings tab"""
         login_frame = ttk.Frame(self.notebook)
@@ -136,6 +150,7 @@ class InstagramBotGUI:
         refresh_frame = ttk.Frame(unfollow_frame)
         refresh_frame.pack(fill="x", padx=20, pady=10)
         ttk.Button(refresh_frame, text="🔄 Refresh Batches", command=self.refresh_batches_display).pack(side="left", padx=5)
+        ttk.Button(refresh_frame, text="⬇️ Show More", command=self.show_more_batches).pack(side="left", padx=5)
         
         # Initial load of batches
         self.refresh_batches_display()
@@ -155,44 +170,45 @@ class InstagramBotGUI:
         # Update button
         ttk.Button(stats_frame, text="🔄 Refresh Stats", command=self.update_stats).pack(pady=10)
     
-    def load_batches(self):
-        """Load batches from file"""
-        if self.batches_file.exists():
-            try:
-                with open(self.batches_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading batches: {e}")
-                return []
-        return []
-    
     def refresh_batches_display(self):
-        """Refresh the batches display"""
+        """Refresh the batches display from the per-batch summaries"""
         # Clear existing frames
         for widget in self.scrollable_batches_frame.winfo_children():
             widget.destroy()
         
-        # Reload batches
-        self.batches = self.load_batches()
+        # Pick up batches written by other tools; one stat when the file has not changed
+        try:
+            self.store.reload()
+        except Exception as e:
+            print(f"Error loading batches: {e}")
+        summaries = self.store.summaries()
         
-        if not self.batches:
+        if not summaries:
             no_batches_label = ttk.Label(self.scrollable_batches_frame, text="No follow batches found", font=("SF Pro Display", 12))
             no_batches_label.pack(pady=20)
             return
         
-        # Sort batches by timestamp (newest first)
-        sorted_batches = sorted(
-            self.batches,
-            key=lambda x: datetime.fromisoformat(x['timestamp']),
-            reverse=True
-        )
+        # Sort batches by timestamp (newest first); ISO timestamps sort as strings
+        sorted_batches = sorted(summaries, key=lambda x: x.get('timestamp') or '', reverse=True)
         
-        # Create frames for each batch
-        for batch in sorted_batches:
+        # Create frames for the newest page(s) only
+        for batch in sorted_batches[:self.batches_shown]:
             self.create_batch_unfollow_frame(batch)
+        hidden = len(sorted_batches) - self.batches_shown
+        if hidden > 0:
+            ttk.Label(
+                self.scrollable_batches_frame,
+                text=f"{hidden} older batches not shown - use Show More",
+                font=("SF Pro Display", 9),
+                foreground="gray"
+            ).pack(pady=10)
+    
+    def show_more_batches(self):
+        self.batches_shown += BATCHES_PAGE_SIZE
+        self.refresh_batches_display()
     
     def create_batch_unfollow_frame(self, batch):
-        """Create a frame for a batch in the unfollow tab"""
+        """Create a frame for a batch summary in the unfollow tab"""
         batch_frame = ttk.Frame(self.scrollable_batches_frame, relief="solid", borderwidth=1)
         batch_frame.pack(fill="x", pady=(0, 10), padx=5)
         
@@ -219,8 +235,8 @@ class InstagramBotGUI:
         ).pack(side="left")
         
         # Status indicators
-        total_users = len(batch['users'])
-        unfollowed = sum(1 for user in batch['users'] if user.get('unfollowed', False))
+        total_users = batch['user_count']
+        unfollowed = batch['unfollowed_count']
         
         status_label = ttk.Label(
             header_frame,
@@ -246,7 +262,7 @@ class InstagramBotGUI:
             ttk.Button(
                 actions_frame,
                 text="Unfollow This Batch",
-                command=lambda b=batch: self.unfollow_batch(b)
+                command=lambda key=batch_key(batch): self.unfollow_batch(key)
             ).pack(side="left")
             
             # Show count of users to unfollow
@@ -271,12 +287,22 @@ class InstagramBotGUI:
                 foreground="green"
             ).pack(pady=(10, 0))
     
-    def unfollow_batch(self, batch):
+    def unfollow_batch(self, key):
         """Unfollow all users in a specific batch"""
         if not self.username_var.get() or not self.password_var.get():
             messagebox.showerror("Error", "Please enter username and password in the Login & Settings tab")
             return
         
+        # Only this batch is parsed from the file, after picking up any newer copy another tool wrote
+        try:
+            self.store.reload()
+        except Exception as e:
+            print(f"Error loading batches: {e}")
+        batch = self.store.get(key)
+        if batch is None:
+            messagebox.showerror("Error", "Batch not found - try refreshing")
+            return
+        
         # Count users to unfollow
         users_to_unfollow = [u for u in batch['users'] if not u.get('unfollowed', False)]
         
@@ -326,16 +352,14 @@ class InstagramBotGUI:
                         
                         # Use the bot's unfollow method
                         if hasattr(bot, 'unfollow_user') and bot.unfollow_user(user['username']):
-                            user['unfollowed'] = True
-                            user['unfollowed_at'] = datetime.now().isoformat()
+                            with self.store.lock:
+                                user['unfollowed'] = True
+                                user['unfollowed_at'] = datetime.now().isoformat()
+                                self.store.mark_changed(batch)
                             unfollowed_count += 1
                             
-                            # Save progress
-                            try:
-                                with open(self.batches_file, 'w') as f:
-                                    json.dump(self.batches, f, indent=2)
-                            except Exception as e:
-                                print(f"Warning: Could not save batch progress: {e}")
+                            # Save progress (coalesced; flushed when the run ends)
+                            self.store.save()
                         
                         # Add delay between unfollows to avoid rate limiting
                         import time
@@ -349,6 +373,13 @@ class InstagramBotGUI:
                 if bot.driver:
                     bot.driver.quit()
                 
+                try:
+                    self.store.flush()
+                    # The bot buffers ledger unfollows until its next checkpoint
+                    bot.save_follows_data()
+                except Exception as e:
+                    print(f"Warning: Could not save batch progress: {e}")
+                
                 # Update status and refresh display
                 self.unfollow_status_var.set(f"Unfollow completed: {unfollowed_count}/{total_users} users unfollowed")
                 self.root.after(0, self.refresh_batches_display)
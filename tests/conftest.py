@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The bot modules are flat files run from deployment_package/, importing each other as siblings
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'deployment_package'))
@@ -0,0 +1,68 @@
+import json
+
+import batch_reader
+from batch_reader import LazyBatchFile, iter_array_elements
+
+
+def write_batches(path, count):
+    batches = [{'id': f'b{n}', 'timestamp': f'2026-03-0{n + 1}T12:00:00',
+                'users': [{'username': f'ünïcode{n}', 'unfollowed': bool(n % 2)}]} for n in range(count)]
+    path.write_text(json.dumps(batches, indent=2, ensure_ascii=False), encoding='utf-8')
+    return batches
+
+
+def test_element_offsets_survive_chunk_boundaries():
+    data = json.dumps([{'username': 'ü' * n} for n in range(1, 40)], ensure_ascii=False).encode('utf-8')
+
+    elements = list(iter_array_elements(data, chunk_size=7))
+
+    assert [element for element, _, _ in elements] == json.loads(data)
+    for element, start, end in elements:
+        assert json.loads(data[start:end]) == element
+
+
+def test_sidecar_index_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / 'follow_batches.json'
+    batches = write_batches(path, 3)
+    LazyBatchFile(path).close()
+    assert path.with_name(path.name + '.idx').exists()
+
+    builds = []
+    real_build = LazyBatchFile._build_index
+    monkeypatch.setattr(LazyBatchFile, '_build_index',
+                        lambda self, signature: builds.append(signature) or real_build(self, signature))
+
+    reader = LazyBatchFile(path)
+    assert builds == []
+    assert reader.load(2) == batches[2]
+    assert reader.summaries[1]['unfollowed_count'] == 1
+    reader.close()
+
+    write_batches(path, 4)
+    reader = LazyBatchFile(path)
+    assert len(builds) == 1 and len(reader) == 4
+    reader.close()
+
+
+def test_rewrite_copies_untouched_batches_raw(tmp_path):
+    path = tmp_path / 'follow_batches.json'
+    batches = write_batches(path, 3)
+    reader = LazyBatchFile(path)
+
+    changed = dict(batches[1], completed=True)
+    reader.rewrite([0, changed, 2])
+
+    assert json.loads(path.read_text(encoding='utf-8')) == [batches[0], changed, batches[2]]
+    assert reader.load(1) == changed
+    reader.close()
+
+
+def test_truncated_file_starts_empty(tmp_path, monkeypatch):
+    path = tmp_path / 'follow_batches.json'
+    write_batches(path, 2)
+    path.write_bytes(path.read_bytes()[:-20])
+    monkeypatch.setattr(batch_reader.logger, 'error', lambda message: None)
+
+    reader = LazyBatchFile(path)
+
+    assert len(reader) == 0 and list(reader) == []
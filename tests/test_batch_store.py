@@ -0,0 +1,75 @@
+import json
+import os
+
+from batch_store import BatchStore
+
+
+def batch(batch_id, *usernames):
+    return {'id': batch_id, 'source_accounts': ['src'], 'completed': False,
+            'users': [{'username': username, 'unfollowed': False} for username in usernames]}
+
+
+def bump_mtime(path):
+    # Two writes inside one mtime tick would look unchanged
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_every_mutator_counts_as_unsaved(tmp_path):
+    store = BatchStore(tmp_path / 'follow_batches.json', save_interval=60)
+    store.add(batch('b1', 'alice'))
+    assert store.flush()
+
+    existing = store.get('b1')
+    store.add_user(existing, {'username': 'bob', 'unfollowed': False})
+    assert store.flush()
+    store.set_completed(existing)
+    assert store.flush()
+    existing['users'][0]['unfollowed'] = True
+    store.mark_changed(existing)
+    assert store.flush()
+    assert not store.flush()
+    store.close()
+
+    saved = json.loads((tmp_path / 'follow_batches.json').read_text())
+    assert saved[0]['completed'] and [u['username'] for u in saved[0]['users']] == ['alice', 'bob']
+
+
+def test_flush_merges_another_process_write(tmp_path):
+    path = tmp_path / 'follow_batches.json'
+    first = BatchStore(path, save_interval=60)
+    first.add(batch('b1', 'alice'))
+    first.add(batch('b2', 'carol'))
+    first.flush()
+
+    second = BatchStore(path, save_interval=60)
+    second.add_user(second.get('b1'), {'username': 'bob', 'unfollowed': False})
+    second.add(batch('b3', 'dave'))
+    second.flush()
+    second.close()
+    bump_mtime(path)
+
+    # Stale view: still mapped onto the file from before the other write
+    first.set_completed(first.get('b1'))
+    first.delete('b2')
+    first.flush()
+    first.close()
+
+    saved = {b['id']: b for b in json.loads(path.read_text())}
+    assert sorted(saved) == ['b1', 'b3']
+    assert saved['b1']['completed']
+    assert [u['username'] for u in saved['b1']['users']] == ['alice', 'bob']
+
+
+def test_reload_only_when_the_file_changed(tmp_path):
+    path = tmp_path / 'follow_batches.json'
+    reader = BatchStore(path)
+    assert not reader.reload()
+
+    writer = BatchStore(path, save_interval=60)
+    writer.add(batch('b1', 'alice'))
+    writer.close()
+
+    assert reader.reload()
+    assert [summary['id'] for summary in reader.summaries()] == ['b1']
+    assert not reader.reload()
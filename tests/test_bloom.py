@@ -0,0 +1,69 @@
+from bloom import BLOOM_FILE, BloomFilter, add_to_bloom, open_bloom
+from ledger import open_ledger
+
+
+def ledger_with(tmp_path, *usernames):
+    ledger = open_ledger(tmp_path, 'json')
+    for username in usernames:
+        ledger.record_follow(username, 'src')
+    return ledger
+
+
+def test_filter_answers_for_every_ledger_user(tmp_path):
+    ledger = ledger_with(tmp_path, 'alice', 'bob')
+    bloom = open_bloom(tmp_path, ledger, min_capacity=100)
+
+    assert 'alice' in bloom and 'bob' in bloom
+    assert sum(f'stranger{n}' in bloom for n in range(1000)) < 20
+    assert bloom.ledger_rows == 2
+    bloom.close()
+
+
+def test_ledger_grown_behind_the_filter_forces_a_rebuild(tmp_path):
+    ledger = ledger_with(tmp_path, 'alice')
+    open_bloom(tmp_path, ledger, min_capacity=100).close()
+
+    ledger.record_follow('bob', 'src')
+    bloom = open_bloom(tmp_path, ledger, min_capacity=100)
+
+    assert 'bob' in bloom and bloom.ledger_rows == 2
+    bloom.close()
+
+
+def test_advance_only_when_nothing_else_grew_the_ledger(tmp_path):
+    ledger = ledger_with(tmp_path, 'alice')
+    bloom = open_bloom(tmp_path, ledger, min_capacity=100)
+
+    assert bloom.advance(1, 2)
+    assert not bloom.advance(1, 5)
+    assert bloom.ledger_rows == 2
+    bloom.close()
+
+
+def test_header_merges_writes_from_processes_sharing_the_file(tmp_path):
+    ledger = ledger_with(tmp_path, 'alice')
+    open_bloom(tmp_path, ledger, min_capacity=100).close()
+    first = BloomFilter(tmp_path / BLOOM_FILE)
+    second = BloomFilter(tmp_path / BLOOM_FILE)
+
+    second.add('bob')
+    assert second.advance(1, 2)
+    # first still has the old header cached
+    first.add('carol')
+
+    reopened = BloomFilter(tmp_path / BLOOM_FILE)
+    assert (reopened.count, reopened.ledger_rows) == (3, 2)
+    for bloom in (first, second, reopened):
+        bloom.close()
+
+
+def test_add_to_bloom_keeps_an_open_filter_in_sync(tmp_path):
+    ledger = ledger_with(tmp_path, 'alice')
+    bloom = open_bloom(tmp_path, ledger, min_capacity=100)
+
+    ledger.record_follow('imported', 'extension')
+    add_to_bloom(tmp_path, {'imported'}, 1, 2)
+
+    assert 'imported' in bloom
+    bloom.close()
+    assert open_bloom(tmp_path, ledger, min_capacity=100).ledger_rows == 2
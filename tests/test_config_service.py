@@ -0,0 +1,65 @@
+import json
+import logging
+import os
+
+import pytest
+
+from config_service import DEFAULT_CONFIG, BotConfig, ConfigError, ConfigService, validate_config
+
+
+def test_default_config_round_trips_to_the_dataclass_defaults():
+    assert validate_config(json.loads(json.dumps(DEFAULT_CONFIG))) == BotConfig()
+    assert validate_config({}) == BotConfig()
+
+
+def test_values_are_coerced_and_normalized():
+    config = validate_config({
+        'instagram': {'target_accounts': [' @alice', 'bob', '@'], 'unfollow_after_hours': 24},
+        'bot_settings': {'pacing': {'between_follows': [1, 2], 'page_load': 3}},
+        'logging': {'level': 'debug'}
+    })
+
+    assert config.instagram.target_accounts == ('alice', 'bob')
+    assert config.instagram.unfollow_after_hours == 24.0
+    assert dict(config.bot_settings.pacing) == {'between_follows': (1.0, 2.0), 'page_load': (3.0, 3.0)}
+    assert config.logging.level == 'DEBUG'
+
+
+@pytest.mark.parametrize('raw, path', [
+    ({'instagram': {'users_per_account': '5'}}, 'instagram.users_per_account'),
+    ({'instagram': {'daily_follow_limit': True}}, 'instagram.daily_follow_limit'),
+    ({'schedule': {'follow_time': '9am'}}, 'schedule.follow_time'),
+    ({'notifications': {'discord': {'enabled': True, 'webhook_url': ''}}}, 'notifications.discord.webhook_url'),
+    ({'web_dashboard': {'port': 70000}}, 'web_dashboard.port'),
+    ({'bot_settings': {'ledger_backend': 'csv'}}, 'bot_settings.ledger_backend'),
+    ({'bot_settings': {'pacing': {'between_follows': [3, 1]}}}, 'bot_settings.pacing.between_follows'),
+    ({'logging': {'level': 'LOUD'}}, 'logging.level'),
+    ({'logging': []}, 'logging'),
+])
+def test_invalid_values_name_the_key(raw, path):
+    with pytest.raises(ConfigError, match=path.replace('.', r'\.')):
+        validate_config(raw)
+
+
+def test_unknown_keys_are_collected():
+    unknown = []
+    validate_config({'instagram': {'headless': True}, 'extras': {}}, unknown)
+    assert sorted(unknown) == ['extras', 'instagram.headless']
+
+
+def test_service_keeps_the_last_good_config(tmp_path):
+    config_file = tmp_path / 'config.json'
+    service = ConfigService(config_file, logging.getLogger('test'))
+    assert json.loads(config_file.read_text()) == DEFAULT_CONFIG
+
+    changes = []
+    service.subscribe('schedule', lambda new, old: changes.append((old.follow_time, new.follow_time)))
+    config_file.write_text(json.dumps({'schedule': {'follow_time': '10:30'}}))
+    os.utime(config_file, ns=(0, 1))
+    assert service.reload() == ['schedule']
+    assert changes == [('09:00', '10:30')]
+
+    config_file.write_text(json.dumps({'schedule': {'follow_time': 'noon'}}))
+    os.utime(config_file, ns=(0, 2))
+    assert service.reload() == []
+    assert service.config.schedule.follow_time == '10:30'
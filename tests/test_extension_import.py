@@ -0,0 +1,70 @@
+import json
+
+from batch_store import BatchStore
+from config_service import BotSettings
+from extension_import import ImportCursor, configured_backend, import_export
+from ledger import open_ledger
+
+
+def batch(batch_id, *usernames, unfollowed=()):
+    return {
+        'id': batch_id,
+        'timestamp': '2026-03-01T12:00:00Z',
+        'source_accounts': ['src'],
+        'users': [
+            {'username': username, 'followed_at': '2026-03-01T12:00:00Z',
+             'unfollowed': username in unfollowed,
+             'unfollowed_at': '2026-03-03T12:00:00Z' if username in unfollowed else None}
+            for username in usernames
+        ]
+    }
+
+
+def write_export(path, *batches):
+    path.write_text(json.dumps(list(batches)))
+
+
+def run_import(tmp_path, export, force=False):
+    store = BatchStore(tmp_path / 'follow_batches.json')
+    ledger = open_ledger(tmp_path, 'json')
+    try:
+        return import_export(export, store, ledger, ImportCursor(tmp_path), force=force)
+    finally:
+        store.close()
+        ledger.close()
+
+
+def test_unchanged_export_is_skipped(tmp_path):
+    export = tmp_path / 'batches.json'
+    write_export(export, batch('b1', 'alice', 'bob'))
+
+    assert run_import(tmp_path, export) == {'batches': 1, 'changed': 1, 'users': 2}
+    assert run_import(tmp_path, export) is None
+
+
+def test_grown_export_only_merges_changed_batches(tmp_path):
+    export = tmp_path / 'batches.json'
+    write_export(export, batch('b1', 'alice'))
+    run_import(tmp_path, export)
+
+    write_export(export, batch('b1', 'alice'), batch('b2', 'carol', 'dave'))
+    assert run_import(tmp_path, export) == {'batches': 2, 'changed': 1, 'users': 2}
+
+    write_export(export, batch('b1', 'alice', unfollowed={'alice'}), batch('b2', 'carol', 'dave'))
+    assert run_import(tmp_path, export) == {'batches': 2, 'changed': 1, 'users': 0}
+    ledger = open_ledger(tmp_path, 'json')
+    assert ledger.counts() == {'following': 2, 'unfollowed': 1}
+
+
+def test_configured_backend_follows_config_file(tmp_path):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'bot_settings': {'ledger_backend': 'sqlite'}}))
+    assert configured_backend(config_file) == 'sqlite'
+
+
+def test_configured_backend_defaults_like_the_server(tmp_path):
+    assert configured_backend(tmp_path / 'missing.json') == BotSettings().ledger_backend
+
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'bot_settings': {'ledger_backend': 'csv'}}))
+    assert configured_backend(config_file) == BotSettings().ledger_backend
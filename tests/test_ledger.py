@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from ledger import LEDGER_BACKENDS, FollowLedger, open_ledger
+
+FOLLOWED = datetime(2026, 3, 1, 12, 0).timestamp()
+UNFOLLOWED = datetime(2026, 3, 3, 12, 0).timestamp()
+
+
+@pytest.fixture(params=LEDGER_BACKENDS)
+def ledger(request, tmp_path):
+    ledger = open_ledger(tmp_path, request.param)
+    yield ledger
+    ledger.close()
+
+
+def test_merge_keeps_newest_follow(ledger):
+    ledger.merge_history([('alice', 'following', FOLLOWED, None, 'src', 'b1')])
+    ledger.merge_history([('alice', 'following', FOLLOWED - 3600, None, 'older', None)])
+
+    assert ledger.get('alice')['source_account'] == 'src'
+    ledger.merge_history([('alice', 'following', FOLLOWED + 3600, None, 'newer', None)])
+    assert ledger.get('alice')['source_account'] == 'newer'
+    # A row without a batch keeps the one already recorded
+    assert ledger.get('alice')['batch_id'] == 'b1'
+
+
+def test_reimport_does_not_undo_unfollow(ledger):
+    row = ('alice', 'following', FOLLOWED, None, 'src', 'b1')
+    ledger.merge_history([row])
+    ledger.mark_unfollowed('alice', datetime.fromtimestamp(UNFOLLOWED))
+
+    ledger.merge_history([row])
+
+    assert ledger.get('alice')['status'] == 'unfollowed'
+    assert ledger.counts() == {'following': 0, 'unfollowed': 1}
+
+
+def test_same_follow_can_be_upgraded_to_unfollowed(ledger):
+    ledger.merge_history([('alice', 'following', FOLLOWED, None, 'src', None)])
+    ledger.merge_history([('alice', 'unfollowed', FOLLOWED, UNFOLLOWED, 'src', None)])
+
+    assert ledger.get('alice')['status'] == 'unfollowed'
+
+
+def test_refollow_after_unfollow_wins(ledger):
+    ledger.merge_history([('alice', 'unfollowed', FOLLOWED, UNFOLLOWED, 'src', None)])
+    ledger.merge_history([('alice', 'following', UNFOLLOWED + 3600, None, 'src', None)])
+
+    assert ledger.get('alice')['status'] == 'following'
+    assert [username for username, _ in ledger.followed_since()] == ['alice']
+
+
+def test_json_unfollows_are_written_on_flush(tmp_path):
+    ledger = open_ledger(tmp_path, 'json')
+    ledger.record_follow('alice', 'src')
+    ledger.flush()
+    ledger.mark_unfollowed('alice')
+
+    assert open_ledger(tmp_path, 'json').get('alice')['status'] == 'following'
+    ledger.flush()
+    assert open_ledger(tmp_path, 'json').get('alice')['status'] == 'unfollowed'
+
+
+def test_backends_implement_the_whole_interface():
+    class Partial(FollowLedger):
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,69 @@
+from datetime import date
+
+import ledger as ledger_module
+from ledger import open_ledger, read_counts
+from stats import StatsAggregator, open_stats
+
+# Days older than the retention window are pruned on save, so use today's date
+TODAY = date.today().isoformat()
+
+
+def action(action, timestamp, source=None):
+    return {'action': action, 'username': 'alice', 'timestamp': timestamp, 'source': source}
+
+
+def test_record_is_coalesced_until_flush(tmp_path):
+    stats = StatsAggregator(tmp_path, save_interval=60)
+    stats.record(action('follow', f'{TODAY}T12:00:00', 'src'))
+    stats.record(action('follow', f'{TODAY}T12:05:00', 'src'))
+
+    assert not stats.exists()
+    assert stats.flush()
+    assert not stats.flush()
+
+    other = StatsAggregator(tmp_path)
+    assert other.day(TODAY)['actions'] == {'follow': 2}
+    assert other.totals_by_source() == {'src': {'follow': 2}}
+
+
+def test_other_process_changes_are_picked_up(tmp_path):
+    reader = StatsAggregator(tmp_path)
+    writer = StatsAggregator(tmp_path)
+    writer.record(action('unfollow', f'{TODAY}T12:00:00'))
+    writer.flush()
+
+    assert reader.snapshot()['last_action'] == f'{TODAY}T12:00:00'
+
+
+def test_snapshot_totals_come_from_the_ledger(tmp_path):
+    ledger = open_ledger(tmp_path, 'json')
+    ledger.record_follow('alice', 'src')
+    ledger.record_follow('bob', 'src')
+    ledger.mark_unfollowed('bob')
+    stats = open_stats(tmp_path, ledger_counts=ledger.counts)
+
+    snapshot = stats.snapshot()
+    assert (snapshot['total_following'], snapshot['total_unfollowed']) == (1, 1)
+
+    ledger.record_follow('carol', 'src')
+    assert stats.snapshot()['total_following'] == 2
+
+
+def test_read_counts_only_reopens_a_changed_ledger(tmp_path, monkeypatch):
+    ledger = open_ledger(tmp_path, 'json')
+    ledger.record_follow('alice', 'src')
+    ledger.flush()
+
+    opened = []
+    real_open = ledger_module.open_ledger
+    monkeypatch.setattr(ledger_module, 'open_ledger',
+                        lambda *args: opened.append(args) or real_open(*args))
+
+    assert read_counts(tmp_path) == {'following': 1, 'unfollowed': 0}
+    assert read_counts(tmp_path) == {'following': 1, 'unfollowed': 0}
+    assert len(opened) == 1
+
+    ledger.record_follow('bob', 'src')
+    ledger.flush()
+    assert read_counts(tmp_path) == {'following': 2, 'unfollowed': 0}
+    assert len(opened) == 2
@@ -0,0 +1,76 @@
+from ledger import open_ledger
+from unfollow_queue import UnfollowQueue
+
+HOUR = 3600
+T0 = 1_780_000_000.0
+
+
+def follow(ledger, username, followed_at):
+    ledger.merge_history([(username, 'following', followed_at, None, 'src', None)])
+
+
+def drain(queue, now):
+    popped = []
+    while (username := queue.pop_due(now)) is not None:
+        popped.append(username)
+    return popped
+
+
+def test_due_users_pop_oldest_first(tmp_path):
+    ledger = open_ledger(tmp_path, 'json')
+    follow(ledger, 'bob', T0 + HOUR)
+    follow(ledger, 'alice', T0)
+    queue = UnfollowQueue(tmp_path, after_hours=48)
+
+    assert queue.sync(ledger) == 2
+    assert queue.next_due() == T0 + 48 * HOUR
+    assert queue.pop_due(T0 + 48 * HOUR) == 'alice'
+    assert queue.pop_due(T0 + 48 * HOUR) is None
+    assert queue.pop_due(T0 + 49 * HOUR) == 'bob'
+
+
+def test_incremental_sync_does_not_requeue_the_boundary_user(tmp_path):
+    ledger = open_ledger(tmp_path, 'json')
+    follow(ledger, 'alice', T0)
+    queue = UnfollowQueue(tmp_path, after_hours=48)
+    queue.sync(ledger)
+    assert drain(queue, T0 + 48 * HOUR) == ['alice']
+    queue.done('alice')
+
+    follow(ledger, 'bob', T0)
+    assert queue.sync(ledger) == 1
+    assert drain(queue, T0 + 48 * HOUR) == ['bob']
+
+
+def test_given_up_users_survive_a_restart_and_full_sync(tmp_path):
+    ledger = open_ledger(tmp_path, 'json')
+    follow(ledger, 'alice', T0)
+    queue = UnfollowQueue(tmp_path, after_hours=48, max_attempts=2)
+    queue.sync(ledger)
+
+    now = T0 + 48 * HOUR
+    assert queue.pop_due(now) == 'alice'
+    assert queue.retry('alice', now)
+    now += HOUR
+    assert queue.pop_due(now) == 'alice'
+    assert not queue.retry('alice', now)
+    queue.save()
+
+    restarted = UnfollowQueue(tmp_path, after_hours=48, max_attempts=2)
+    assert restarted.sync(ledger, full=True) == 0
+    assert len(restarted) == 0
+
+    # A later re-follow is a new follow and is queued again
+    follow(ledger, 'alice', now + HOUR)
+    assert restarted.sync(ledger, full=True) == 1
+
+
+def test_changed_after_hours_rebuilds(tmp_path):
+    ledger = open_ledger(tmp_path, 'json')
+    follow(ledger, 'alice', T0)
+    UnfollowQueue(tmp_path, after_hours=48).sync(ledger)
+
+    queue = UnfollowQueue(tmp_path, after_hours=24)
+    assert len(queue) == 0
+    queue.sync(ledger, full=True)
+    assert queue.next_due() == T0 + 24 * HOUR